@@ -0,0 +1,343 @@
+"""Scale benchmark for TechAuditProcessor
+
+Generates synthetic Screaming Frog exports (internal_all, images_all,
+sitemap_all, canonical_all, redirect chains/loops and an Excel file to import)
+at the requested sizes, then times loading, update_audit_values,
+import_existing_sheets_recursive and saving separately, each size in a fresh
+interpreter. Results are appended to a JSON-lines file and compared with the
+last result for the same configuration; the script exits with status 1 if a
+stage got slower by more than the threshold, so it can gate changes:
+
+    python benchmarks/audit_scale.py --rows 10000 100000
+    python benchmarks/audit_scale.py --rows 1000000 --streaming --runs 3
+
+Generated exports are kept (per size and seed) in --data-dir and reused.
+Results go to benchmarks/results/ by default, which is gitignored since the
+timings only mean something on the machine that produced them.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULTS = os.path.join(REPO_DIR, "benchmarks", "results", "audit_scale.jsonl")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "tech_audit_bench")
+
+STAGES = ["load", "metrics", "import", "save"]
+
+# Slower than this fraction AND this many seconds counts as a regression
+DEFAULT_THRESHOLD = 0.2
+NOISE_SECONDS = 0.05
+
+# Rows generated per write, so 10M-row exports never sit in memory at once
+GENERATE_CHUNK = 250000
+
+
+def generate_exports(folder, rows, import_rows, seed):
+    """Write synthetic exports with realistic columns, nulls and duplicates"""
+    import numpy as np
+    import pandas as pd
+
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    base = "https://www.example.com"
+    sections = np.array(["blog", "products", "category", "help", "news", "about"])
+    title_pool = np.array([f"Shared title {i} | Example" for i in range(max(rows // 50, 10))])
+    description_pool = np.array([f"Shared description {i} for several pages on the site." for i in range(max(rows // 80, 10))])
+
+    def address(index):
+        section = sections[index % len(sections)]
+        return base + "/" + pd.Series(section) + "/page-" + pd.Series(index).astype(str) + "/"
+
+    paths = {name: os.path.join(folder, name) for name in [
+        "internal_all.csv", "images_all.csv", "sitemap_all.csv", "canonical_all.csv",
+        "redirect_chains_all.csv", "redirect_loops_all.csv",
+    ]}
+    for path in paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+    for start in range(0, rows, GENERATE_CHUNK):
+        index = np.arange(start, min(start + GENERATE_CHUNK, rows))
+        n = len(index)
+        header = start == 0
+        addresses = address(index)
+
+        # Mostly HTML pages, mostly 200s; 3xx rows redirect to another page (some to a redirect, some in loops)
+        content_type = np.where(rng.random(n) < 0.9, "text/html; charset=utf-8",
+                                rng.choice(["image/jpeg", "text/css", "application/javascript"], n))
+        status = rng.choice([200, 301, 302, 404, 500, 307], n, p=[0.93, 0.03, 0.01, 0.02, 0.005, 0.005])
+        redirecting = (status >= 300) & (status < 400)
+        target_index = np.where(rng.random(n) < 0.3, index + 1, (index * 7 + 3) % rows)
+        target_index = np.where(rng.random(n) < 0.01, index - 1, target_index).clip(0, rows - 1)
+        redirect_url = address(target_index).where(redirecting, "")
+
+        indexable = (status == 200) & (rng.random(n) < 0.85)
+        indexability_status = np.where(indexable, "", rng.choice(["noindex", "Canonicalised", "Blocked by robots.txt"], n))
+        indexability_status = np.where((status != 200) & ~indexable, "Redirected", indexability_status)
+
+        titles = np.where(rng.random(n) < 0.1, rng.choice(title_pool, n),
+                          "Page " + pd.Series(index).astype(str) + " title about " + sections[index % len(sections)])
+        titles = np.where(rng.random(n) < 0.03, "", titles)
+        descriptions = np.where(rng.random(n) < 0.15, rng.choice(description_pool, n),
+                                "Description of page " + pd.Series(index).astype(str) +
+                                ". Learn more about our products, services and latest offers.")
+        descriptions = np.where(rng.random(n) < 0.15, "", descriptions)
+        h1 = np.where(rng.random(n) < 0.05, "", "Heading " + pd.Series(index % (rows // 3 + 1)).astype(str))
+        canonical = np.where(rng.random(n) < 0.6, addresses, "")
+        canonical = np.where(rng.random(n) < 0.05, address((index + 11) % rows), canonical)
+
+        internal = pd.DataFrame({
+            "Address": addresses,
+            "Content Type": content_type,
+            "Status Code": status,
+            "Status": np.where(status == 200, "OK", "Other"),
+            "Indexability": np.where(indexable, "Indexable", "Non-Indexable"),
+            "Indexability Status": indexability_status,
+            "Title 1": titles,
+            "Title 1 Length": pd.Series(titles).str.len(),
+            "Meta Description 1": descriptions,
+            "Meta Description 1 Length": pd.Series(descriptions).str.len(),
+            "Meta Robots 1": rng.choice(["", "index, follow", "noindex", "noindex, nofollow"], n, p=[0.7, 0.2, 0.07, 0.03]),
+            "H1-1": h1,
+            "H1-2": np.where(rng.random(n) < 0.1, "Second heading", ""),
+            "Canonical Link Element 1": canonical,
+            "Redirect URL": redirect_url,
+            "Word Count": rng.integers(0, 3000, n),
+            "Crawl Depth": rng.integers(0, 10, n),
+            "Inlinks": rng.integers(0, 500, n),
+        })
+        internal.to_csv(paths["internal_all.csv"], mode="a", header=header, index=False)
+
+        # Half as many images as pages
+        image_count = n // 2
+        images = pd.DataFrame({
+            "Address": base + "/images/img-" + pd.Series(index[:image_count]).astype(str) + ".jpg",
+            "Content Type": "image/jpeg",
+            "Size (Bytes)": rng.lognormal(10.5, 1.0, image_count).astype("int64"),
+            "Status Code": rng.choice([200, 404], image_count, p=[0.97, 0.03]),
+            "Alt Text": np.where(rng.random(image_count) < 0.2, "", "Alt text"),
+        })
+        images.to_csv(paths["images_all.csv"], mode="a", header=header, index=False)
+
+        # Most indexable pages plus a few URLs the crawl never reached
+        in_sitemap = indexable & (rng.random(n) < 0.9)
+        sitemap = pd.DataFrame({
+            "Address": pd.concat([addresses[in_sitemap], base + "/orphan/" + pd.Series(index[: n // 50]).astype(str)],
+                                 ignore_index=True),
+        })
+        sitemap["Status Code"] = np.where(rng.random(len(sitemap)) < 0.97, 200, 404)
+        sitemap["Indexability"] = np.where(rng.random(len(sitemap)) < 0.95, "Indexable", "Non-Indexable")
+        sitemap.to_csv(paths["sitemap_all.csv"], mode="a", header=header, index=False)
+
+        has_canonical = canonical != ""
+        pd.DataFrame({
+            "Address": addresses[has_canonical],
+            "Indexability": internal["Indexability"][has_canonical],
+            "Canonical Link Element 1": canonical[has_canonical],
+        }).to_csv(paths["canonical_all.csv"], mode="a", header=header, index=False)
+
+        chains = redirecting & (rng.random(n) < 0.3)
+        pd.DataFrame({
+            "Address": addresses[chains],
+            "Number of Redirects": rng.integers(2, 5, int(chains.sum())),
+        }).to_csv(paths["redirect_chains_all.csv"], mode="a", header=header, index=False)
+        loops = redirecting & (rng.random(n) < 0.02)
+        pd.DataFrame({"Address": addresses[loops]}).to_csv(
+            paths["redirect_loops_all.csv"], mode="a", header=header, index=False)
+
+    if import_rows:
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Keywords")
+        sheet.append(["Keyword", "Volume", "Position", "URL", "Difficulty"])
+        for i in range(import_rows):
+            sheet.append([f"keyword {i}", int(rng.integers(10, 100000)), int(rng.integers(1, 100)),
+                          f"{base}/blog/page-{i}/", float(rng.random())])
+        workbook.save(os.path.join(folder, "keyword_research.xlsx"))
+
+
+def dataset_folder(data_dir, rows, import_rows, seed):
+    """Generate (or reuse) the exports for one size"""
+    folder = os.path.join(data_dir, f"rows{rows}_import{import_rows}_seed{seed}")
+    marker = os.path.join(folder, ".complete")
+    if not os.path.exists(marker):
+        print(f"Generating {rows} rows in {folder}...")
+        generate_exports(folder, rows, import_rows, seed)
+        with open(marker, "w") as f:
+            f.write("ok")
+    return folder
+
+
+# Runs in a fresh interpreter so peak memory and warm caches belong to one measurement
+RUN_PROBE = """
+import contextlib, io, json, sys, tempfile, time
+sys.path.insert(0, %(repo)r)
+import tech_audit
+options = json.loads(%(options)r)
+folder = %(folder)r
+
+def measure(stage, func):
+    wall, cpu = time.perf_counter(), tech_audit.cpu_seconds()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    peak = tech_audit.peak_rss_bytes()
+    results[stage] = {
+        "seconds": time.perf_counter() - wall,
+        "cpu_seconds": tech_audit.cpu_seconds() - cpu,
+        "peak_rss_mb": round(peak / 1024 ** 2, 1) if peak is not None else None,
+    }
+
+results = {}
+processor = tech_audit.TechAuditProcessor(**options)
+file_index = processor.build_file_index(folder)
+measure("load", lambda: processor.load_screaming_frog_data_recursive(folder, file_index))
+
+# A template holding every mapped item
+workbook = tech_audit.openpyxl.Workbook()
+sheet = workbook.active
+sheet.title = "Full Audit"
+for row, item_id in enumerate(processor.item_mappings, start=2):
+    sheet.cell(row=row, column=3).value = item_id
+    sheet.cell(row=row, column=9).value = "0"
+
+measure("metrics", lambda: processor.update_audit_values(workbook))
+measure("import", lambda: processor.import_existing_sheets_recursive(workbook, folder, file_index))
+with tempfile.TemporaryDirectory() as output_folder:
+    measure("save", lambda: tech_audit.save_streaming_workbook(workbook, output_folder + "/audit.xlsx"))
+
+rows = {entry["file"]: entry["rows"] for entry in processor.profiler.files}
+metrics = sorted(processor.profiler.metrics, key=lambda entry: -entry["seconds"])[:10]
+print(json.dumps({"stages": results, "rows": rows, "slowest_metrics": metrics}))
+"""
+
+
+def run_once(folder, options):
+    code = RUN_PROBE % {"repo": REPO_DIR, "options": json.dumps(options), "folder": folder}
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(folder, options, runs):
+    """Median of each stage over the runs (the breakdown comes from the last run)"""
+    results = [run_once(folder, options) for _ in range(runs)]
+    stages = {}
+    for stage in STAGES:
+        stages[stage] = {
+            "seconds": round(statistics.median(r["stages"][stage]["seconds"] for r in results), 4),
+            "cpu_seconds": round(statistics.median(r["stages"][stage]["cpu_seconds"] for r in results), 4),
+            "peak_rss_mb": max((r["stages"][stage]["peak_rss_mb"] or 0) for r in results) or None,
+        }
+    return {"stages": stages, "rows": results[-1]["rows"], "slowest_metrics": results[-1]["slowest_metrics"]}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(history, config):
+    for record in reversed(history):
+        if record["config"] == config:
+            return record
+    return None
+
+
+def compare(record, baseline, threshold):
+    """Print each stage against the baseline; returns the stages that regressed"""
+    regressed = []
+    for stage in STAGES:
+        seconds = record["stages"][stage]["seconds"]
+        peak = record["stages"][stage]["peak_rss_mb"]
+        line = f"  {stage:<8} {seconds:>9.3f}s"
+        if peak is not None:
+            line += f"  peak {peak:>8.1f} MB"
+        if baseline is not None:
+            before = baseline["stages"][stage]["seconds"]
+            change = (seconds - before) / before if before else 0.0
+            line += f"  was {before:.3f}s ({change:+.0%})"
+            if seconds - before > NOISE_SECONDS and change > threshold:
+                line += "  REGRESSION"
+                regressed.append(stage)
+        print(line)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time TechAuditProcessor stages on synthetic exports")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000],
+                        help="internal_all.csv sizes to benchmark (default: 10000 100000)")
+    parser.add_argument("--import-rows", type=int, default=20000,
+                        help="Rows in the Excel file imported as a tab (0 for none)")
+    parser.add_argument("--runs", type=int, default=1, help="Fresh interpreters per size (default: 1)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the generated exports")
+    parser.add_argument("--streaming", action="store_true", help="Benchmark streaming loads")
+    parser.add_argument("--cache", action="store_true", help="Use the export cache (off by default to time parsing)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for parsing CSVs")
+    parser.add_argument("--store", choices=["memory", "arrow"], default="memory",
+                        help="Where loaded exports are kept (default: memory)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Where generated exports are kept")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON-lines file results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="Don't append the results")
+    parser.add_argument("--label", default="", help="Free-form note stored with the results")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown that counts as a regression (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    history = load_results(args.results)
+    options = {"streaming": args.streaming, "use_cache": args.cache, "workers": args.workers}
+    # Older results have no store setting; keep their configs comparable
+    if args.store != "memory":
+        options["store"] = args.store
+    new_records = []
+    failed = False
+
+    for rows in args.rows:
+        folder = dataset_folder(args.data_dir, rows, args.import_rows, args.seed)
+        config = {"rows": rows, "import_rows": args.import_rows, "seed": args.seed, **options}
+        print(f"\n{rows} rows ({'streaming' if args.streaming else args.store + ' store'}, "
+              f"cache {'on' if args.cache else 'off'}, {args.runs} run(s))")
+
+        record = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "label": args.label,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": config,
+            **measure(folder, options, args.runs),
+        }
+        failed = bool(compare(record, find_baseline(history, config), args.threshold)) or failed
+        new_records.append(record)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, "a", encoding="utf-8") as f:
+            for record in new_records:
+                f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {args.results}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
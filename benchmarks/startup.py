@@ -0,0 +1,131 @@
+"""Startup benchmark for tech_audit.py
+
+Measures, in fresh interpreters, how long it takes to import the module, to get
+through the headless CLI's argument handling, and (when a display is available)
+to build and draw the GUI window. Each measurement is checked against a time
+budget and the script exits with status 1 if any budget is exceeded, so it can
+gate builds:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, median over the runs
+BUDGETS = {
+    "import": 0.25,
+    "cli_help": 0.5,
+    "gui_first_paint": 1.0,
+}
+
+# Modules that must not be loaded just by importing tech_audit
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "tkinter", "pyarrow"]
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import tech_audit
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+CLI_PROBE = """
+import contextlib, io, json, time
+start = time.perf_counter()
+import tech_audit
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        tech_audit.run_cli(["--help"])
+    except SystemExit:
+        pass
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+GUI_PROBE = """
+import json, time
+start = time.perf_counter()
+import tech_audit
+tech_audit.load_tkinter()
+try:
+    root = tech_audit.tk.Tk()
+except tech_audit.tk.TclError as e:
+    print(json.dumps({"skipped": str(e)}))
+    raise SystemExit(0)
+app = tech_audit.TechAuditGUI(root)
+root.update()
+elapsed = time.perf_counter() - start
+root.destroy()
+print(json.dumps({"seconds": elapsed}))
+"""
+
+
+def run_probe(code):
+    """Run a probe in a fresh interpreter and return its JSON result"""
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(name, code, runs):
+    results = [run_probe(code) for _ in range(runs)]
+    if any("skipped" in result for result in results):
+        return {"name": name, "skipped": results[0].get("skipped")}
+
+    timings = [result["seconds"] for result in results]
+    measurement = {
+        "name": name,
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "budget": BUDGETS[name],
+    }
+    loaded = sorted({module for result in results for module in result.get("loaded", [])})
+    if loaded:
+        measurement["heavy_modules_loaded"] = loaded
+    return measurement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tech_audit.py startup time against its budget")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (default: 5)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    measurements = [
+        measure("import", IMPORT_PROBE, args.runs),
+        measure("cli_help", CLI_PROBE, args.runs),
+        measure("gui_first_paint", GUI_PROBE, args.runs),
+    ]
+
+    failed = False
+    for m in measurements:
+        if "skipped" in m:
+            print(f"{m['name']:<16} skipped ({m['skipped']})")
+            continue
+
+        over_budget = m["median"] > m["budget"]
+        status = "OVER BUDGET" if over_budget else "ok"
+        print(f"{m['name']:<16} median {m['median']:.3f}s (min {m['min']:.3f}s, max {m['max']:.3f}s) "
+              f"budget {m['budget']:.2f}s  {status}")
+        if m.get("heavy_modules_loaded"):
+            print(f"{'':<16} heavy modules loaded at import: {', '.join(m['heavy_modules_loaded'])}")
+            failed = True
+        failed = failed or over_budget
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(measurements, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
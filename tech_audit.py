@@ -1,16 +1,65 @@
-import pandas as pd
 import os
 import sys
 import shutil
-from datetime import datetime
-import openpyxl
-from openpyxl import load_workbook
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+from datetime import datetime, timezone
+import importlib
 import threading
-from urllib.parse import urlparse
+import queue
+from urllib.parse import urlsplit
 from pathlib import Path
 import tempfile
+from copy import copy
+import json
+import hashlib
+import time
+import fnmatch
+import argparse
+import csv
+import re
+import math
+import weakref
+from collections.abc import MutableMapping
+from functools import lru_cache
+from contextlib import redirect_stdout, contextmanager
+
+
+class LazyModule:
+    """Stand-in for a heavy module that is imported on first attribute access
+    
+    Keeps pandas and openpyxl out of the startup path: the window (or CLI) comes
+    up first and the GUI warms these up in a background thread while the user
+    fills in the form. Safe to use from several threads at once.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+    
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+
+pd = LazyModule("pandas")
+np = LazyModule("numpy")
+openpyxl = LazyModule("openpyxl")
+
+# tkinter is only imported when the GUI starts (see load_tkinter) so headless runs never load it
+tk = filedialog = messagebox = ttk = None
+
+
+def warm_imports():
+    """Import the heavy modules ahead of use (run in a background thread by the GUI)"""
+    pd.load()
+    openpyxl.load()
+    import openpyxl.styles
 
 # Hide console window on Windows
 if sys.platform == "win32":
@@ -18,8 +67,2055 @@ if sys.platform == "win32":
     startupinfo = subprocess.STARTUPINFO()
     startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-class TechAuditProcessor:
+class MetricEngine:
+    """Compute Screaming Frog metrics for one export as boolean row masks
+    
+    Intermediate masks (HTML-only rows, blank titles, numeric status codes, ...)
+    are built once per frame and shared by every metric that needs them, and
+    counts are taken as mask sums instead of materialising filtered copies.
+    """
+    
+    # Metric registry - what each metric needs, so that loads, projections and computation
+    # order can be planned from the items a template actually uses:
+    #   columns     columns it reads (exports are loaded with just these)
+    #   uses        shared intermediates it builds on (see shared); metrics using the same ones
+    #               are computed together and the intermediates dropped after their last use
+    #   references  URL sets it looks up in other exports (see URL_SETS)
+    #   duplicates  column whose repeated (or near-duplicate) values it counts, see DuplicateFinder
+    #   graph       RedirectGraph method giving its value, for metrics read off the redirect graph
+    #   graph_urls  RedirectGraph method giving the hashes of the URLs such a metric counts
+    METRICS = {
+        "non_200_in_sitemap": {'columns': ['Status Code'], 'uses': [('numeric', 'Status Code')]},
+        "non_indexable_in_sitemap": {'columns': ['Indexability']},
+        "urls_not_in_sitemap": {
+            'columns': ['Address', 'Indexability', 'Content Type'],
+            'uses': ['html', ('url_hashes', 'Address'), ('has_url', 'Address')],
+            'references': ['sitemap_urls'],
+        },
+        "missing_canonical": {'columns': ['Canonical Link Element 1', 'Content Type'], 'uses': ['html']},
+        "canonicalised_pages": {'columns': ['Canonical Link Element 1', 'Address']},
+        "canonical_different_domain": {
+            'columns': ['Canonical Link Element 1', 'Address'],
+            'uses': [('url_parts', 'Address'), ('url_parts', 'Canonical Link Element 1')],
+        },
+        "non_indexable_canonical": {
+            'columns': ['Address', 'Canonical Link Element 1'],
+            'uses': [('url_hashes', 'Canonical Link Element 1'), ('url_hashes', 'Address'),
+                     ('same_url', 'Canonical Link Element 1', 'Address')],
+            'references': ['non_indexable_urls'],
+        },
+        "missing_canonical_urls": {
+            'columns': ['Canonical Link Element 1'],
+            'uses': [('url_hashes', 'Canonical Link Element 1'), ('has_url', 'Canonical Link Element 1')],
+            'references': ['crawled_urls'],
+        },
+        "pages_with_noindex": {'columns': ['Meta Robots 1'], 'uses': [('contains', 'Meta Robots 1', 'noindex')]},
+        "pages_with_nofollow": {'columns': ['Meta Robots 1'], 'uses': [('contains', 'Meta Robots 1', 'nofollow')]},
+        "robots_txt_blocked": {
+            'columns': ['Indexability'],
+            'uses': [('contains', 'Indexability', 'Blocked by robots.txt')],
+        },
+        "missing_page_titles": {'columns': ['Title 1'], 'uses': [('blank', 'Title 1')]},
+        "duplicate_page_titles": {
+            'columns': ['Title 1'],
+            'uses': [('blank', 'Title 1'), ('duplicated', 'Title 1')],
+            'duplicates': 'Title 1',
+        },
+        "long_page_titles": {'columns': ['Title 1 Length'], 'uses': [('numeric', 'Title 1 Length')]},
+        "short_page_titles": {'columns': ['Title 1 Length'], 'uses': [('numeric', 'Title 1 Length')]},
+        "missing_meta_descriptions": {'columns': ['Meta Description 1'], 'uses': [('blank', 'Meta Description 1')]},
+        "duplicate_meta_descriptions": {
+            'columns': ['Meta Description 1'],
+            'uses': [('blank', 'Meta Description 1'), ('duplicated', 'Meta Description 1')],
+            'duplicates': 'Meta Description 1',
+        },
+        "long_meta_descriptions": {
+            'columns': ['Meta Description 1 Length'],
+            'uses': [('numeric', 'Meta Description 1 Length')],
+        },
+        "short_meta_descriptions": {
+            'columns': ['Meta Description 1 Length'],
+            'uses': [('numeric', 'Meta Description 1 Length')],
+        },
+        "missing_h1": {'columns': ['H1-1'], 'uses': [('blank', 'H1-1')]},
+        "duplicate_h1": {'columns': ['H1-1'], 'uses': [('blank', 'H1-1'), ('duplicated', 'H1-1')], 'duplicates': 'H1-1'},
+        "multiple_h1": {'columns': ['H1-2']},
+        "images_missing_alt": {'columns': ['Alt Text'], 'uses': [('blank', 'Alt Text')]},
+        "images_over_100kb": {'columns': ['Size (Bytes)'], 'uses': [('numeric', 'Size (Bytes)')]},
+        "broken_images": {'columns': ['Status Code'], 'uses': [('numeric', 'Status Code')]},
+        "client_4xx_errors": {'columns': ['Status Code'], 'uses': [('numeric', 'Status Code')]},
+        "server_5xx_errors": {'columns': ['Status Code'], 'uses': [('numeric', 'Status Code')]},
+        "status_404_count": {'columns': ['Status Code'], 'uses': [('numeric', 'Status Code')]},
+        "redirect_chains": {'uses': ['all']},
+        "redirect_loops": {'uses': ['all']},
+        "temporary_redirects": {'columns': ['Status Code'], 'uses': [('numeric', 'Status Code')]},
+        "redirect_graph_chains": {
+            'columns': ['Address', 'Redirect URL', 'Status Code'],
+            'graph': 'chain_count',
+            'graph_urls': 'chain_head_urls',
+        },
+        "redirect_graph_loops": {
+            'columns': ['Address', 'Redirect URL', 'Status Code'],
+            'graph': 'loop_count',
+            'graph_urls': 'loop_urls',
+        },
+    }
+    
+    # URL sets that metrics look up in other exports: the export and columns each is built from
+    URL_SETS = {
+        "sitemap_urls": {'file': 'sitemap_all.csv', 'columns': ['Address']},
+        "crawled_urls": {'file': 'internal_all.csv', 'columns': ['Address']},
+        "non_indexable_urls": {'file': 'internal_all.csv', 'columns': ['Address', 'Indexability']},
+    }
+    
+    # Compact dtypes for the columns above (everything else stays as strings)
+    COLUMN_DTYPES = {
+        'Status Code': 'Int16',
+        'Title 1 Length': 'Int32',
+        'Meta Description 1 Length': 'Int32',
+        'Size (Bytes)': 'Int64',
+        'Indexability': 'category',
+        'Indexability Status': 'category',
+        'Content Type': 'category',
+    }
+    
+    # Limits of the length and size metrics - defaults, which rules files can override per audit (see AuditRules)
+    THRESHOLDS = {
+        'title_max_length': 60,
+        'title_min_length': 30,
+        'meta_description_max_length': 160,
+        'meta_description_min_length': 120,
+        'image_max_bytes': 100000,
+        # Estimated word-set (Jaccard) similarity at which texts count as duplicates; 1 = identical texts only
+        'near_duplicate_similarity': 1.0,
+    }
+    
+    def __init__(self, df, context=None, sample_rows=None, thresholds=None):
+        self.df = df
+        # Provides URL sets built from other exports (see TechAuditProcessor.get_url_set)
+        self.context = context
+        # Pool workers have no context, so their thresholds are passed in
+        self.thresholds = thresholds or getattr(context, 'thresholds', None) or self.THRESHOLDS
+        self._shared = {}
+        # Seconds spent on each metric by compute
+        self.timings = {}
+        # With sample_rows, compute also keeps up to that many of the rows each metric counts
+        self.sample_rows = sample_rows
+        self.samples = {}
+    
+    @classmethod
+    def declared(cls, calculation_types, field):
+        """Union of a registry field over the given metrics, in a stable order"""
+        values = []
+        for calculation_type in calculation_types:
+            for value in cls.METRICS.get(calculation_type, {}).get(field, []):
+                if value not in values:
+                    values.append(value)
+        return values
+    
+    @classmethod
+    def required_columns(cls, calculation_types):
+        """Columns needed to compute the given metrics, in a stable order"""
+        return cls.declared(calculation_types, 'columns')
+    
+    @classmethod
+    def references_for(cls, calculation_types):
+        """URL sets looked up by the given metrics"""
+        return cls.declared(calculation_types, 'references')
+    
+    @classmethod
+    def duplicate_column(cls, calculation_type):
+        return cls.METRICS.get(calculation_type, {}).get('duplicates')
+    
+    @classmethod
+    def graph_method(cls, calculation_type):
+        return cls.METRICS.get(calculation_type, {}).get('graph')
+    
+    @classmethod
+    def needs_whole_crawl(cls, calculation_type):
+        """Whether a metric depends on other exports or on the whole crawl, so it can only run after loading"""
+        spec = cls.METRICS.get(calculation_type, {})
+        return bool(spec.get('references') or spec.get('graph'))
+    
+    @classmethod
+    def schedule(cls, calculation_types):
+        """Order metrics so those sharing intermediates run together
+        
+        Returns the ordered metrics and, per metric, the intermediates whose last
+        user it is, which can be dropped once it has been computed.
+        """
+        remaining = list(calculation_types)
+        ordered = []
+        for intermediate in cls.declared(remaining, 'uses'):
+            for calculation_type in list(remaining):
+                if intermediate in cls.METRICS.get(calculation_type, {}).get('uses', []):
+                    ordered.append(calculation_type)
+                    remaining.remove(calculation_type)
+        ordered.extend(remaining)
+        
+        last_use = {}
+        for calculation_type in ordered:
+            for intermediate in cls.METRICS.get(calculation_type, {}).get('uses', []):
+                last_use[intermediate] = calculation_type
+        release = {calculation_type: [] for calculation_type in ordered}
+        for intermediate, calculation_type in last_use.items():
+            release[calculation_type].append(intermediate)
+        return ordered, release
+    
+    def has(self, *columns):
+        """Check that all the given columns exist in the export"""
+        return all(column in self.df.columns for column in columns)
+    
+    def shared(self, key, builder):
+        """Return a cached intermediate, building it on first use"""
+        if key not in self._shared:
+            self._shared[key] = builder()
+        return self._shared[key]
+    
+    def numeric(self, column):
+        """Column coerced to floats (missing and non-numeric values become NaN)"""
+        return self.shared(
+            ("numeric", column),
+            lambda: pd.to_numeric(self.df[column], errors='coerce').astype('float64')
+        )
+    
+    def blank(self, column):
+        """Rows where the column is missing or an empty string"""
+        return self.shared(("blank", column), lambda: self.df[column].isna() | (self.df[column] == ''))
+    
+    def contains(self, column, text):
+        """Case-insensitive substring match, False for missing values"""
+        return self.shared(
+            ("contains", column, text),
+            lambda: self.df[column].str.contains(text, na=False, case=False, regex=False)
+        )
+    
+    def html(self):
+        """Rows serving HTML (all rows if the export has no Content Type column)"""
+        def build():
+            if 'Content Type' in self.df.columns:
+                return self.df['Content Type'].str.contains('text/html', na=False, regex=False)
+            return pd.Series(True, index=self.df.index)
+        return self.shared("html", build)
+    
+    def all_rows(self):
+        return self.shared("all", lambda: pd.Series(True, index=self.df.index))
+    
+    def duplicated(self, column):
+        """Non-empty values that appear more than once - or, below a near_duplicate_similarity
+        of 1, that are near-duplicates of another row's value"""
+        def build():
+            similarity = self.thresholds['near_duplicate_similarity']
+            positions, codes, values, hashes = self.distinct_values(column)
+            if similarity >= 1:
+                # Rows are counted per value hash, as DuplicateFinder counts streamed chunks
+                _, hash_codes = np.unique(hashes, return_inverse=True)
+                row_codes = hash_codes[codes]
+                rows_repeated = np.bincount(row_codes)[row_codes] > 1
+            else:
+                finder = DuplicateFinder(similarity)
+                finder.add(hashes, np.bincount(codes, minlength=len(hashes)), values)
+                rows_repeated = pd.Index(hashes).isin(finder.duplicated_hashes())[codes]
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[positions] = rows_repeated
+            return pd.Series(mask, index=self.df.index)
+        return self.shared(("duplicated", column), build)
+    
+    def distinct_values(self, column):
+        """(positions of the non-empty rows, each one's code, the distinct values, their 64-bit hashes)
+        
+        Each distinct value is hashed once however often it repeats, and rows are
+        matched through integer codes rather than by comparing strings.
+        """
+        positions = np.flatnonzero(~self.blank(column).to_numpy(dtype=bool, na_value=True))
+        codes, values = pd.factorize(self.df[column].iloc[positions])
+        values = values.to_numpy(dtype=object)
+        return positions, codes, values, pd.util.hash_array(values, categorize=False)
+    
+    def value_hashes(self, column):
+        """64-bit hashes of the non-empty values of a column"""
+        positions, codes, values, hashes = self.distinct_values(column)
+        return pd.Series(hashes[codes], index=self.df.index[positions])
+    
+    def url_part(self, column, part):
+        """A parsed component of the URLs in a column ("scheme", "netloc" or "hostname"), '' where missing
+        
+        Components are derived once per column and shared by every metric that needs them.
+        """
+        parts = self.shared(("url_parts", column), lambda: url_components(self.df[column]))
+        return parts[part]
+    
+    def url_hashes(self, column):
+        """Hashes of the normalized non-empty URLs of a column"""
+        return self.shared(("url_hashes", column), lambda: url_hashes(self.df[column]))
+    
+    def has_url(self, column):
+        """Rows with a URL in the column"""
+        return self.shared(
+            ("has_url", column),
+            lambda: pd.Series(self.df.index.isin(self.url_hashes(column).index), index=self.df.index)
+        )
+    
+    def in_url_set(self, column, name):
+        """Rows whose URL is in a URL set from another export, or None if that export wasn't loaded"""
+        url_set = self.context.get_url_set(name) if self.context is not None else None
+        if url_set is None:
+            return None
+        found = url_set.contains(self.url_hashes(column))
+        return found.reindex(self.df.index, fill_value=False)
+    
+    def same_url(self, column, other):
+        """Rows where two URL columns hold the same URL once normalized"""
+        def build():
+            hashes = self.url_hashes(column)
+            other_hashes = self.url_hashes(other).reindex(hashes.index, fill_value=0)
+            return (hashes == other_hashes).reindex(self.df.index, fill_value=False)
+        return self.shared(("same_url", column, other), build)
+    
+    def reference_urls(self, name):
+        """URLs of this export that belong to a URL set (see URL_SETS)"""
+        return getattr(self, f"_urls_{name}")()
+    
+    def mask(self, calculation_type):
+        """Boolean mask of the rows counted by a metric, or None if it can't be computed"""
+        builder = getattr(self, f"_mask_{calculation_type}", None)
+        if builder is None:
+            return None
+        return builder()
+    
+    def compute(self, calculation_types):
+        """Count the rows matched by each metric"""
+        ordered, release = self.schedule(calculation_types)
+        progress = getattr(self.context, 'progress', None)
+        results = {}
+        for calculation_type in ordered:
+            if progress is not None:
+                progress.check()
+            started = time.perf_counter()
+            try:
+                mask = self.mask(calculation_type)
+                results[calculation_type] = int(mask.sum()) if mask is not None else 0
+                if self.sample_rows and results[calculation_type]:
+                    self.samples[calculation_type] = self.sample(calculation_type, mask, self.sample_rows)
+            except Exception as e:
+                print(f"Error calculating {calculation_type}: {str(e)}")
+                results[calculation_type] = 0
+            
+            # Free intermediates no later metric needs
+            for intermediate in release[calculation_type]:
+                self._shared.pop(intermediate, None)
+            self.timings[calculation_type] = time.perf_counter() - started
+        return {calculation_type: results[calculation_type] for calculation_type in calculation_types}
+    
+    def sample(self, calculation_type, mask, limit):
+        """The first rows (up to limit) of a metric's mask, with Address and the columns the metric reads"""
+        positions = mask.to_numpy(dtype=bool, na_value=False).nonzero()[0][:limit]
+        columns = [column for column in dict.fromkeys(['Address'] + self.required_columns([calculation_type]))
+                   if column in self.df.columns]
+        return self.df.iloc[positions][columns].reset_index(drop=True)
+    
+    # SITEMAP METRICS
+    def _mask_non_200_in_sitemap(self):
+        if self.has('Status Code'):
+            return self.numeric('Status Code') != 200
+    
+    def _mask_non_indexable_in_sitemap(self):
+        if self.has('Indexability'):
+            return self.df['Indexability'] != 'Indexable'
+    
+    def _mask_urls_not_in_sitemap(self):
+        if self.has('Address'):
+            in_sitemap = self.in_url_set('Address', 'sitemap_urls')
+            if in_sitemap is None:
+                return None
+            # Only indexable HTML pages are expected in the sitemap
+            candidates = self.html() & self.has_url('Address')
+            if self.has('Indexability'):
+                candidates &= self.df['Indexability'] == 'Indexable'
+            return candidates & ~in_sitemap
+    
+    # CANONICAL METRICS
+    def _mask_missing_canonical(self):
+        if self.has('Canonical Link Element 1'):
+            # Only count HTML pages
+            return self.html() & self.df['Canonical Link Element 1'].isna()
+    
+    def _mask_canonicalised_pages(self):
+        if self.has('Canonical Link Element 1', 'Address'):
+            canonical = self.df['Canonical Link Element 1']
+            return canonical.notna() & (canonical != self.df['Address'])
+    
+    def _mask_canonical_different_domain(self):
+        if self.has('Canonical Link Element 1', 'Address'):
+            page_domain = self.url_part('Address', 'netloc')
+            canonical_domain = self.url_part('Canonical Link Element 1', 'netloc')
+            return (
+                self.df['Canonical Link Element 1'].notna() &
+                (page_domain != canonical_domain) &
+                (canonical_domain != '')
+            )
+    
+    def _mask_non_indexable_canonical(self):
+        if self.has('Canonical Link Element 1', 'Address'):
+            non_indexable = self.in_url_set('Canonical Link Element 1', 'non_indexable_urls')
+            if non_indexable is not None:
+                # Canonicalised elsewhere, to a URL the crawl found non-indexable
+                return non_indexable & ~self.same_url('Canonical Link Element 1', 'Address')
+    
+    def _mask_missing_canonical_urls(self):
+        if self.has('Canonical Link Element 1'):
+            crawled = self.in_url_set('Canonical Link Element 1', 'crawled_urls')
+            if crawled is not None:
+                # Canonical targets that never turned up in the crawl
+                return self.has_url('Canonical Link Element 1') & ~crawled
+    
+    # URL SETS
+    def _urls_sitemap_urls(self):
+        return self.df['Address']
+    
+    def _urls_crawled_urls(self):
+        return self.df['Address']
+    
+    def _urls_non_indexable_urls(self):
+        return self.df['Address'][self.df['Indexability'] != 'Indexable']
+    
+    # CRAWLABILITY METRICS
+    def _mask_pages_with_noindex(self):
+        if self.has('Meta Robots 1'):
+            return self.contains('Meta Robots 1', 'noindex')
+    
+    def _mask_pages_with_nofollow(self):
+        if self.has('Meta Robots 1'):
+            return self.contains('Meta Robots 1', 'nofollow')
+    
+    def _mask_robots_txt_blocked(self):
+        if self.has('Indexability'):
+            return self.contains('Indexability', 'Blocked by robots.txt')
+    
+    # PAGE TITLE METRICS
+    def _mask_missing_page_titles(self):
+        if self.has('Title 1'):
+            return self.blank('Title 1')
+    
+    def _mask_duplicate_page_titles(self):
+        if self.has('Title 1'):
+            return self.duplicated('Title 1')
+    
+    def _mask_long_page_titles(self):
+        if self.has('Title 1 Length'):
+            return self.numeric('Title 1 Length') > self.thresholds['title_max_length']
+    
+    def _mask_short_page_titles(self):
+        if self.has('Title 1 Length'):
+            length = self.numeric('Title 1 Length')
+            return (length < self.thresholds['title_min_length']) & (length > 0)
+    
+    # META DESCRIPTION METRICS
+    def _mask_missing_meta_descriptions(self):
+        if self.has('Meta Description 1'):
+            return self.blank('Meta Description 1')
+    
+    def _mask_duplicate_meta_descriptions(self):
+        if self.has('Meta Description 1'):
+            return self.duplicated('Meta Description 1')
+    
+    def _mask_long_meta_descriptions(self):
+        if self.has('Meta Description 1 Length'):
+            return self.numeric('Meta Description 1 Length') > self.thresholds['meta_description_max_length']
+    
+    def _mask_short_meta_descriptions(self):
+        if self.has('Meta Description 1 Length'):
+            length = self.numeric('Meta Description 1 Length')
+            return (length < self.thresholds['meta_description_min_length']) & (length > 0)
+    
+    # H1 METRICS
+    def _mask_missing_h1(self):
+        if self.has('H1-1'):
+            return self.blank('H1-1')
+    
+    def _mask_duplicate_h1(self):
+        if self.has('H1-1'):
+            return self.duplicated('H1-1')
+    
+    def _mask_multiple_h1(self):
+        if self.has('H1-2'):
+            return self.df['H1-2'].notna()
+    
+    # IMAGE METRICS
+    def _mask_images_missing_alt(self):
+        if self.has('Alt Text'):
+            return self.blank('Alt Text')
+    
+    def _mask_images_over_100kb(self):
+        if self.has('Size (Bytes)'):
+            return self.numeric('Size (Bytes)') > self.thresholds['image_max_bytes']
+    
+    def _mask_broken_images(self):
+        if self.has('Status Code'):
+            return self.numeric('Status Code') != 200
+    
+    # RESPONSE CODE METRICS
+    def _mask_client_4xx_errors(self):
+        if self.has('Status Code'):
+            status = self.numeric('Status Code')
+            return (status >= 400) & (status < 500)
+    
+    def _mask_server_5xx_errors(self):
+        if self.has('Status Code'):
+            return self.numeric('Status Code') >= 500
+    
+    def _mask_status_404_count(self):
+        if self.has('Status Code'):
+            return self.numeric('Status Code') == 404
+    
+    # REDIRECT METRICS
+    def _mask_redirect_chains(self):
+        # Every row of the redirect chains export is a chain
+        return self.all_rows()
+    
+    def _mask_redirect_loops(self):
+        # Every row of the redirect loops export is a loop
+        return self.all_rows()
+    
+    def _mask_temporary_redirects(self):
+        if self.has('Status Code'):
+            return self.numeric('Status Code').isin([302, 307])
+
+
+class MetricAccumulator:
+    """Fold metric results from successive chunks of one export into running totals
+    
+    Row counts are summed per chunk. Duplicate metrics feed each chunk's distinct
+    values to a DuplicateFinder that carries across chunks, so a value is counted as
+    duplicated even when its occurrences land in different chunks.
+    """
+    
+    def __init__(self, calculation_types, context=None, sample_rows=None, thresholds=None):
+        self.calculation_types = list(calculation_types)
+        self.context = context
+        self.thresholds = thresholds
+        # Rows kept per metric (see MetricEngine.sample) until sample_rows have been seen;
+        # duplicate metrics only know their matches once every chunk is in, so they keep none
+        self.sample_rows = sample_rows
+        self.samples = {}
+        self.counts = dict.fromkeys(self.calculation_types, 0)
+        self.timings = dict.fromkeys(self.calculation_types, 0.0)
+        self.duplicates = {}
+        self.rows = 0
+        self.chunks = 0
+    
+    def add(self, df):
+        """Add one chunk of the export"""
+        engine = MetricEngine(df, self.context, self.sample_rows if self._sampling() else None, self.thresholds)
+        additive = [c for c in self.calculation_types if not MetricEngine.duplicate_column(c)]
+        for calculation_type, count in engine.compute(additive).items():
+            self.counts[calculation_type] += count
+            self.timings[calculation_type] += engine.timings[calculation_type]
+        for calculation_type, sample in engine.samples.items():
+            kept = self.samples.get(calculation_type)
+            if kept is None:
+                self.samples[calculation_type] = sample
+            elif len(kept) < self.sample_rows:
+                self.samples[calculation_type] = pd.concat([kept, sample.iloc[:self.sample_rows - len(kept)]],
+                                                           ignore_index=True)
+        
+        for calculation_type in self.calculation_types:
+            column = MetricEngine.duplicate_column(calculation_type)
+            if column and engine.has(column):
+                started = time.perf_counter()
+                finder = self.duplicates.setdefault(
+                    calculation_type, DuplicateFinder(engine.thresholds['near_duplicate_similarity']))
+                positions, codes, values, hashes = engine.distinct_values(column)
+                finder.add(hashes, np.bincount(codes, minlength=len(hashes)), values)
+                self.timings[calculation_type] += time.perf_counter() - started
+        
+        self.rows += len(df)
+        self.chunks += 1
+    
+    def _sampling(self):
+        """Whether some metric still has fewer sample rows than wanted"""
+        if not self.sample_rows:
+            return False
+        return any(len(self.samples.get(c, ())) < self.sample_rows
+                   for c in self.calculation_types if not MetricEngine.duplicate_column(c))
+    
+    def results(self):
+        """Final metric totals"""
+        results = dict(self.counts)
+        for calculation_type in self.calculation_types:
+            if MetricEngine.duplicate_column(calculation_type):
+                finder = self.duplicates.get(calculation_type)
+                results[calculation_type] = finder.duplicate_count() if finder is not None else 0
+        return results
+
+
+# Near-duplicate detection (see DuplicateFinder): each text is reduced to the set of its words' 64-bit
+# hashes. MinHash signatures of those sets, compared in LSH bands, propose candidate pairs, and a
+# pair counts only when the exact similarity (Jaccard index) of its two word sets reaches the threshold
+MINHASH_PERMUTATIONS = 32
+# Odd multipliers and offsets of the multiply-shift hashes standing in for random permutations
+MINHASH_SEEDS = [((2 * index + 1) * 0x9E3779B97F4A7C15 % 2 ** 64 | 1, index * 0xD1B54A32D192ED03 % 2 ** 64)
+                 for index in range(MINHASH_PERMUTATIONS)]
+WORD_PATTERN = re.compile(r"\w+|\x1f")
+# Candidate pairs whose word sets are compared at a time
+SIMILARITY_BATCH_PAIRS = 1000000
+
+
+def mix64(values):
+    """splitmix64 finalizer over a uint64 array: a cheap hash that spreads every input bit"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def segment_positions(starts, lengths):
+    """Positions of the given (start, length) segments of a flat array, one after the other"""
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+def word_sets(texts):
+    """(word hashes, set sizes) of the texts: each text's distinct word hashes, one text after the other
+    
+    Words are lowercased runs of letters and digits, so case, punctuation, separators
+    and word order don't matter. All texts are split in one regex pass and every word
+    is hashed once. A text without words is its own single word.
+    """
+    texts = [str(text).replace("\x1f", " ") for text in texts]
+    if not texts:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    
+    # "\x1f" closes each text; a text without words stands in for the separator that closed it
+    tokens = np.array(WORD_PATTERN.findall("\x1f".join(texts).casefold() + "\x1f"), dtype=object)
+    separators = np.flatnonzero(tokens == "\x1f")
+    lengths = np.diff(separators, prepend=-1) - 1
+    empty = np.flatnonzero(lengths == 0)
+    tokens[separators[empty]] = np.array(texts, dtype=object)[empty]
+    kept = np.ones(len(tokens), dtype=bool)
+    kept[np.delete(separators, empty)] = False
+    words = pd.util.hash_array(tokens[kept], categorize=False)
+    owners = np.repeat(np.arange(len(texts)), np.maximum(lengths, 1))
+    
+    # Drop words repeated within a text
+    order = np.lexsort((words, owners))
+    words, owners = words[order], owners[order]
+    distinct = np.r_[True, (words[1:] != words[:-1]) | (owners[1:] != owners[:-1])]
+    return words[distinct], np.bincount(owners[distinct], minlength=len(texts))
+
+
+def take_word_sets(sets, rows):
+    """The word sets of the given rows, in that order"""
+    words, lengths = sets
+    starts = np.cumsum(lengths) - lengths
+    return words[segment_positions(starts[rows], lengths[rows])], lengths[rows]
+
+
+def minhash_signatures(sets):
+    """MinHash signatures (one uint32 row of MINHASH_PERMUTATIONS per set) of word sets
+    
+    Each permutation is a multiply-shift of the word hashes with a per-set minimum.
+    """
+    words, lengths = sets
+    signatures = np.empty((len(lengths), MINHASH_PERMUTATIONS), dtype=np.uint32)
+    if not len(lengths):
+        return signatures
+    starts = np.cumsum(lengths) - lengths
+    for permutation, (multiplier, offset) in enumerate(MINHASH_SEEDS):
+        lowest = np.minimum.reduceat(words * np.uint64(multiplier) + np.uint64(offset), starts)
+        signatures[:, permutation] = (lowest >> np.uint64(32)).astype(np.uint32)
+    return signatures
+
+
+def word_set_similarity(sets, left, right):
+    """Exact Jaccard index of the word sets of each (left, right) pair of rows"""
+    words, lengths = sets
+    starts = np.cumsum(lengths) - lengths
+    pairs = np.arange(len(left))
+    positions = np.concatenate([segment_positions(starts[left], lengths[left]),
+                                segment_positions(starts[right], lengths[right])])
+    owners = np.concatenate([np.repeat(pairs, lengths[left]), np.repeat(pairs, lengths[right])])
+    
+    # Sets hold distinct words, so a word both sets of a pair share shows up twice for that pair
+    order = np.lexsort((words[positions], owners))
+    pair_words, owners = words[positions][order], owners[order]
+    shared = (pair_words[1:] == pair_words[:-1]) & (owners[1:] == owners[:-1])
+    intersection = np.bincount(owners[1:][shared], minlength=len(left))
+    return intersection / (lengths[left] + lengths[right] - intersection)
+
+
+def lsh_band_rows(similarity):
+    """Signature rows per LSH band: the most (fewest false candidates) that still make a pair at the
+    similarity a candidate in at least one band 95% of the time"""
+    fitting = [rows for rows in (1, 2, 4, 8, 16, 32)
+               if 1 - (1 - similarity ** rows) ** (MINHASH_PERMUTATIONS // rows) >= 0.95]
+    return max(fitting, default=1)
+
+
+def near_duplicate_pairs(sets, similarity):
+    """Whether each word set has a near-duplicate: another whose exact similarity reaches the threshold
+    
+    Within each LSH band, signatures with equal band values form a bucket, and each
+    member is paired with the bucket's first member and with the member before it,
+    so the work grows linearly with the number of texts. Every distinct candidate
+    pair is then checked on its exact word sets; only the two ends of a pair that
+    passes are flagged. Pairs are not chained, so A ~ B and B ~ C don't make A a
+    duplicate of C.
+    """
+    words, lengths = sets
+    count = len(lengths)
+    flagged = np.zeros(count, dtype=bool)
+    signatures = minhash_signatures(sets)
+    rows = lsh_band_rows(similarity)
+    candidates = []
+    for start in range(0, MINHASH_PERMUTATIONS, rows):
+        keys = np.zeros(count, dtype=np.uint64)
+        for column in range(start, start + rows):
+            keys = mix64(keys ^ signatures[:, column].astype(np.uint64))
+        # Members in bucket order, each with its bucket's first member and the member before it
+        codes, _ = pd.factorize(keys)
+        order = np.argsort(codes, kind='stable')
+        same_bucket = np.r_[False, codes[order][1:] == codes[order][:-1]]
+        first = order[np.maximum.accumulate(np.where(same_bucket, 0, np.arange(count)))]
+        previous = np.r_[order[:1], order[:-1]]
+        for partners in (first, previous):
+            paired = same_bucket & (partners != order)
+            left, right = order[paired], partners[paired]
+            candidates.append(np.minimum(left, right).astype(np.int64) * count + np.maximum(left, right))
+    if not candidates:
+        return flagged
+    
+    pairs = np.unique(np.concatenate(candidates))
+    left, right = pairs // count, pairs % count
+    # Sets of very different sizes can't reach the threshold
+    possible = np.minimum(lengths[left], lengths[right]) >= similarity * np.maximum(lengths[left], lengths[right])
+    left, right = left[possible], right[possible]
+    for batch in range(0, len(left), SIMILARITY_BATCH_PAIRS):
+        batch_left, batch_right = left[batch:batch + SIMILARITY_BATCH_PAIRS], right[batch:batch + SIMILARITY_BATCH_PAIRS]
+        verified = word_set_similarity(sets, batch_left, batch_right) >= similarity
+        flagged[batch_left[verified]] = True
+        flagged[batch_right[verified]] = True
+    return flagged
+
+
+class DuplicateFinder:
+    """Find repeated text values across one or more chunks of an export, by 64-bit hash
+    
+    Chunks are added as their distinct values' hashes and row counts (see
+    MetricEngine.distinct_values); the frequency tables are merged once they outgrow
+    the running table, keeping merges amortised. Below a similarity of 1 each
+    distinct value's word set (see word_sets) is kept too, and a value with a
+    near-duplicate (see near_duplicate_pairs) counts as duplicated, so titles
+    differing only in case, punctuation or word order count as duplicates.
+    """
+    
+    def __init__(self, similarity=1.0):
+        self.similarity = similarity
+        self.near = similarity < 1
+        self.counts = None
+        self.word_sets = None
+        self._pending = []
+        self._pending_word_sets = []
+        self._repeated = None
+    
+    def add(self, hashes, counts, values=None):
+        """Add distinct value hashes with their row counts (and the values themselves, for near-duplicates)"""
+        self._pending.append(pd.Series(counts, index=hashes))
+        if self.near:
+            self._pending_word_sets.append((hashes,) + word_sets(values))
+        self._repeated = None
+        if sum(len(counts) for counts in self._pending) > max(len(self.counts) if self.counts is not None else 0, 100000):
+            self._consolidate()
+    
+    def _consolidate(self):
+        if not self._pending:
+            return
+        tables = self._pending + ([self.counts] if self.counts is not None else [])
+        self.counts = pd.concat(tables).groupby(level=0).sum()
+        self._pending = []
+        if self.near:
+            # Keep one word set per distinct value, ordered by value hash
+            parts = self._pending_word_sets + ([self.word_sets] if self.word_sets is not None else [])
+            hashes = np.concatenate([part[0] for part in parts])
+            sets = (np.concatenate([part[1] for part in parts]), np.concatenate([part[2] for part in parts]))
+            _, first = np.unique(hashes, return_index=True)
+            self.word_sets = (hashes[first],) + take_word_sets(sets, first)
+            self._pending_word_sets = []
+    
+    def repeated(self):
+        """Which of the distinct values in counts are duplicated"""
+        self._consolidate()
+        if self._repeated is None and self.counts is not None:
+            counts = self.counts.to_numpy()
+            if self.near:
+                hashes, words, lengths = self.word_sets
+                rows = np.searchsorted(hashes, self.counts.index.to_numpy())
+                self._repeated = (counts > 1) | near_duplicate_pairs(take_word_sets((words, lengths), rows),
+                                                                     self.similarity)
+            else:
+                self._repeated = counts > 1
+        return self._repeated
+    
+    def duplicated_hashes(self):
+        """Hashes of the values that are duplicated"""
+        repeated = self.repeated()
+        return self.counts.index[repeated] if repeated is not None else pd.Index([], dtype='uint64')
+    
+    def duplicate_count(self):
+        """Rows holding a duplicated value"""
+        repeated = self.repeated()
+        return int(self.counts.to_numpy()[repeated].sum()) if repeated is not None else 0
+
+
+# Ports dropped from URLs because they are the scheme's default
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+
+def normalize_url_values(values):
+    """Normalize distinct URL strings so that equivalent spellings compare equal
+    
+    Scheme and host are lowercased, default ports (:80 for http, :443 for https),
+    fragments, empty queries and trailing slashes are dropped. Paths keep their case
+    since servers may treat it as significant. Hosts repeat across a crawl, so each
+    distinct scheme://host is normalized once.
+    """
+    prefixes = {}
+    normalized = []
+    for url in values:
+        url = str(url).strip().partition('#')[0]
+        url, _, query = url.partition('?')
+        
+        start = url.find('//')
+        if start >= 0:
+            end = url.find('/', start + 2)
+            if end < 0:
+                end = len(url)
+            prefix = prefixes.get(url[:end])
+            if prefix is None:
+                prefix = url[:end].lower()
+                port = DEFAULT_PORTS.get(prefix[:max(start - 1, 0)])
+                if port and prefix.endswith(port):
+                    prefix = prefix[:-len(port)]
+                prefixes[url[:end]] = prefix
+            url = prefix + url[end:].rstrip('/')
+        else:
+            url = url.rstrip('/')
+        
+        normalized.append(url + '?' + query if query else url)
+    return pd.Series(normalized, dtype=object).to_numpy()
+
+
+def url_prefix(url):
+    """The start of a URL up to the path, which is all its scheme and netloc depend on"""
+    end = url.find('/', url.find('//') + 2)
+    return url if end < 0 else url[:end]
+
+
+def url_components(urls):
+    """Scheme, netloc and hostname of every URL, as {component: Series} aligned with urls
+    
+    Only the distinct scheme://netloc prefixes are parsed - a crawl has a handful
+    of hosts however many URLs it has - and rows share the parsed strings rather
+    than getting copies. Missing or unparseable URLs get ''.
+    """
+    codes, uniques = pd.factorize(urls)
+    # Loop over plain Python strings, also for pyarrow-backed columns (see ArrowExportStore)
+    uniques = uniques.to_numpy(dtype=object)
+    prefix_codes, prefixes = pd.factorize(pd.Series([url_prefix(str(url)) for url in uniques], dtype=object))
+    # Row -> prefix code; the trailing -1 keeps missing values (code -1) missing
+    codes = pd.Series([*prefix_codes, -1], dtype='int64').to_numpy()[codes]
+    
+    parsed = {'scheme': [], 'netloc': [], 'hostname': []}
+    for prefix in prefixes:
+        try:
+            split = urlsplit(prefix)
+            scheme, netloc, hostname = split.scheme, split.netloc, split.hostname or ''
+        except ValueError:
+            scheme = netloc = hostname = ''
+        parsed['scheme'].append(scheme)
+        parsed['netloc'].append(netloc)
+        parsed['hostname'].append(hostname)
+    
+    components = {}
+    for part, values in parsed.items():
+        # The trailing '' is what missing values (code -1) pick up
+        values = pd.Series(values + [''], dtype=object).to_numpy()
+        components[part] = pd.Series(values[codes], index=urls.index)
+    return components
+
+
+def url_hashes(urls):
+    """64-bit hashes of normalized URLs, for the non-empty values only (keeping their index)
+    
+    Each distinct URL is normalized and hashed once, however often it repeats.
+    """
+    codes, uniques = pd.factorize(urls)
+    # Loop over plain Python strings, also for pyarrow-backed columns (see ArrowExportStore)
+    uniques = uniques.to_numpy(dtype=object)
+    normalized = normalize_url_values(uniques)
+    hashes = pd.util.hash_array(normalized, categorize=False)
+    
+    keep = codes >= 0
+    keep[keep] = (normalized != '')[codes[keep]]
+    return pd.Series(hashes[codes[keep]], index=urls.index[keep])
+
+
+class UrlSet:
+    """Set of normalized URLs held as 64-bit hashes, for joins between exports
+    
+    Membership is tested against a hash table, so matching a multi-million-row
+    export against another takes linear time. URLs can be added in chunks when an
+    export is streamed.
+    """
+    
+    def __init__(self):
+        self._parts = []
+        self._index = None
+    
+    def update(self, urls):
+        """Add a Series of URLs"""
+        self._parts.append(url_hashes(urls).drop_duplicates())
+        self._index = None
+    
+    @property
+    def index(self):
+        if self._index is None:
+            hashes = pd.concat(self._parts).unique() if self._parts else []
+            self._index = pd.Index(hashes, dtype='uint64')
+            self._parts = [pd.Series(self._index)]
+        return self._index
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def contains(self, hashes):
+        """Which of the given URL hashes (see url_hashes) are in the set"""
+        return hashes.isin(self.index)
+
+
+class RedirectGraph:
+    """Redirects of a crawl as a graph over integer-encoded URLs
+    
+    Built from internal_all.csv (Address -> Redirect URL on 3xx rows). Every URL
+    redirects to at most one other, so the graph is held as a numpy array of
+    next-node codes, and pointer jumping over it gives each redirecting URL the
+    number of hops to its final destination, or marks it as caught in a loop, in
+    log2(URLs) vectorised passes.
+    """
+    
+    COLUMNS = ['Address', 'Redirect URL', 'Status Code']
+    
+    # hops value of redirects that never reach a final destination
+    LOOP = -2
+    
+    def __init__(self):
+        self._sources = []
+        self._targets = []
+        self.nodes = None
+        self.next = None
+        self.targeted = None
+        self.hops = None
+        self.loops = 0
+    
+    def add(self, df):
+        """Add the redirects of a frame (or chunk) holding COLUMNS"""
+        status = pd.to_numeric(df['Status Code'], errors='coerce')
+        redirects = df[(status >= 300) & (status < 400)]
+        sources = url_hashes(redirects['Address'])
+        targets = url_hashes(redirects['Redirect URL'])
+        sources, targets = sources.align(targets, join='inner')
+        self._sources.append(sources)
+        self._targets.append(targets)
+        self.nodes = None
+    
+    def build(self):
+        """Encode the URLs as integers and walk the graph"""
+        empty = pd.Series([], dtype='uint64')
+        sources = pd.concat(self._sources or [empty], ignore_index=True)
+        targets = pd.concat(self._targets or [empty], ignore_index=True)
+        codes, self.nodes = pd.factorize(pd.concat([sources, targets], ignore_index=True))
+        source_codes, target_codes = codes[:len(sources)], codes[len(sources):]
+        
+        # Index array of next nodes; a URL listed twice keeps its last redirect, -1 where it doesn't redirect
+        last = len(source_codes) - 1 - np.unique(source_codes[::-1], return_index=True)[1]
+        next_node = np.full(len(self.nodes), -1, dtype='int64')
+        next_node[source_codes[last]] = target_codes[last]
+        self.next = next_node
+        self.targeted = pd.Series(False, index=range(len(self.nodes)))
+        # Only the redirects kept count - a target whose only edge was replaced can still start a chain
+        self.targeted.iloc[pd.unique(target_codes[last])] = True
+        self.hops, self.loops = self._walk(next_node)
+        return self
+    
+    @classmethod
+    def _walk(cls, next_node):
+        """Hops to the final destination for every node, and the number of distinct loops
+        
+        Pointer jumping over numpy index arrays: each round every node adds the hop count
+        of the node it points at and then points at that node's target, doubling how far
+        it has looked, so log2(nodes) rounds reach the end of every path. Nodes that
+        redirect nowhere point at an extra sink node; whatever hasn't reached it by then
+        is in a loop, or leads into one.
+        """
+        count = len(next_node)
+        sink = count
+        jump = np.append(np.where(next_node < 0, sink, next_node), sink)
+        hops = np.append(np.ones(count, dtype='int64'), 0)
+        # Lowest node seen ahead of each node, which names the loop a looping node is on
+        lowest = np.arange(count + 1)
+        
+        for _ in range((count + 1).bit_length()):
+            hops += hops[jump]
+            lowest = np.minimum(lowest, lowest[jump])
+            jump = jump[jump]
+        
+        looping = jump[:count] != sink
+        # After the last round every looping node points at a node on its loop, whose
+        # lowest node is the same for the whole loop
+        loops = len(np.unique(lowest[jump[:count][looping]]))
+        hops = np.where(looping, cls.LOOP, hops[:count] - 1)
+        return pd.Series(hops, dtype='int64'), loops
+    
+    def chain_heads(self):
+        """Hops of every redirect chain (2+ hops, ending at a final destination), keyed by node
+        
+        Chains are counted once from their first URL, not again from each URL along them.
+        """
+        heads = (self.hops >= 2) & ~self.targeted
+        return self.hops[heads]
+    
+    def chain_count(self):
+        return len(self.chain_heads())
+    
+    def chain_head_urls(self):
+        """Hashes of the first URL of every redirect chain"""
+        return pd.Index(self.nodes[self.chain_heads().index.to_numpy()], dtype='uint64')
+    
+    def loop_urls(self):
+        """Hashes of every URL caught in a redirect loop"""
+        return pd.Index(self.nodes[(self.hops == self.LOOP).to_numpy()], dtype='uint64')
+    
+    def loop_count(self):
+        return self.loops
+
+
+def import_feather():
+    """pyarrow.feather if pyarrow is installed, else None"""
+    try:
+        import pyarrow.feather as feather
+        return feather
+    except ImportError:
+        return None
+
+
+def arrow_string_dtype(arrow_type):
+    """Table.to_pandas types_mapper keeping Arrow text columns as pyarrow-backed strings, without copying them"""
+    import pyarrow
+    if pyarrow.types.is_string(arrow_type) or pyarrow.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def csv_read_options(columns, strict=True):
+    """pd.read_csv keyword arguments projecting an export to the given columns
+    
+    With strict=False numeric columns are parsed as text so that unexpected values
+    don't abort the read; coerce_numeric_columns converts them afterwards.
+    """
+    if not columns:
+        # Nothing reads individual columns (e.g. row-count metrics) - keep one column for the row count
+        return {'usecols': [0], 'low_memory': False}
+    
+    wanted = set(columns)
+    dtypes = {column: dtype for column, dtype in MetricEngine.COLUMN_DTYPES.items() if column in wanted}
+    if not strict:
+        dtypes = {column: dtype for column, dtype in dtypes.items() if dtype == 'category'}
+    
+    return {'usecols': lambda c: c in wanted, 'dtype': dtypes, 'low_memory': False}
+
+
+def coerce_numeric_columns(df):
+    """Convert numeric columns read as text to numbers, using the compact dtype where the values allow it"""
+    for column, dtype in MetricEngine.COLUMN_DTYPES.items():
+        if column in df.columns and dtype != 'category':
+            numbers = pd.to_numeric(df[column], errors='coerce')
+            if numbers.dropna().mod(1).eq(0).all():
+                try:
+                    numbers = numbers.astype(dtype)
+                except (ValueError, TypeError, OverflowError):
+                    pass
+            df[column] = numbers
+    return df
+
+
+def read_export_csv(csv_file_path, columns):
+    """Read the given columns of an export, with compact dtypes"""
+    try:
+        return pd.read_csv(csv_file_path, **csv_read_options(columns))
+    except (ValueError, TypeError, OverflowError):
+        # Some numeric column holds unexpected values - parse it as text and coerce afterwards
+        df = pd.read_csv(csv_file_path, **csv_read_options(columns, strict=False))
+        return coerce_numeric_columns(df)
+
+
+def iter_export_chunks(csv_file_path, columns, chunk_size):
+    """Yield an export in chunks of the given columns, with compact dtypes where the data allows
+    
+    If a numeric column turns out to hold unexpected values the read restarts with
+    text parsing, and None is yielded first so the caller can discard what it has seen.
+    """
+    for strict in (True, False):
+        reader = pd.read_csv(csv_file_path, chunksize=chunk_size, **csv_read_options(columns, strict=strict))
+        with reader:
+            while True:
+                try:
+                    chunk = next(reader)
+                except StopIteration:
+                    return
+                except (ValueError, TypeError, OverflowError):
+                    # Some numeric column holds unexpected values - start over parsing it as text
+                    if not strict:
+                        raise
+                    yield None
+                    break
+                yield chunk if strict else coerce_numeric_columns(chunk)
+
+
+def stream_export_csv(csv_file_path, calculation_types, columns, chunk_size, context=None, sample_rows=None,
+                      thresholds=None, progress=None):
+    """Fold an export into a MetricAccumulator chunk by chunk (reporting each chunk's rows to progress, if given)"""
+    accumulator = MetricAccumulator(calculation_types, context, sample_rows, thresholds)
+    for chunk in iter_export_chunks(csv_file_path, columns, chunk_size):
+        if chunk is None:
+            # The read restarted - discard what was counted so far
+            accumulator = MetricAccumulator(calculation_types, context, sample_rows, thresholds)
+            continue
+        accumulator.add(chunk)
+        if progress is not None:
+            progress.advance(os.path.basename(csv_file_path), 0, len(chunk))
+    return accumulator
+
+
+def load_export_job(csv_file_path, calculation_types, columns, streaming, chunk_size, handoff_dir=None, sample_rows=None,
+                    thresholds=None, progress=None):
+    """Parse one export - runs in-process or in a pool worker
+    
+    Streaming jobs return only the metric totals, counted with the given thresholds
+    (MetricEngine.THRESHOLDS if None), and, with sample_rows, the first rows each
+    metric counted - see MetricEngine.sample. Whole-file jobs return the frame,
+    or, when handoff_dir is given and pyarrow is available, the path of an
+    uncompressed Arrow (Feather) file holding it, which is far cheaper to hand
+    back to the parent than a pickled frame. In-process jobs may pass the audit's
+    AuditProgress, which streamed chunks are reported to (and can be cancelled at).
+    """
+    started = time.perf_counter()
+    if streaming:
+        # Cross-export and redirect graph metrics are counted after loading, once the whole crawl is in
+        local = [c for c in calculation_types if not MetricEngine.needs_whole_crawl(c)]
+        accumulator = stream_export_csv(csv_file_path, local, columns, chunk_size, sample_rows=sample_rows,
+                                        thresholds=thresholds, progress=progress)
+        return {'rows': accumulator.rows, 'chunks': accumulator.chunks, 'metrics': accumulator.results(),
+                'samples': accumulator.samples, 'timings': accumulator.timings,
+                'seconds': time.perf_counter() - started}
+    
+    df = read_export_csv(csv_file_path, columns)
+    result = {'rows': len(df), 'seconds': time.perf_counter() - started}
+    
+    feather = import_feather() if handoff_dir else None
+    if feather is not None:
+        fd, feather_path = tempfile.mkstemp(suffix='.feather', dir=handoff_dir)
+        os.close(fd)
+        feather.write_feather(df, feather_path, compression='uncompressed')
+        result['feather'] = feather_path
+    else:
+        result['frame'] = df
+    return result
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Hold an exclusive lock on a lock file, across processes (fcntl on POSIX, msvcrt on Windows)"""
+    with open(lock_path, 'a+b') as f:
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 seconds - keep waiting
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ExportCache:
+    """Persistent columnar cache of parsed exports
+    
+    Parsed frames are stored as uncompressed Feather (Arrow IPC) files, so a hit
+    skips parsing the CSV (see get for what it still copies). Entries are keyed by
+    the export's content hash and the column projection it was read with; the
+    source path, size and mtime are recorded too so unchanged files are recognised
+    without re-hashing them.
+    The cache is bounded in size and evicts the least recently used entries.
+    Several audits (e.g. run_batch -j N) may share a cache folder: the index is
+    changed only under index.lock and replaced atomically, so no update is lost
+    and readers never see a partial file.
+    """
+    
+    FORMAT_VERSION = 1
+    
+    def __init__(self, cache_dir=None, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir or self.default_cache_dir()
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.lock_path = os.path.join(self.cache_dir, "index.lock")
+        self._hashes = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def default_cache_dir():
+        """Per-user cache folder"""
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+            return os.path.join(base, "Tech Audit Processor", "cache")
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "tech_audit")
+    
+    @classmethod
+    def projection_signature(cls, columns):
+        """Identify how an export was read (columns and dtypes)"""
+        dtypes = {column: MetricEngine.COLUMN_DTYPES[column] for column in columns if column in MetricEngine.COLUMN_DTYPES}
+        return json.dumps([cls.FORMAT_VERSION, columns, dtypes])
+    
+    def file_hash(self, csv_file_path, stat):
+        """Content hash of a file, remembered for this run"""
+        memo_key = (csv_file_path, stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            self._hashes[memo_key] = file_content_hash(csv_file_path)
+        return self._hashes[memo_key]
+    
+    def entry_key(self, content_hash, signature):
+        return hashlib.blake2b(f"{content_hash}|{signature}".encode('utf-8'), digest_size=20).hexdigest()
+    
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.feather")
+    
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_index(self, index):
+        # Write to a temp file and swap it in so readers never see a partial index
+        fd, temp_path = tempfile.mkstemp(suffix='.json', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(temp_path, self.index_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    @contextmanager
+    def _updating_index(self):
+        """The current index, written back when the block exits; other processes wait meanwhile"""
+        with file_lock(self.lock_path):
+            index = self._read_index()
+            yield index
+            self._write_index(index)
+    
+    def get(self, csv_file_path, signature, arrow_strings=False):
+        """Cached frame for an export, or None
+        
+        The entry is memory-mapped, but by default converting it to pandas copies every
+        column, with text as Python objects - a hit saves the parse, not the memory.
+        With arrow_strings, text columns stay pyarrow-backed strings on the mapped entry
+        instead, as the Arrow store reads them (see ArrowExportStore).
+        """
+        feather = import_feather()
+        if feather is None:
+            return None
+        
+        csv_file_path = os.path.abspath(csv_file_path)
+        stat = os.stat(csv_file_path)
+        index = self._read_index()
+        
+        # Same file untouched since it was cached - no need to hash it
+        key = None
+        for entry_key, entry in index.items():
+            if (entry['path'] == csv_file_path and entry['size'] == stat.st_size and
+                    entry['mtime_ns'] == stat.st_mtime_ns and entry['signature'] == signature):
+                key = entry_key
+                break
+        
+        # Otherwise look it up by content (e.g. a copied or re-saved export)
+        if key is None:
+            key = self.entry_key(self.file_hash(csv_file_path, stat), signature)
+            if key not in index:
+                return None
+        
+        if not os.path.exists(self.entry_path(key)):
+            return None
+        
+        df = feather.read_table(self.entry_path(key), memory_map=True).to_pandas(
+            types_mapper=arrow_string_dtype if arrow_strings else None)
+        
+        with self._updating_index() as index:
+            if key in index:
+                index[key].update(path=csv_file_path, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                                  last_access=time.time())
+        return df
+    
+    def put(self, csv_file_path, signature, df=None, feather_path=None):
+        """Store a parsed export (a frame, or a copy of an uncompressed Feather file already holding it),
+        evicting old entries to stay within the size limit"""
+        feather = import_feather()
+        if feather is None:
+            return
+        
+        csv_file_path = os.path.abspath(csv_file_path)
+        stat = os.stat(csv_file_path)
+        content_hash = self.file_hash(csv_file_path, stat)
+        key = self.entry_key(content_hash, signature)
+        
+        fd, temp_path = tempfile.mkstemp(suffix='.feather', dir=self.cache_dir)
+        os.close(fd)
+        if feather_path is not None:
+            shutil.copyfile(feather_path, temp_path)
+        else:
+            feather.write_feather(df, temp_path, compression='uncompressed')
+        os.replace(temp_path, self.entry_path(key))
+        
+        with self._updating_index() as index:
+            index[key] = {
+                'path': csv_file_path,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'content_hash': content_hash,
+                'signature': signature,
+                'bytes': os.path.getsize(self.entry_path(key)),
+                'last_access': time.time(),
+            }
+            self._evict(index)
+    
+    def _evict(self, index):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        for key in [key for key in index if not os.path.exists(self.entry_path(key))]:
+            del index[key]
+        
+        total = sum(entry['bytes'] for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.entry_path(key))
+            except OSError:
+                # Still memory-mapped somewhere (Windows) - try again next time
+                continue
+            total -= index[key]['bytes']
+            del index[key]
+
+
+class ArrowExportStore(MutableMapping):
+    """Loaded exports as memory-mapped Arrow IPC files, in place of a dict of pandas frames
+    
+    Each frame is written once, uncompressed, to a temporary folder and read back
+    memory-mapped with its text columns as pyarrow-backed strings. Text then costs
+    its UTF-8 bytes instead of a Python object per cell, and the pages belong to the
+    OS file cache, which can drop and re-read them under memory pressure rather than
+    swapping. Metric threads share the frames, and files written by pool workers
+    (into the store's folder) or held by the export cache are mapped where they
+    are, without being copied.
+    The folder is removed when the store is closed or garbage collected.
+    """
+    
+    def __init__(self):
+        self.folder = tempfile.mkdtemp(prefix="tech_audit_store_")
+        self._frames = {}
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.folder, ignore_errors=True)
+    
+    def _new_path(self):
+        fd, path = tempfile.mkstemp(suffix='.arrow', dir=self.folder)
+        os.close(fd)
+        return path
+    
+    @staticmethod
+    def open(path):
+        """A frame over an Arrow IPC (uncompressed Feather) file, memory-mapped"""
+        return import_feather().read_table(path, memory_map=True).to_pandas(types_mapper=arrow_string_dtype)
+    
+    def add(self, df):
+        """Write a frame to the store's folder and return the memory-mapped copy"""
+        path = self._new_path()
+        import_feather().write_feather(df, path, compression='uncompressed')
+        return self.open(path)
+    
+    def __getitem__(self, file_name):
+        return self._frames[file_name]
+    
+    def __setitem__(self, file_name, df):
+        # Frames still holding Python string objects are moved into an Arrow file first
+        if any(dtype == object for dtype in df.dtypes):
+            df = self.add(df)
+        self._frames[file_name] = df
+    
+    def __delitem__(self, file_name):
+        del self._frames[file_name]
+    
+    def __iter__(self):
+        return iter(self._frames)
+    
+    def __len__(self):
+        return len(self._frames)
+    
+    def close(self):
+        self._frames.clear()
+        self._cleanup()
+
+
+def file_content_hash(file_path):
+    """blake2b digest of a file's bytes"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(file_path, previous=None):
+    """Size, mtime and content hash of a file
+    
+    The hash is taken over from previous (an earlier fingerprint of the same file)
+    when size and mtime are unchanged, so untouched files aren't read again.
+    """
+    stat = os.stat(file_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        fingerprint['hash'] = previous['hash']
+    else:
+        fingerprint['hash'] = file_content_hash(file_path)
+    return fingerprint
+
+
+class RunManifest:
+    """What the last incremental audit of a data folder read and produced
+    
+    Holds fingerprints of the exports each item was computed from, every item's
+    value, fingerprints and tab names of the imported workbooks, and the report
+    written. It is stored as JSON next to the export cache (one file per data
+    folder) so a re-run can tell which exports and workbooks changed.
+    """
+    
+    FORMAT_VERSION = 1
+    
+    def __init__(self, data_folder, manifest_dir=None):
+        self.data_folder = os.path.abspath(data_folder)
+        self.manifest_dir = manifest_dir or os.path.join(ExportCache.default_cache_dir(), "runs")
+        key = hashlib.blake2b(os.path.normcase(self.data_folder).encode('utf-8'), digest_size=16).hexdigest()
+        self.path = os.path.join(self.manifest_dir, f"{key}.json")
+    
+    def read(self):
+        """The last run's record, or None if there is none (or it is from another version)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get('version') != self.FORMAT_VERSION or record.get('data_folder') != self.data_folder:
+            return None
+        return record
+    
+    def write(self, record):
+        record = dict(record, version=self.FORMAT_VERSION, data_folder=self.data_folder)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.json', dir=self.manifest_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=1)
+        os.replace(temp_path, self.path)
+    
+    @staticmethod
+    def same_file(current, previous):
+        """Whether two fingerprints (None for a missing file) are of the same file and content"""
+        if current is None or previous is None:
+            return current is None and previous is None
+        return current.get('path') == previous.get('path') and current['hash'] == previous.get('hash')
+
+
+class FileIndex:
+    """Index of the files under a folder by lowercased basename, built in one os.scandir walk
+    
+    include/exclude are glob patterns matched against the path relative to the root
+    (with forward slashes) or the bare name; excluded folders are not descended into.
+    max_depth limits how many folder levels below the root are searched (0 = root only).
+    When several files share a name, the newest (by modification time) comes first.
+    """
+    
+    def __init__(self, root_folder, extensions=None, include=None, exclude=None, max_depth=None):
+        self.root_folder = root_folder
+        self.extensions = tuple(ext.lower() for ext in extensions) if extensions else None
+        self.include = [pattern.lower() for pattern in include or []]
+        self.exclude = [pattern.lower() for pattern in exclude or []]
+        self.max_depth = max_depth
+        self.files = {}
+        self._walk()
+        
+        # Deterministic choice between duplicate exports: newest first, then by path
+        for name, paths in self.files.items():
+            if len(paths) > 1:
+                paths.sort(key=lambda path: (-self._mtime(path), path))
+    
+    def _relative(self, path):
+        return os.path.relpath(path, self.root_folder).replace(os.sep, '/').lower()
+    
+    def _matches(self, patterns, path, name):
+        relative = self._relative(path)
+        name = name.lower()
+        return any(fnmatch.fnmatchcase(relative, pattern) or fnmatch.fnmatchcase(name, pattern)
+                   for pattern in patterns)
+    
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0
+    
+    def _walk(self):
+        folders = [(self.root_folder, 0)]
+        while folders:
+            folder, depth = folders.pop()
+            try:
+                entries = os.scandir(folder)
+            except OSError:
+                continue
+            
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.max_depth is not None and depth >= self.max_depth:
+                                continue
+                            if self.exclude and self._matches(self.exclude, entry.path, entry.name):
+                                continue
+                            folders.append((entry.path, depth + 1))
+                        elif entry.is_file():
+                            name = entry.name.lower()
+                            if self.extensions and not name.endswith(self.extensions):
+                                continue
+                            if self.include and not self._matches(self.include, entry.path, entry.name):
+                                continue
+                            if self.exclude and self._matches(self.exclude, entry.path, entry.name):
+                                continue
+                            self.files.setdefault(name, []).append(entry.path)
+                    except OSError:
+                        continue
+    
+    def find(self, file_name):
+        """All files with this name (case-insensitive), preferred copy first"""
+        return list(self.files.get(file_name.lower(), []))
+    
+    def with_extensions(self, extensions):
+        """Every indexed file with one of the extensions, ordered by relative path"""
+        extensions = tuple(ext.lower() for ext in extensions)
+        paths = [path for name, paths in self.files.items() if name.endswith(extensions) for path in paths]
+        return sorted(paths, key=self._relative)
+
+
+class StyleInterner:
+    """Copy basic cell formatting from one workbook to another, building each distinct style once
+    
+    Styles are keyed by the source cell's style; the first cell with a given key
+    gets new Font/PatternFill/Alignment objects and every later one reuses the
+    resulting style array. Keys are only meaningful within one source workbook.
+    """
+    
+    def __init__(self):
+        self._styles = {}
+    
+    def apply(self, cell, new_cell, key):
+        style = self._styles.get(key)
+        if style is not None:
+            new_cell._style = copy(style)
+            return
+        
+        try:
+            new_cell.font = openpyxl.styles.Font(
+                bold=cell.font.bold if cell.font else False,
+                italic=cell.font.italic if cell.font else False,
+                color=cell.font.color if cell.font else None
+            )
+            if cell.fill and cell.fill.fill_type:
+                new_cell.fill = openpyxl.styles.PatternFill(
+                    fill_type=cell.fill.fill_type,
+                    start_color=cell.fill.start_color,
+                    end_color=cell.fill.end_color
+                )
+            if cell.alignment:
+                new_cell.alignment = openpyxl.styles.Alignment(
+                    horizontal=cell.alignment.horizontal,
+                    vertical=cell.alignment.vertical,
+                    wrap_text=cell.alignment.wrap_text
+                )
+        except:
+            # Skip formatting if there's any error
+            pass
+        
+        self._styles[key] = copy(new_cell._style)
+
+
+# Streaming sheets lean on openpyxl internals (WriteOnlyWorksheet, Workbook._add_sheet, ExcelWriter) that
+# are only known to work in these releases - requirements.txt pins one, and tests/test_streaming_workbook.py
+# round-trips a saved workbook. Other releases get regular sheets and a plain save
+STREAMING_OPENPYXL_VERSIONS = ("3.1.",)
+
+
+def streaming_sheets_supported():
+    return openpyxl.__version__.startswith(STREAMING_OPENPYXL_VERSIONS)
+
+
+def create_streaming_sheet(workbook, title):
+    """Add a write-only worksheet to a regular workbook; rows appended to it go straight to a temp file"""
+    if not streaming_sheets_supported():
+        return workbook.create_sheet(title)
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+    
+    ws = WriteOnlyWorksheet(workbook, title)
+    workbook._add_sheet(ws)
+    return ws
+
+
+def save_streaming_workbook(workbook, filename):
+    """Save a workbook that may contain sheets from create_streaming_sheet"""
+    if not streaming_sheets_supported():
+        workbook.save(filename)
+        return
+    from zipfile import ZipFile, ZIP_DEFLATED
+    from openpyxl.writer.excel import ExcelWriter
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+    from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+    
+    class StreamingWorkbookWriter(ExcelWriter):
+        """ExcelWriter for regular workbooks that also contain write-only (streaming) worksheets
+        
+        openpyxl only streams sheets of workbooks opened with write_only=True, which
+        can't be based on a template. Here template sheets are written as usual while
+        write-only sheets, whose rows are already on disk, are copied into the archive.
+        """
+        
+        def write_worksheet(self, ws):
+            if not isinstance(ws, WriteOnlyWorksheet):
+                return super().write_worksheet(ws)
+            
+            ws._drawing = SpreadsheetDrawing()
+            ws._drawing.charts = ws._charts
+            ws._drawing.images = ws._images
+            if not ws.closed:
+                ws.close()
+            writer = ws._writer
+            
+            ws._rels = writer._rels
+            self._archive.write(writer.out, ws.path[1:])
+            self.manifest.append(ws)
+            writer.cleanup()
+    
+    archive = ZipFile(filename, 'w', ZIP_DEFLATED, allowZip64=True)
+    workbook.properties.modified = datetime.now(timezone.utc).replace(tzinfo=None)
+    writer = StreamingWorkbookWriter(workbook, archive)
+    writer.save()
+
+
+def discard_streaming_sheets(workbook):
+    """Remove the temp files behind a workbook's create_streaming_sheet sheets when it won't be saved"""
+    from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+    
+    for ws in workbook.worksheets:
+        if isinstance(ws, WriteOnlyWorksheet) and getattr(ws, '_writer', None) is not None:
+            try:
+                if not ws.closed:
+                    ws.close()
+                ws._writer.cleanup()
+            except (OSError, ValueError):
+                pass
+
+
+def peak_rss_bytes():
+    """Peak resident memory of this process so far, or None where it can't be measured"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    except ImportError:
+        return None
+
+
+def cpu_seconds():
+    """CPU time used by this process and its finished child processes (e.g. CSV parsing workers)"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def available_memory_bytes():
+    """Physical memory currently available for new work, or None where it can't be told"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class AuditProfiler:
+    """Wall time, CPU time, peak memory and row counts per stage, file and metric of an audit"""
+    
     def __init__(self):
+        self.stages = []
+        self.files = []
+        self.metrics = []
+        self.imports = []
+        self.started = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; the yielded dict takes extra fields such as rows"""
+        entry = {'stage': name}
+        wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] = round(time.perf_counter() - wall_start, 4)
+            entry['cpu_seconds'] = round(cpu_seconds() - cpu_start, 4)
+            peak = peak_rss_bytes()
+            entry['peak_rss_mb'] = round(peak / 1024 ** 2, 1) if peak is not None else None
+            self.stages.append(entry)
+    
+    def record_file(self, **entry):
+        self.files.append(entry)
+    
+    def record_metric(self, **entry):
+        self.metrics.append(entry)
+    
+    def record_import(self, **entry):
+        self.imports.append(entry)
+    
+    def report(self):
+        peak = peak_rss_bytes()
+        return {
+            'total_seconds': round(time.perf_counter() - self.started, 4),
+            'peak_rss_mb': round(peak / 1024 ** 2, 1) if peak is not None else None,
+            'stages': self.stages,
+            'files': self.files,
+            'metrics': sorted(self.metrics, key=lambda entry: -entry['seconds']),
+            'imports': self.imports,
+        }
+    
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+    
+    def print_summary(self):
+        print("\nTiming by stage:")
+        for entry in self.stages:
+            rows = f", {entry['rows']} rows" if entry.get('rows') is not None else ""
+            peak = f", peak {entry['peak_rss_mb']} MB" if entry.get('peak_rss_mb') is not None else ""
+            print(f"  {entry['stage']:<10} {entry['seconds']:>9.2f}s wall {entry['cpu_seconds']:>9.2f}s CPU{peak}{rows}")
+
+
+class AuditCancelled(BaseException):
+    """Raised inside an audit once its AuditProgress has been cancelled
+    
+    Like KeyboardInterrupt it is not an Exception, so the handlers that let an audit
+    carry on past one bad export or workbook don't swallow it.
+    """
+
+
+class AuditProgress:
+    """Progress events of a running audit, and the token that cancels it
+    
+    The audit reports each stage (see STAGES) and the work done in it - bytes of
+    exports loaded, metrics counted, bytes of workbooks imported. Every report is put
+    on a thread-safe queue as a dict (stage, file, done, total, rows, elapsed, eta in
+    seconds, or None before anything is done) for another thread, like the GUI's, to
+    poll. cancel() may be called from any thread; the audit's loops call check() and
+    stop with AuditCancelled at the next file, metric, chunk or batch of rows.
+    """
+    
+    STAGES = {
+        'template': "Preparing the report",
+        'discovery': "Finding files",
+        'load': "Loading exports",
+        'metrics': "Calculating metrics",
+        'import': "Importing Excel files",
+        'drilldown': "Writing drill-down reports",
+        'save': "Saving the report",
+    }
+    
+    def __init__(self):
+        self.events = queue.Queue()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self.stage = None
+        self.total = None
+        self.done = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+    
+    def cancel(self):
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+    
+    def check(self):
+        """Stop the audit if it has been cancelled"""
+        if self._cancelled.is_set():
+            raise AuditCancelled("Audit cancelled")
+    
+    def start(self, stage, total=None):
+        """Begin a stage with total units of work (None when it can't be told)"""
+        self.check()
+        with self._lock:
+            self.stage, self.total, self.done, self.rows = stage, total, 0, 0
+            self.started = time.perf_counter()
+            self._publish(None)
+    
+    def advance(self, file=None, done=1, rows=0):
+        """Record work finished in the current stage (safe from several threads), then check for cancellation"""
+        with self._lock:
+            self.done += done
+            self.rows += rows
+            self._publish(file)
+        self.check()
+    
+    def _publish(self, file):
+        elapsed = time.perf_counter() - self.started
+        eta = None
+        if self.total and self.done:
+            eta = round(elapsed * max(self.total - self.done, 0) / self.done, 1)
+        self.events.put({'stage': self.stage, 'file': file, 'done': self.done, 'total': self.total,
+                         'rows': self.rows, 'elapsed': round(elapsed, 2), 'eta': eta})
+    
+    def drain(self):
+        """Every event published since the last call, oldest first, without waiting"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+    
+    @classmethod
+    def describe(cls, event):
+        """One line for a progress event, e.g. Loading exports: internal_all.csv - 40%, about 2 min left"""
+        text = cls.STAGES.get(event['stage'], event['stage'])
+        if event.get('file'):
+            text += f": {event['file']}"
+        details = []
+        if event.get('total'):
+            details.append(f"{min(event['done'] / event['total'], 1):.0%}")
+        if event.get('rows'):
+            details.append(f"{event['rows']:,} rows")
+        if event.get('eta') is not None:
+            minutes = round(event['eta'] / 60)
+            details.append(f"about {minutes} min left" if minutes >= 1 else "less than a minute left")
+        return text + (" - " + ", ".join(details) if details else "")
+
+
+# Expected Value syntax (see AuditRule): an optional comparison and a number, or a range of two numbers
+RULE_NUMBER = r"(\d+(?:\.\d+)?)\s*(%?)"
+RULE_COMPARISON = re.compile(rf"^(<=|>=|<|>|==|=)?\s*{RULE_NUMBER}$")
+RULE_RANGE = re.compile(rf"^(?:between\s+)?{RULE_NUMBER}\s*(?:-|–|\.\.|to|and)\s*{RULE_NUMBER}$")
+
+
+class AuditRule:
+    """A compiled Expected Value: the range of audit values that pass, or a manual review
+    
+        0, 5                    at most that many (the template's own format)
+        <5, <=5, >10, >=10, =3  a comparison
+        10-20, between 10 and 20, 10 to 20
+                                an inclusive range
+        <=2%, 5-10%             a share of the crawled URLs (rows of internal_all.csv)
+        manual ...              reviewed by hand - graded as an Opportunity
+    """
+    
+    def __init__(self, low=-math.inf, high=math.inf, low_inclusive=True, high_inclusive=True,
+                 percent=False, manual=False):
+        self.low = low
+        self.high = high
+        self.low_inclusive = low_inclusive
+        self.high_inclusive = high_inclusive
+        self.percent = percent
+        self.manual = manual
+    
+    @classmethod
+    def parse(cls, text):
+        """Compile an Expected Value; None if it isn't a rule"""
+        text = str(text).strip().lower()
+        if "manual" in text:
+            return cls(manual=True)
+        
+        match = RULE_COMPARISON.match(text)
+        if match:
+            operator, number, percent = match.groups()
+            number = float(number)
+            bounds = {
+                None: {'high': number}, '<=': {'high': number}, '<': {'high': number, 'high_inclusive': False},
+                '>=': {'low': number}, '>': {'low': number, 'low_inclusive': False},
+                '=': {'low': number, 'high': number}, '==': {'low': number, 'high': number},
+            }[operator]
+            return cls(percent=bool(percent), **bounds)
+        
+        match = RULE_RANGE.match(text)
+        if match:
+            low, low_percent, high, high_percent = match.groups()
+            low, high = sorted((float(low), float(high)))
+            return cls(low, high, percent=bool(low_percent or high_percent))
+        return None
+    
+    def bounds(self, crawl_size=None):
+        """(low, high) in audit value units - None for percentage rules when the crawl size is unknown"""
+        if not self.percent:
+            return self.low, self.high
+        if crawl_size is None:
+            return None
+        return tuple(bound * crawl_size / 100 if math.isfinite(bound) else bound for bound in (self.low, self.high))
+
+
+class AuditRules:
+    """Pass/Fail rules of the audit items and thresholds of the metrics, with per-client overrides
+    
+    By default items are graded against the template's Expected Values (column I)
+    and metrics use MetricEngine.THRESHOLDS. A JSON rules file overrides either:
+    
+        {"thresholds": {"title_max_length": 65},
+         "items": {"3": "<=10", "106": "<=2%"},
+         "clients": {"Client A": {"items": {"2": "0"}}}}
+    
+    A section under "clients" applies when its name matches the audit's client name
+    (ignoring case), and an audit_rules.json in the data folder overrides both.
+    Rules are parsed once and every item is graded in one vectorized comparison.
+    """
+    
+    FOLDER_FILE = "audit_rules.json"
+    
+    def __init__(self, items=None, thresholds=None):
+        self.items = {str(item_id): str(text) for item_id, text in (items or {}).items()}
+        self.thresholds = dict(MetricEngine.THRESHOLDS, **(thresholds or {}))
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def compile(text):
+        return AuditRule.parse(text) if text is not None else None
+    
+    @staticmethod
+    def read(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError(f"Rules file {path} must hold a JSON object")
+        return config
+    
+    @classmethod
+    def load(cls, rules_path=None, client_name="", data_folder=None, thresholds=None):
+        """Rules for one audit: the given thresholds, the rules file, its section for the client,
+        then the data folder's own file"""
+        layers = [{'thresholds': thresholds}]
+        if rules_path:
+            config = cls.read(rules_path)
+            layers.append(config)
+            clients = {str(name).casefold(): section for name, section in (config.get('clients') or {}).items()}
+            if client_name and client_name.casefold() in clients:
+                layers.append(clients[client_name.casefold()])
+        folder_rules = os.path.join(data_folder, cls.FOLDER_FILE) if data_folder else None
+        if folder_rules and os.path.isfile(folder_rules):
+            print(f"Using rules from {folder_rules}")
+            layers.append(cls.read(folder_rules))
+        
+        items, thresholds = {}, {}
+        for layer in layers:
+            items.update(layer.get('items') or {})
+            thresholds.update(layer.get('thresholds') or {})
+        
+        unknown = sorted(set(thresholds) - set(MetricEngine.THRESHOLDS))
+        if unknown:
+            raise ValueError(f"Unknown thresholds in rules: {', '.join(unknown)} "
+                             f"(known: {', '.join(MetricEngine.THRESHOLDS)})")
+        for name, value in thresholds.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Threshold {name} must be a number, not {value!r}")
+        if not 0 < thresholds.get('near_duplicate_similarity', 1) <= 1:
+            raise ValueError("Threshold near_duplicate_similarity must be above 0 and at most 1")
+        rules = cls(items, thresholds)
+        for item_id, text in rules.items.items():
+            if rules.compile(text) is None:
+                raise ValueError(f"Can't read the rule for item {item_id}: {text!r}")
+        return rules
+    
+    def rule_for(self, item_id, expected_value):
+        """The compiled rule an item is graded by (None leaves its status as the template has it)"""
+        return self.compile(self.items.get(item_id, expected_value))
+    
+    def signature(self):
+        """Identifies the thresholds - metric values computed with others can't be reused"""
+        return sorted(self.thresholds.items())
+    
+    def grade(self, item_ids, values, expected_values, crawl_size=None):
+        """Pass/Fail/Opportunity status of every item's value (None where no rule applies)"""
+        rules = [self.rule_for(item_id, expected) for item_id, expected in zip(item_ids, expected_values)]
+        bounds = [rule.bounds(crawl_size) if rule is not None and not rule.manual else None for rule in rules]
+        
+        # Compare every graded value with its bounds at once
+        values = list(values)
+        graded = [index for index, limits in enumerate(bounds) if limits is not None]
+        value = pd.Series([values[index] for index in graded], dtype='float64')
+        low = pd.Series([bounds[index][0] for index in graded], dtype='float64')
+        high = pd.Series([bounds[index][1] for index in graded], dtype='float64')
+        low_inclusive = pd.Series([rules[index].low_inclusive for index in graded], dtype=bool)
+        high_inclusive = pd.Series([rules[index].high_inclusive for index in graded], dtype=bool)
+        passed = ((value > low) | (low_inclusive & (value == low))) & ((value < high) | (high_inclusive & (value == high)))
+        passed = dict(zip(graded, passed.tolist()))
+        
+        statuses = []
+        for index, rule in enumerate(rules):
+            if rule is not None and rule.manual:
+                statuses.append("Opportunity")
+            elif index in passed:
+                statuses.append("Pass" if passed[index] else "Fail")
+            else:
+                statuses.append(None)
+        return statuses
+
+
+class TechAuditProcessor:
+    def __init__(self, streaming=False, chunk_size=200000, workers=None, use_cache=True, cache_dir=None,
+                 include=None, exclude=None, max_depth=None, import_mode="auto", profile=False, cprofile=False,
+                 incremental=False, manifest_dir=None, drilldown=None, drilldown_max_rows=10000, rules_path=None,
+                 store="memory", near_duplicates=None, progress=None):
         # Template file name - try multiple possible names
         self.possible_template_names = [
             "Template __ Tech Audit.xlsx",
@@ -78,14 +2174,108 @@ class TechAuditProcessor:
             "65": {"file": "internal_all.csv", "calculation": "status_404_count"},
             
             # REDIRECTS
-            "18": {"file": "redirect_chains_all.csv", "calculation": "redirect_chains"},
-            "19": {"file": "redirect_loops_all.csv", "calculation": "redirect_loops"},
+            "18": {"file": "redirect_chains_all.csv", "calculation": "redirect_chains",
+                   "fallback": {"file": "internal_all.csv", "calculation": "redirect_graph_chains"}},
+            "19": {"file": "redirect_loops_all.csv", "calculation": "redirect_loops",
+                   "fallback": {"file": "internal_all.csv", "calculation": "redirect_graph_loops"}},
             "20": {"file": "internal_all.csv", "calculation": "temporary_redirects"},
             
             # Add more mappings as needed
         }
         
-        self.screaming_frog_data = {}
+        # Streaming mode reads each CSV in chunks and keeps only metric totals, not the frames
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.streamed_metrics = {}
+        
+        # Loaded frames are kept in a dict ("memory") or as memory-mapped Arrow files ("arrow",
+        # see ArrowExportStore), which holds their text columns far more compactly
+        self.store = store
+        self.screaming_frog_data = self.new_export_store()
+        
+        # Where each export was loaded from, and URL sets built from them for cross-export metrics
+        self.loaded_paths = {}
+        self.url_sets = {}
+        
+        # Redirects of internal_all.csv, for redirect items whose dedicated exports are missing
+        self.redirect_graph = None
+        
+        # Item IDs the template being filled uses (None = every mapped item); loads and column
+        # projections are planned from these
+        self.audit_items = None
+        
+        # (row, item ID, expected value) of the template's item rows, cached per template content
+        # hash (see load_template_rows); None means the Full Audit sheet is scanned
+        self.template_rows = None
+        # Priority (column K) of each item row in the template, when a previous report is patched -
+        # rows that stop passing get it back in place of the old run's "N/A - Pass"
+        self.template_priorities = None
+        
+        # Exports are parsed in a process pool when there are several and they are big enough
+        # to pay for starting the workers (workers=None uses one per CPU)
+        self.workers = workers
+        self.parallel_min_bytes = 32 * 1024 * 1024
+        
+        # Parsed exports are cached on disk so re-running on the same crawl skips the CSV parsing
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = 2 * 1024 ** 3
+        
+        # File discovery filters (glob patterns on relative paths / names, and folder depth)
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        
+        # How imported Excel files are copied - see get_import_mode
+        self.import_mode = import_mode
+        self.import_bulk_min_bytes = 5 * 1024 * 1024
+        
+        # Extensions discovery indexes in its single walk of the data folder
+        self.data_extensions = ['.csv', '.xlsx', '.xls']
+        
+        # Timings are always collected (see AuditProfiler); profile writes them next to the report
+        # as <report>_profile.json, and cprofile adds a cProfile dump (<report>.prof) of the main thread
+        self.profile = profile
+        self.cprofile = cprofile
+        self.profiler = AuditProfiler()
+        self.last_profile = None
+        
+        # Incremental runs keep a manifest per data folder (see RunManifest) and reuse the values of
+        # items whose exports haven't changed. The previous report is patched (its unchanged imported
+        # tabs kept) when it is untouched and small enough to load cheaply, else a fresh template is filled
+        self.incremental = incremental
+        self.manifest_dir = manifest_dir
+        self.incremental_patch_max_bytes = 50 * 1024 * 1024
+        self.previous_run = None
+        self.patching = False
+        self.reused_values = {}
+        self.item_values = {}
+        self.imported_sheets = {}
+        
+        # Each audited item's value and Pass/Fail status from the last run (batch runs aggregate these)
+        self.item_statuses = {}
+        
+        # Crawl diffs (see diff_crawls) also read every export's Address to tell which URLs changed
+        self.diffing = False
+        
+        # Drill-down reports list the URLs behind each failing item, as extra "tabs" or as "csv" files
+        # next to the report, taken from the rows each metric's mask counted (at most drilldown_max_rows each)
+        self.drilldown = drilldown
+        self.drilldown_max_rows = drilldown_max_rows
+        self.drilldown_samples = {}
+        self.drilldown_items = []
+        
+        # Pass/Fail rules and metric thresholds: the template's Expected Values and MetricEngine.THRESHOLDS,
+        # overridden by the rules file, its section for the client and the data folder's audit_rules.json
+        self.rules_path = rules_path
+        # Similarity at which duplicate items also count near-duplicate titles, descriptions and H1s
+        # (None leaves it to MetricEngine.THRESHOLDS and the rules)
+        self.near_duplicates = near_duplicates
+        self.rules = AuditRules()
+        self.thresholds = self.rules.thresholds
+        
+        # Stage and ETA events for another thread to poll, and the token that cancels a run (see AuditProgress)
+        self.progress = progress or AuditProgress()
     
     def get_desktop_path(self):
         """Get the desktop path in a more reliable way"""
@@ -108,82 +2298,282 @@ class TechAuditProcessor:
             os.makedirs(audit_folder)
         return audit_folder
     
+    def build_file_index(self, root_folder):
+        """Index every data file under the folder in one walk"""
+        return FileIndex(root_folder, self.data_extensions, self.include, self.exclude, self.max_depth)
+    
     def find_files_recursively(self, root_folder, file_extensions):
         """Recursively find files with specific extensions in all subfolders"""
-        found_files = []
-        
-        for root, dirs, files in os.walk(root_folder):
-            for file in files:
-                if any(file.lower().endswith(ext.lower()) for ext in file_extensions):
-                    full_path = os.path.join(root, file)
-                    found_files.append(full_path)
+        return FileIndex(root_folder, file_extensions, self.include, self.exclude, self.max_depth).with_extensions(file_extensions)
         
-        return found_files
+    def process_audit(self, data_folder, client_name="", output_folder=None):
+        """Main function to process the audit (reports go to the Desktop unless output_folder is given)"""
+        self.profiler = AuditProfiler()
+        self.drilldown_samples = {}
+        self.drilldown_items = []
+        code_profiler = None
+        if self.cprofile:
+            import cProfile
+            code_profiler = cProfile.Profile()
+            code_profiler.enable()
         
-    def process_audit(self, data_folder, client_name=""):
-        """Main function to process the audit"""
         try:
-            # Create timestamp for unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
-            # Create filename with client name
-            if client_name:
-                # Clean the client name (remove invalid filename characters)
-                clean_client_name = "".join(c for c in client_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                output_filename = f"{clean_client_name}_Technical_Audit_{timestamp}.xlsx"
-            else:
-                output_filename = f"Technical_Audit_{timestamp}.xlsx"
+            if not os.path.isdir(data_folder):
+                raise ValueError(f"Data folder not found: {data_folder}")
             
-            # Get output path
-            output_folder = self.get_desktop_path()
-            output_path = os.path.join(output_folder, output_filename)
+            output_path = self.get_output_path(client_name, output_folder)
+            self.load_rules(client_name, data_folder)
             
-            # Get template path
-            template_path = self.get_template_path()
-            
-            print(f"Template found at: {template_path}")
-            print(f"Output will be saved to: {output_path}")
+            self.progress.start("template")
+            with self.profiler.stage("template"):
+                # Get template path
+                template_path = self.get_template_path()
+                
+                print(f"Template found at: {template_path}")
+                print(f"Output will be saved to: {output_path}")
+                
+                # Incremental runs start from the previous report when it can be patched
+                manifest = RunManifest(data_folder, self.get_manifest_dir()) if self.incremental else None
+                template_hash = file_content_hash(template_path)
+                self.start_incremental_run(manifest, template_hash)
+                source_path = self.previous_run['output']['path'] if self.patching else template_path
+                
+                # Copy template to new file
+                try:
+                    # Ensure output directory exists
+                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    shutil.copy2(source_path, output_path)
+                    print("Previous report copied for patching" if self.patching else "Template copied successfully")
+                except Exception as e:
+                    raise Exception(f"Failed to copy template to {output_path}: {str(e)}")
+                
+                # Open the workbook first - the items it uses decide which exports and columns to load
+                wb = openpyxl.load_workbook(output_path)
+                self.template_rows = self.load_template_rows(template_hash, wb)
+                self.template_priorities = self.read_template_priorities(template_path) if self.patching else None
+                self.audit_items = self.get_template_items(wb)
             
-            # Copy template to new file
-            try:
-                # Ensure output directory exists
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                shutil.copy2(template_path, output_path)
-                print("Template copied successfully")
-            except Exception as e:
-                raise Exception(f"Failed to copy template to {output_path}: {str(e)}")
+            # Find every data file in one pass over the folder tree
+            self.progress.start("discovery")
+            with self.profiler.stage("discovery") as stage:
+                file_index = self.build_file_index(data_folder)
+                stage['files'] = len(file_index.with_extensions(self.data_extensions))
+                
+                # Items whose exports are unchanged since the last run keep their values
+                if manifest:
+                    exports = self.fingerprint_exports(data_folder, file_index)
+                    self.reused_values = self.get_reusable_values(exports)
+                    stage['reused_items'] = len(self.reused_values)
             
             # Load Screaming Frog data recursively
-            self.load_screaming_frog_data_recursive(data_folder)
-            
-            # Open the workbook and update values
-            wb = load_workbook(output_path)
+            with self.profiler.stage("load") as stage:
+                self.load_screaming_frog_data_recursive(data_folder, file_index, self.get_required_files(file_index))
+                stage['rows'] = sum(entry['rows'] for entry in self.profiler.files)
             
             # Update audit values
             print("Updating audit values...")
-            self.update_audit_values(wb)
+            with self.profiler.stage("metrics") as stage:
+                self.update_audit_values(wb)
+                stage['metrics'] = len(self.profiler.metrics)
             
             # Import other Excel files from the folder recursively
             print("Importing Excel files...")
-            imported_count = self.import_existing_sheets_recursive(wb, data_folder)
+            with self.profiler.stage("import") as stage:
+                imported_count = self.import_existing_sheets_recursive(wb, data_folder, file_index)
+                stage['rows'] = sum(entry['rows'] for entry in self.profiler.imports)
+            
+            # List the URLs behind failing items
+            if self.drilldown:
+                print("Writing drill-down reports...")
+                self.progress.start("drilldown")
+                with self.profiler.stage("drilldown") as stage:
+                    stage['items'] = self.write_drilldowns(wb, output_path)
             
             # Save the workbook
             print("Saving workbook...")
-            wb.save(output_path)
-            wb.close()
+            self.progress.start("save")
+            with self.profiler.stage("save"):
+                save_streaming_workbook(wb, output_path)
+                wb.close()
+            
+            if manifest:
+                self.write_run_manifest(manifest, template_hash, exports, output_path)
+            
+            self.finish_profile(output_path, code_profiler)
             
             # Return path and import count
             return output_path, imported_count
             
-        except Exception as e:
+        except BaseException as e:
+            # Errors, cancelled runs (AuditCancelled) and Ctrl+C all leave no partial report behind
+            if code_profiler is not None:
+                code_profiler.disable()
+            if isinstance(e, AuditCancelled):
+                print("Audit cancelled")
+            if 'wb' in locals():
+                discard_streaming_sheets(wb)
             # If output file was created but error occurred, try to delete it
             if 'output_path' in locals() and os.path.exists(output_path):
                 try:
                     os.remove(output_path)
                 except:
                     pass
+                shutil.rmtree(self.get_drilldown_folder(output_path), ignore_errors=True)
             raise e
     
+    def get_output_path(self, client_name="", output_folder=None, report_name="Technical_Audit"):
+        """Unused timestamped path for a report (on the Desktop unless output_folder is given)"""
+        # Create timestamp for unique filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Create filename with client name
+        if client_name:
+            # Clean the client name (remove invalid filename characters)
+            clean_client_name = "".join(c for c in client_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            output_filename = f"{clean_client_name}_{report_name}_{timestamp}.xlsx"
+        else:
+            output_filename = f"{report_name}_{timestamp}.xlsx"
+        
+        # Get output path
+        if not output_folder:
+            output_folder = self.get_desktop_path()
+        output_path = os.path.join(output_folder, output_filename)
+        
+        # Batch runs can finish two reports for the same client within a second
+        if os.path.exists(output_path):
+            base_name, extension = os.path.splitext(output_filename)
+            suffix = 2
+            while os.path.exists(os.path.join(output_folder, f"{base_name}_{suffix}{extension}")):
+                suffix += 1
+            output_path = os.path.join(output_folder, f"{base_name}_{suffix}{extension}")
+        
+        return output_path
+    
+    def finish_profile(self, output_path, code_profiler=None):
+        """Keep the run's timings and write them (and the cProfile dump) next to the report if asked to"""
+        self.last_profile = self.profiler.report()
+        base_path = os.path.splitext(output_path)[0]
+        
+        if code_profiler is not None:
+            code_profiler.disable()
+            code_profiler.dump_stats(f"{base_path}.prof")
+            print(f"cProfile data saved to: {base_path}.prof")
+        
+        if self.profile:
+            self.profiler.print_summary()
+            self.profiler.write(f"{base_path}_profile.json")
+            print(f"Timing report saved to: {base_path}_profile.json")
+    
+    def load_rules(self, client_name="", data_folder=None):
+        """Read the Pass/Fail rules and metric thresholds that apply to an audit"""
+        defaults = {'near_duplicate_similarity': self.near_duplicates} if self.near_duplicates else None
+        self.rules = AuditRules.load(self.rules_path, client_name, data_folder, defaults)
+        self.thresholds = self.rules.thresholds
+        changed = {name: value for name, value in self.thresholds.items() if MetricEngine.THRESHOLDS[name] != value}
+        if self.rules.items or changed:
+            print(f"Rules: {len(self.rules.items)} item rule(s), thresholds changed: "
+                  f"{', '.join(f'{name}={value}' for name, value in changed.items()) or 'none'}")
+    
+    def mapping_signature(self):
+        """Identifies the item mappings, thresholds and drill-down options - results of runs with others can't be reused"""
+        settings = [self.item_mappings, self.rules.signature(), self.drilldown,
+                    self.drilldown_max_rows if self.drilldown else None]
+        return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get_manifest_dir(self):
+        """Where run manifests go - next to the export cache unless set"""
+        if self.manifest_dir:
+            return self.manifest_dir
+        return os.path.join(self.cache_dir, "runs") if self.cache_dir else None
+    
+    def start_incremental_run(self, manifest, template_hash):
+        """Read the data folder's last run and decide whether its report can be patched"""
+        self.previous_run = None
+        self.patching = False
+        self.reused_values = {}
+        self.item_values = {}
+        self.item_statuses = {}
+        self.imported_sheets = {}
+        if manifest is None:
+            return
+        
+        previous = manifest.read()
+        if previous is None:
+            print("Incremental run: no previous run of this folder, computing every item")
+            return
+        if previous.get('template') != template_hash or previous.get('mappings') != self.mapping_signature():
+            print("Incremental run: the template, item mappings, thresholds or drill-down options changed since "
+                  "the last run, computing every item")
+            return
+        self.previous_run = previous
+        
+        # Patch the previous report only if nobody has edited it since and loading it is cheap
+        output = previous.get('output') or {}
+        try:
+            unchanged = RunManifest.same_file(dict(file_fingerprint(output['path'], output), path=output['path']), output)
+        except (OSError, KeyError):
+            unchanged = False
+        if not unchanged:
+            print("Incremental run: previous report is missing or was edited, filling a fresh template")
+        elif output['size'] > self.incremental_patch_max_bytes:
+            print("Incremental run: previous report is too large to patch, filling a fresh template")
+        else:
+            self.patching = True
+            print(f"Incremental run: patching previous report {output['path']}")
+    
+    def fingerprint_exports(self, data_folder, file_index):
+        """Fingerprints of every export the audited items depend on (None for missing ones)"""
+        previous = (self.previous_run or {}).get('exports', {})
+        exports = {}
+        for item_id in self.get_audit_item_ids():
+            for file_name in self.get_item_files(item_id):
+                if file_name in exports:
+                    continue
+                matches = file_index.find(file_name)
+                if not matches:
+                    exports[file_name] = None
+                    continue
+                relative_path = os.path.relpath(matches[0], data_folder)
+                earlier = previous.get(file_name)
+                if not earlier or earlier.get('path') != relative_path:
+                    earlier = None
+                exports[file_name] = dict(file_fingerprint(matches[0], earlier), path=relative_path)
+        return exports
+    
+    def get_reusable_values(self, exports):
+        """Previous values of the items none of whose exports changed"""
+        if not self.previous_run:
+            return {}
+        values = self.previous_run.get('values', {})
+        previous = self.previous_run.get('exports', {})
+        
+        unchanged = {file_name for file_name, fingerprint in exports.items()
+                     if file_name in previous and RunManifest.same_file(fingerprint, previous[file_name])}
+        item_ids = self.get_audit_item_ids()
+        reused = {item_id: values[item_id] for item_id in item_ids
+                  if item_id in values and all(file_name in unchanged for file_name in self.get_item_files(item_id))}
+        
+        changed = [file_name for file_name in exports if file_name not in unchanged]
+        print(f"Incremental run: {len(changed)} export(s) changed{': ' + ', '.join(changed) if changed else ''}")
+        print(f"  Reusing {len(reused)} item value(s), recomputing {len(item_ids) - len(reused)}")
+        return reused
+    
+    def write_run_manifest(self, manifest, template_hash, exports, output_path):
+        """Record this run for the next incremental one (failing only costs that run a full audit)"""
+        try:
+            manifest.write({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'template': template_hash,
+                'mappings': self.mapping_signature(),
+                'exports': exports,
+                'values': self.item_values,
+                'workbooks': self.imported_sheets,
+                'output': dict(file_fingerprint(output_path), path=os.path.abspath(output_path)),
+            })
+            print(f"Run manifest saved to: {manifest.path}")
+        except Exception as e:
+            print(f"Could not save the run manifest: {str(e)}")
+    
     def get_template_path(self):
         """Get the full path to the template file - creates temp file from embedded data if needed"""
         # When running as compiled exe
@@ -281,8 +2671,8 @@ class TechAuditProcessor:
         
         return temp_template_path
     
-    def load_screaming_frog_data_recursive(self, data_folder):
-        """Load all relevant Screaming Frog CSV files from all subfolders"""
+    def load_screaming_frog_data_recursive(self, data_folder, file_index=None, files=None):
+        """Load all relevant Screaming Frog CSV files from all subfolders (only the given ones if files is set)"""
         print("Loading Screaming Frog data recursively...")
         
         # List of all possible files we might need
@@ -303,26 +2693,328 @@ class TechAuditProcessor:
             'redirect_loops_all.csv'
         ]
         
-        # Find all CSV files recursively
-        found_csv_files = self.find_files_recursively(data_folder, ['.csv'])
+        if files is not None:
+            skipped = [target_file for target_file in files_to_find if target_file not in files]
+            files_to_find = [target_file for target_file in files_to_find if target_file in files]
+            if skipped:
+                print(f"  Skipping {len(skipped)} export(s) no audited item uses")
+        
+        # Find all CSV files recursively
+        if file_index is None:
+            file_index = self.build_file_index(data_folder)
+        
+        # Match found files with our target files (newest copy first when there are duplicates)
+        candidates = {}
+        for target_file in files_to_find:
+            matches = file_index.find(target_file)
+            if matches:
+                candidates[target_file] = matches
+        
+        # Parse the first match of every file up front (in parallel where worthwhile),
+        # taking unchanged files from the cache
+        cache = self.get_export_cache()
+        first_jobs = {target_file: paths[0] for target_file, paths in candidates.items()}
+        first_results = {}
+        self.progress.start("load", sum(self.file_size(path) for path in first_jobs.values()) or None)
+        if cache is not None:
+            for target_file, csv_file_path in list(first_jobs.items()):
+                started = time.perf_counter()
+                try:
+                    df = cache.get(csv_file_path, ExportCache.projection_signature(self.get_required_columns(target_file)),
+                                   arrow_strings=self.get_arrow_store() is not None)
+                except Exception as e:
+                    print(f"  Cache lookup failed for {target_file}: {str(e)}")
+                    df = None
+                if df is not None:
+                    first_results[target_file] = {'rows': len(df), 'frame': df, 'cached': True,
+                                                  'seconds': time.perf_counter() - started}
+                    del first_jobs[target_file]
+                    self.progress.advance(target_file, self.file_size(csv_file_path), len(df))
+        first_results.update(self.run_load_jobs(first_jobs, cache))
+        
+        for target_file in files_to_find:
+            self.progress.check()
+            found = False
+            for index, csv_file_path in enumerate(candidates.get(target_file, [])):
+                try:
+                    if index == 0:
+                        result = first_results[target_file]
+                        if isinstance(result, Exception):
+                            raise result
+                    else:
+                        # Earlier copy failed to load - try the next one
+                        result = load_export_job(csv_file_path, *self.get_load_spec(target_file),
+                                                 self.streaming, self.chunk_size, sample_rows=self.get_sample_rows(),
+                                                 thresholds=self.thresholds, progress=self.progress)
+                        result = self.finish_parse(cache, csv_file_path, target_file, result)
+                    
+                    self.loaded_paths[target_file] = csv_file_path
+                    relative_path = os.path.relpath(csv_file_path, data_folder)
+                    source = 'streamed' if 'metrics' in result else 'cache' if result.get('cached') else 'parsed'
+                    self.profiler.record_file(file=target_file, path=relative_path, source=source,
+                                              rows=result['rows'], seconds=round(result.get('seconds', 0), 4))
+                    if 'metrics' in result:
+                        self.streamed_metrics[target_file] = result['metrics']
+                        self.record_samples(target_file, result.get('samples', {}))
+                        for calculation_type, seconds in result.get('timings', {}).items():
+                            self.profiler.record_metric(file=target_file, metric=calculation_type,
+                                                        rows=result['rows'], seconds=round(seconds, 4))
+                        print(f"  Streamed {target_file}: {result['rows']} rows in {result['chunks']} chunk(s) from {relative_path}")
+                    else:
+                        self.screaming_frog_data[target_file] = result['frame']
+                        cached = " (cached)" if result.get('cached') else ""
+                        print(f"  Loaded {target_file}: {result['rows']} rows from {relative_path}{cached}")
+                    found = True
+                    break
+                except Exception as e:
+                    print(f"  Error loading {csv_file_path}: {str(e)}")
+            
+            if not found:
+                print(f"  {target_file} not found (optional)")
+    
+    def get_audit_item_ids(self):
+        """Mapped item IDs of the template being filled (every mapped item if unknown)"""
+        if self.audit_items is None:
+            return list(self.item_mappings)
+        return [item_id for item_id in self.audit_items if item_id in self.item_mappings]
+    
+    def get_active_mappings(self):
+        """Mappings of the items being computed (items reusing a previous value need nothing loaded)"""
+        return [self.item_mappings[item_id] for item_id in self.get_audit_item_ids() if item_id not in self.reused_values]
+    
+    def get_item_files(self, item_id):
+        """Exports an item's value depends on: its own, its fallback's and those holding the URL sets they look up"""
+        mapping = self.item_mappings[item_id]
+        files = []
+        for entry in (mapping, mapping.get('fallback')):
+            if entry:
+                needed = [entry['file']]
+                needed += [MetricEngine.URL_SETS[reference]['file']
+                           for reference in MetricEngine.references_for([entry['calculation']])]
+                files.extend(file_name for file_name in needed if file_name not in files)
+        return files
+    
+    def get_required_files(self, file_index=None):
+        """Exports the audited items need: their own, their fallbacks' when their own wasn't found,
+        and those holding the URL sets they look up"""
+        files = []
+        for mapping in self.get_active_mappings():
+            entries = [mapping]
+            fallback = mapping.get('fallback')
+            if fallback and (file_index is None or not file_index.find(mapping['file'])):
+                entries.append(fallback)
+            
+            for entry in entries:
+                needed = [entry['file']]
+                needed += [MetricEngine.URL_SETS[reference]['file']
+                           for reference in MetricEngine.references_for([entry['calculation']])]
+                files.extend(file_name for file_name in needed if file_name not in files)
+        
+        # Percentage rules need the crawl's size, even when no computed item reads internal_all.csv
+        if 'internal_all.csv' not in files and self.uses_crawl_size():
+            files.append('internal_all.csv')
+        return files
+    
+    def get_file_calculations(self, file_name):
+        """Calculations mapped to an export, including fallbacks for items whose own export may be missing"""
+        calculation_types = []
+        for mapping in self.get_active_mappings():
+            for entry in (mapping, mapping.get('fallback')):
+                if entry and entry['file'] == file_name and entry['calculation'] not in calculation_types:
+                    calculation_types.append(entry['calculation'])
+        return calculation_types
+    
+    def resolve_mapping(self, mapping):
+        """The mapping to compute an item with - its fallback when its own export wasn't loaded"""
+        fallback = mapping.get('fallback')
+        if fallback and not self.is_loaded(mapping['file']) and self.is_loaded(fallback['file']):
+            return fallback
+        return mapping
+    
+    def is_loaded(self, file_name):
+        return file_name in self.screaming_frog_data or file_name in self.streamed_metrics
+    
+    def get_required_columns(self, file_name):
+        """Columns of an export read by the metrics mapped to it, or by other exports' metrics that look it up"""
+        columns = MetricEngine.required_columns(self.get_file_calculations(file_name))
+        all_calculations = [mapping['calculation'] for mapping in self.get_active_mappings()]
+        for reference in MetricEngine.references_for(all_calculations):
+            spec = MetricEngine.URL_SETS[reference]
+            if spec['file'] == file_name:
+                columns.extend(column for column in spec['columns'] if column not in columns)
+        if (self.diffing or self.drilldown) and 'Address' not in columns:
+            columns.append('Address')
+        return columns
+    
+    def get_load_spec(self, file_name):
+        """(calculations, columns) to load an export with"""
+        return self.get_file_calculations(file_name), self.get_required_columns(file_name)
+    
+    def read_export(self, csv_file_path, file_name):
+        """Read only the columns the metrics need, with compact dtypes"""
+        return read_export_csv(csv_file_path, self.get_required_columns(file_name))
+    
+    def stream_export_metrics(self, csv_file_path, file_name):
+        """Fold an export into metric totals chunk by chunk, keeping memory bounded"""
+        return stream_export_csv(csv_file_path, *self.get_load_spec(file_name), self.chunk_size, context=self,
+                                 sample_rows=self.get_sample_rows())
+    
+    def get_export_cache(self):
+        """The on-disk export cache, or None when disabled or unavailable"""
+        # Streaming loads never hold whole frames, so there is nothing to cache
+        if not self.use_cache or self.streaming or import_feather() is None:
+            return None
+        try:
+            return ExportCache(self.cache_dir, self.cache_max_bytes)
+        except OSError as e:
+            print(f"  Export cache disabled: {str(e)}")
+            return None
+    
+    def cache_export(self, cache, csv_file_path, file_name, df=None, feather_path=None):
+        """Store a freshly parsed export in the cache (failures only cost the next run a re-parse)"""
+        if cache is None:
+            return
+        try:
+            cache.put(csv_file_path, ExportCache.projection_signature(self.get_required_columns(file_name)),
+                      df, feather_path)
+        except Exception as e:
+            print(f"  Could not cache {file_name}: {str(e)}")
+    
+    def new_export_store(self):
+        """An empty store for loaded frames (see self.store)"""
+        if self.store == "arrow" and not self.streaming:
+            if import_feather() is not None:
+                return ArrowExportStore()
+            print("pyarrow is not installed - keeping exports in memory")
+        return {}
+    
+    def get_arrow_store(self):
+        """The ArrowExportStore loaded frames go to, or None when they are kept in a dict"""
+        return self.screaming_frog_data if isinstance(self.screaming_frog_data, ArrowExportStore) else None
+    
+    def finish_parse(self, cache, csv_file_path, file_name, result):
+        """Cache a freshly parsed export and turn its load result into a frame for the export store
+        
+        Runs as each file finishes, so that with the Arrow store only one file's Python
+        objects are in memory at a time. Arrow files handed back by pool workers are
+        copied into the cache and, with the Arrow store, mapped in place.
+        """
+        store = self.get_arrow_store()
+        if 'feather' in result:
+            feather_path = result.pop('feather')
+            self.cache_export(cache, csv_file_path, file_name, feather_path=feather_path)
+            if store is not None:
+                result['frame'] = store.open(feather_path)
+            else:
+                result['frame'] = import_feather().read_table(feather_path).to_pandas()
+        elif 'frame' in result:
+            self.cache_export(cache, csv_file_path, file_name, result['frame'])
+            if store is not None:
+                result['frame'] = store.add(result['frame'])
+        return result
+    
+    @staticmethod
+    def file_size(path):
+        """Size of a file in bytes (0 if it can't be read)"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+    
+    def get_worker_count(self, job_paths):
+        """Number of processes to parse exports with (1 means in-process)"""
+        if len(job_paths) < 2:
+            return 1
         
-        # Match found files with our target files
-        for target_file in files_to_find:
-            found = False
-            for csv_file_path in found_csv_files:
-                file_name = os.path.basename(csv_file_path)
-                if file_name.lower() == target_file.lower():
+        # Starting worker processes costs more than parsing a handful of small files
+        total_bytes = sum(os.path.getsize(path) for path in job_paths if os.path.exists(path))
+        if total_bytes < self.parallel_min_bytes:
+            return 1
+        
+        workers = self.workers or os.cpu_count() or 1
+        return max(1, min(workers, len(job_paths)))
+    
+    def run_load_jobs(self, jobs, cache=None):
+        """Parse exports, concurrently when worth it; returns {file: result or exception}
+        
+        Each parsed export is cached and handed to the export store as soon as it is in (see finish_parse).
+        """
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+        from concurrent.futures.process import BrokenProcessPool
+        
+        results = {}
+        workers = self.get_worker_count(list(jobs.values()))
+        
+        if workers <= 1:
+            for target_file, csv_file_path in jobs.items():
+                try:
+                    result = load_export_job(
+                        csv_file_path, *self.get_load_spec(target_file), self.streaming, self.chunk_size,
+                        sample_rows=self.get_sample_rows(), thresholds=self.thresholds, progress=self.progress)
+                    results[target_file] = self.finish_parse(cache, csv_file_path, target_file, result)
+                except Exception as e:
+                    results[target_file] = e
+                # Streamed rows were reported chunk by chunk
+                self.report_load(target_file, csv_file_path, results[target_file], rows=not self.streaming)
+            return results
+        
+        print(f"  Parsing {len(jobs)} file(s) with {workers} worker processes")
+        # Workers write their frames as Arrow files - into the Arrow store's folder, where they are mapped in place
+        store = self.get_arrow_store()
+        handoff_dir = None
+        if import_feather() is not None:
+            handoff_dir = tempfile.mkdtemp(prefix="tech_audit_load_", dir=store.folder if store is not None else None)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        cancelled = False
+        try:
+            futures = {
+                pool.submit(load_export_job, csv_file_path, *self.get_load_spec(target_file),
+                            self.streaming, self.chunk_size, handoff_dir, self.get_sample_rows(),
+                            self.thresholds): target_file
+                for target_file, csv_file_path in jobs.items()
+            }
+            # Files are taken as they finish, waking up regularly to notice a cancelled run
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                self.progress.check()
+                for future in finished:
+                    target_file = futures[future]
                     try:
-                        self.screaming_frog_data[target_file] = pd.read_csv(csv_file_path, low_memory=False)
-                        relative_path = os.path.relpath(csv_file_path, data_folder)
-                        print(f"  Loaded {target_file}: {len(self.screaming_frog_data[target_file])} rows from {relative_path}")
-                        found = True
-                        break
+                        result = future.result()
+                    except BrokenProcessPool:
+                        # The pool died (e.g. a worker was killed) - parse this file in-process instead
+                        try:
+                            result = load_export_job(jobs[target_file], *self.get_load_spec(target_file),
+                                                     self.streaming, self.chunk_size,
+                                                     sample_rows=self.get_sample_rows(), thresholds=self.thresholds)
+                        except Exception as e:
+                            result = e
                     except Exception as e:
-                        print(f"  Error loading {csv_file_path}: {str(e)}")
-            
-            if not found:
-                print(f"  {target_file} not found (optional)")
+                        result = e
+                    if not isinstance(result, Exception):
+                        try:
+                            result = self.finish_parse(cache, jobs[target_file], target_file, result)
+                        except Exception as e:
+                            result = e
+                    results[target_file] = result
+                    self.report_load(target_file, jobs[target_file], result)
+        except AuditCancelled:
+            cancelled = True
+            raise
+        finally:
+            # A cancelled run drops the files not started yet and doesn't wait for the ones being parsed;
+            # their workers exit once done, and what they write is discarded
+            pool.shutdown(wait=not cancelled, cancel_futures=cancelled)
+            if handoff_dir and store is None:
+                shutil.rmtree(handoff_dir, ignore_errors=True)
+        
+        return results
+    
+    def report_load(self, target_file, csv_file_path, result, rows=True):
+        """Publish a finished (or failed) export load as progress, with its rows unless they were already reported"""
+        rows = result.get('rows', 0) if rows and isinstance(result, dict) else 0
+        self.progress.advance(target_file, self.file_size(csv_file_path), rows)
     
     def update_audit_values(self, wb):
         """Update the audit values in the workbook"""
@@ -332,272 +3024,482 @@ class TechAuditProcessor:
         
         ws = wb['Full Audit']
         
-        # Iterate through rows to find items to update
-        for row in range(2, ws.max_row + 1):  # Start from row 2 to skip header
-            item_id = ws.cell(row=row, column=3).value  # Column C is Item ID
+        # Collect the mapped rows first so each file's metrics can be computed together
+        # (items reusing a value from the previous incremental run aren't computed again)
+        mapped_rows = []
+        calculations_by_file = {}
+        for row, item_id, expected_value in self.get_item_rows(ws):
+            mapping = self.resolve_mapping(self.item_mappings[item_id])
+            mapped_rows.append((row, item_id, expected_value, mapping))
+            if item_id in self.reused_values:
+                continue
+            calculations = calculations_by_file.setdefault(mapping['file'], [])
+            if mapping['calculation'] not in calculations:
+                calculations.append(mapping['calculation'])
+        
+        metric_values = self.calculate_all_metrics(calculations_by_file)
+        
+        # Work out every cell update first, then write them in one pass
+        values = []
+        for row, item_id, expected_value, mapping in mapped_rows:
+            if item_id in self.reused_values:
+                value = self.reused_values[item_id]
+            else:
+                value = int(metric_values[mapping['file']][mapping['calculation']])
+            self.item_values[item_id] = value
+            values.append(value)
+        
+        # Grade every item at once against its rule (Expected Value, column I, unless overridden)
+        statuses = self.rules.grade([entry[1] for entry in mapped_rows], values,
+                                    [entry[2] for entry in mapped_rows], self.get_crawl_size())
+        
+        updates = {}
+        for (row, item_id, expected_value, mapping), value, status in zip(mapped_rows, values, statuses):
+            # Audit Value (column J), Pass/Fail status (column H) and Priority (column K)
+            updates[(row, 10)] = value
+            if status is not None:
+                updates[(row, 8)] = status
+            if status == "Pass":
+                updates[(row, 11)] = "N/A - Pass"
+            elif status is not None and self.template_priorities is not None:
+                updates[(row, 11)] = self.template_priorities.get(row)
             
-            if item_id and str(item_id) in self.item_mappings:
-                # Calculate the value for this item
-                mapping = self.item_mappings[str(item_id)]
-                value = self.calculate_metric(mapping['file'], mapping['calculation'])
-                
-                # Update the Audit Value (column J)
-                ws.cell(row=row, column=10).value = value
-                
-                # Update Pass/Fail status (column H) based on Expected Value (column I)
-                expected_value = ws.cell(row=row, column=9).value
-                
-                # Handle different expected value formats
-                if expected_value is not None:
-                    if str(expected_value).strip() == "0":
-                        # Expected value is 0
-                        if value == 0:
-                            ws.cell(row=row, column=8).value = "Pass"
-                            ws.cell(row=row, column=11).value = "N/A - Pass"  # Update Priority
-                        else:
-                            ws.cell(row=row, column=8).value = "Fail"
-                            # Keep existing priority or set based on severity
-                    elif str(expected_value).isdigit():
-                        # Expected value is a number
-                        expected = int(expected_value)
-                        if value <= expected:
-                            ws.cell(row=row, column=8).value = "Pass"
-                            ws.cell(row=row, column=11).value = "N/A - Pass"
-                        else:
-                            ws.cell(row=row, column=8).value = "Fail"
-                    elif "manual" in str(expected_value).lower():
-                        # Manual review required
-                        ws.cell(row=row, column=8).value = "Opportunity"
-                        # Keep audit value for review
+            # Rows without a grading keep the template's status (and failing rows their priority)
+            if status is None:
+                status = ws.cell(row=row, column=8).value
+            self.item_statuses[item_id] = status
+            if item_id not in self.reused_values:
+                self.drilldown_items.append((row, item_id, mapping, value, status == "Fail"))
+        
+        self.write_cells(ws, updates)
         
         print("Audit values updated successfully")
     
+    def get_crawl_size(self):
+        """Rows of internal_all.csv, which percentage rules are relative to (None if it wasn't loaded)"""
+        for entry in self.profiler.files:
+            if entry['file'] == 'internal_all.csv':
+                return entry['rows']
+        return None
+    
+    def uses_crawl_size(self):
+        """Whether some audited item is graded against a share of the crawl"""
+        expected_values = {item_id: expected_value for _, item_id, expected_value in self.template_rows or []}
+        for item_id in self.get_audit_item_ids():
+            rule = self.rules.rule_for(item_id, expected_values.get(item_id))
+            if rule is not None and rule.percent:
+                return True
+        return False
+    
+    def write_cells(self, ws, updates):
+        """Apply {(row, column): value} updates to a sheet in one pass, row by row"""
+        for (row, column), value in sorted(updates.items()):
+            ws.cell(row=row, column=column).value = value
+    
+    def scan_template_rows(self, ws):
+        """(row, item ID, expected value) of every Full Audit row with an Item ID (column C)"""
+        template_rows = []
+        # Read columns C to I of each row at once, starting below the header
+        for row, values in enumerate(ws.iter_rows(min_row=2, min_col=3, max_col=9, values_only=True), start=2):
+            item_id, expected_value = values[0], values[6]
+            if item_id:
+                template_rows.append((row, str(item_id), str(expected_value) if expected_value is not None else None))
+        return template_rows
+    
+    def get_template_index_path(self, template_hash):
+        return os.path.join(self.cache_dir or ExportCache.default_cache_dir(), "templates", f"{template_hash}.json")
+    
+    def load_template_rows(self, template_hash, wb):
+        """Item rows of the template's Full Audit sheet, scanned only the first time a template is used
+        
+        The rows are stored in the cache folder under the template's content hash, so
+        any edit to the template makes the next run scan it again.
+        """
+        index_path = self.get_template_index_path(template_hash)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return [tuple(entry) for entry in json.load(f)['rows']]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        if 'Full Audit' not in wb.sheetnames:
+            return None
+        template_rows = self.scan_template_rows(wb['Full Audit'])
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.json', dir=os.path.dirname(index_path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'rows': template_rows}, f)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f"  Could not save the template index: {str(e)}")
+        return template_rows
+    
+    def read_template_priorities(self, template_path):
+        """{row: Priority (column K)} of the template's Full Audit item rows"""
+        template_wb = openpyxl.load_workbook(template_path, read_only=True)
+        try:
+            if 'Full Audit' not in template_wb.sheetnames:
+                return {}
+            priorities = {}
+            for row, values in enumerate(template_wb['Full Audit'].iter_rows(min_row=2, min_col=3, max_col=11,
+                                                                             values_only=True), start=2):
+                if values and values[0]:
+                    priorities[row] = values[8] if len(values) > 8 else None
+            return priorities
+        finally:
+            template_wb.close()
+    
+    def get_item_rows(self, ws):
+        """(row, item ID, expected value) of every Full Audit row whose item is mapped"""
+        template_rows = self.template_rows if self.template_rows is not None else self.scan_template_rows(ws)
+        return [entry for entry in template_rows if entry[1] in self.item_mappings]
+    
+    def get_drilldown_folder(self, output_path):
+        """Folder of a report's drill-down CSV files"""
+        return f"{os.path.splitext(output_path)[0]}_drilldown"
+    
+    def write_drilldowns(self, wb, output_path):
+        """List the URLs behind each failing item as a tab of the report or a CSV file next to it
+        
+        The rows come from the metrics' own masks (see MetricEngine.sample), so nothing is
+        read again. Tabs are streamed to disk as they are written, and the item's Audit Value
+        links to its list. Returns the number of lists written.
+        """
+        from openpyxl.worksheet.hyperlink import Hyperlink
+        
+        ws = wb['Full Audit']
+        written = 0
+        for row, item_id, mapping, value, failing in self.drilldown_items:
+            sheet_name = f"{item_id} {mapping['calculation']}"[:31]
+            value_cell = ws.cell(row=row, column=10)
+            
+            # A patched report may hold this item's list from the previous run
+            if sheet_name in wb.sheetnames:
+                del wb[sheet_name]
+            value_cell.hyperlink = None
+            if not failing:
+                continue
+            
+            sample = self.drilldown_samples.get((mapping['file'], mapping['calculation']))
+            if sample is None or not len(sample):
+                reason = " in streaming mode" if self.streaming else ""
+                print(f"  No URL list for item {item_id} ({mapping['calculation']}) - its rows can't be listed{reason}")
+                continue
+            
+            if self.drilldown == "csv":
+                folder = self.get_drilldown_folder(output_path)
+                os.makedirs(folder, exist_ok=True)
+                csv_path = os.path.join(folder, f"{item_id}_{mapping['calculation']}.csv")
+                sample.to_csv(csv_path, index=False)
+                value_cell.hyperlink = f"{os.path.basename(folder)}/{os.path.basename(csv_path)}"
+            else:
+                sheet = create_streaming_sheet(wb, sheet_name)
+                sheet.append(list(sample.columns))
+                for values in sample.astype(object).itertuples(index=False):
+                    sheet.append([None if pd.isna(v) else v for v in values])
+                if value > len(sample):
+                    sheet.append([f"... {value - len(sample)} more row(s) not listed (limit {self.drilldown_max_rows})"])
+                value_cell.hyperlink = Hyperlink(ref=value_cell.coordinate, location=f"'{sheet_name}'!A1")
+            
+            print(f"  Item {item_id}: listed {len(sample)} of {value} row(s)")
+            written += 1
+        return written
+    
+    def get_template_items(self, wb):
+        """Item IDs the template's Full Audit sheet uses"""
+        if 'Full Audit' not in wb.sheetnames:
+            return []
+        return list(dict.fromkeys(item_id for _, item_id, _ in self.get_item_rows(wb['Full Audit'])))
+    
+    def calculate_all_metrics(self, calculations_by_file):
+        """Compute every file's metrics, one group per file, independent groups concurrently"""
+        # Lookups shared between groups are built first so concurrent groups don't race to build them
+        all_calculations = [c for calculations in calculations_by_file.values() for c in calculations]
+        self.progress.start("metrics", len(all_calculations) or None)
+        for reference in MetricEngine.references_for(all_calculations):
+            self.get_url_set(reference)
+        if any(MetricEngine.graph_method(c) for c in all_calculations):
+            try:
+                self.get_redirect_graph()
+            except Exception as e:
+                print(f"Error building redirect graph: {str(e)}")
+        
+        def calculate(file_name, calculations):
+            results = self.calculate_file_metrics(file_name, calculations)
+            self.progress.advance(file_name, len(calculations))
+            return results
+        
+        workers = min(len(calculations_by_file), self.workers or os.cpu_count() or 1)
+        if workers <= 1:
+            return {file_name: calculate(file_name, calculations)
+                    for file_name, calculations in calculations_by_file.items()}
+        
+        # Vectorised pandas work releases the GIL for much of its time, so threads overlap well
+        # and share the loaded frames without copying them. A cancelled run stops every group
+        # at its next metric (see MetricEngine.compute)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {file_name: pool.submit(calculate, file_name, calculations)
+                       for file_name, calculations in calculations_by_file.items()}
+            return {file_name: future.result() for file_name, future in futures.items()}
+    
     def calculate_metric(self, file_name, calculation_type):
         """Calculate specific metrics from Screaming Frog data"""
-        if file_name not in self.screaming_frog_data:
-            return 0  # Return 0 if file not found
+        return self.calculate_file_metrics(file_name, [calculation_type])[calculation_type]
+    
+    def calculate_file_metrics(self, file_name, calculation_types):
+        """Calculate several metrics for one file in a single pass over shared masks"""
+        graph_metrics = [c for c in calculation_types if MetricEngine.graph_method(c)]
+        if graph_metrics:
+            results = self.calculate_graph_metrics(graph_metrics)
+            others = [c for c in calculation_types if not MetricEngine.graph_method(c)]
+            results.update(self.calculate_file_metrics(file_name, others) if others else {})
+            return {calculation_type: results[calculation_type] for calculation_type in calculation_types}
         
-        df = self.screaming_frog_data[file_name]
+        if file_name in self.streamed_metrics:
+            totals = self.streamed_metrics[file_name]
+            # Cross-export metrics need the other exports' URL sets, so they get their own pass
+            pending = [c for c in calculation_types if MetricEngine.needs_whole_crawl(c) and c not in totals]
+            if pending:
+                totals.update(self.stream_cross_file_metrics(file_name, pending))
+            return {calculation_type: totals.get(calculation_type, 0) for calculation_type in calculation_types}
+        
+        if file_name not in self.screaming_frog_data:
+            return {calculation_type: 0 for calculation_type in calculation_types}  # Return 0 if file not found
         
+        engine = MetricEngine(self.screaming_frog_data[file_name], self, self.get_sample_rows())
+        results = engine.compute(calculation_types)
+        self.record_metric_timings(file_name, engine.timings, len(engine.df))
+        self.record_samples(file_name, engine.samples)
+        return results
+    
+    def record_metric_timings(self, file_name, timings, rows):
+        for calculation_type, seconds in timings.items():
+            self.profiler.record_metric(file=file_name, metric=calculation_type, rows=rows, seconds=round(seconds, 4))
+    
+    def stream_cross_file_metrics(self, file_name, calculation_types):
+        """Count cross-export metrics over a streamed export in a second chunked pass"""
+        columns = MetricEngine.required_columns(calculation_types)
+        if self.drilldown and 'Address' not in columns:
+            columns.append('Address')
         try:
-            # SITEMAP CALCULATIONS
-            if calculation_type == "urls_not_in_sitemap":
-                # This requires comparing URLs - implement if both files exist
-                return 0
-            
-            elif calculation_type == "non_200_in_sitemap":
-                if 'Status Code' in df.columns:
-                    return len(df[df['Status Code'] != 200])
-                return 0
-            
-            elif calculation_type == "non_indexable_in_sitemap":
-                if 'Indexability' in df.columns:
-                    return len(df[df['Indexability'] != 'Indexable'])
-                return 0
-            
-            # CANONICAL CALCULATIONS
-            elif calculation_type == "missing_canonical":
-                if 'Canonical Link Element 1' in df.columns:
-                    # Only count HTML pages
-                    if 'Content Type' in df.columns:
-                        html_df = df[df['Content Type'].str.contains('text/html', na=False)]
-                    else:
-                        html_df = df
-                    return len(html_df[html_df['Canonical Link Element 1'].isna()])
-                return 0
-            
-            elif calculation_type == "canonicalised_pages":
-                if 'Canonical Link Element 1' in df.columns and 'Address' in df.columns:
-                    canonicalised = df[
-                        (df['Canonical Link Element 1'].notna()) & 
-                        (df['Canonical Link Element 1'] != df['Address'])
-                    ]
-                    return len(canonicalised)
-                return 0
-            
-            elif calculation_type == "canonical_different_domain":
-                if 'Canonical Link Element 1' in df.columns and 'Address' in df.columns:
-                    def get_domain(url):
-                        try:
-                            return urlparse(str(url)).netloc
-                        except:
-                            return ''
-                    
-                    df_copy = df.copy()
-                    df_copy['Page Domain'] = df_copy['Address'].apply(get_domain)
-                    df_copy['Canonical Domain'] = df_copy['Canonical Link Element 1'].apply(get_domain)
-                    
-                    different_domain = df_copy[
-                        (df_copy['Canonical Link Element 1'].notna()) &
-                        (df_copy['Page Domain'] != df_copy['Canonical Domain']) &
-                        (df_copy['Canonical Domain'] != '')
-                    ]
-                    return len(different_domain)
-                return 0
-            
-            # CRAWLABILITY CALCULATIONS
-            elif calculation_type == "pages_with_noindex":
-                if 'Meta Robots 1' in df.columns:
-                    noindex_pages = df[df['Meta Robots 1'].str.contains('noindex', na=False, case=False)]
-                    return len(noindex_pages)
-                return 0
-            
-            elif calculation_type == "pages_with_nofollow":
-                if 'Meta Robots 1' in df.columns:
-                    nofollow_pages = df[df['Meta Robots 1'].str.contains('nofollow', na=False, case=False)]
-                    return len(nofollow_pages)
-                return 0
-            
-            elif calculation_type == "robots_txt_blocked":
-                if 'Indexability' in df.columns:
-                    blocked = df[df['Indexability'].str.contains('Blocked by robots.txt', na=False, case=False)]
-                    return len(blocked)
-                return 0
-            
-            # PAGE TITLE CALCULATIONS
-            elif calculation_type == "missing_page_titles":
-                if 'Title 1' in df.columns:
-                    missing = df[df['Title 1'].isna() | (df['Title 1'] == '')]
-                    return len(missing)
-                return 0
-            
-            elif calculation_type == "duplicate_page_titles":
-                if 'Title 1' in df.columns:
-                    # Only count non-empty titles
-                    non_empty = df[df['Title 1'].notna() & (df['Title 1'] != '')]
-                    duplicates = non_empty[non_empty.duplicated(subset=['Title 1'], keep=False)]
-                    return len(duplicates)
-                return 0
-            
-            elif calculation_type == "long_page_titles":
-                if 'Title 1 Length' in df.columns:
-                    long_titles = df[df['Title 1 Length'] > 60]
-                    return len(long_titles)
-                return 0
-            
-            elif calculation_type == "short_page_titles":
-                if 'Title 1 Length' in df.columns:
-                    short_titles = df[(df['Title 1 Length'] < 30) & (df['Title 1 Length'] > 0)]
-                    return len(short_titles)
-                return 0
-            
-            # META DESCRIPTION CALCULATIONS
-            elif calculation_type == "missing_meta_descriptions":
-                if 'Meta Description 1' in df.columns:
-                    missing = df[df['Meta Description 1'].isna() | (df['Meta Description 1'] == '')]
-                    return len(missing)
-                return 0
-            
-            elif calculation_type == "duplicate_meta_descriptions":
-                if 'Meta Description 1' in df.columns:
-                    non_empty = df[df['Meta Description 1'].notna() & (df['Meta Description 1'] != '')]
-                    duplicates = non_empty[non_empty.duplicated(subset=['Meta Description 1'], keep=False)]
-                    return len(duplicates)
-                return 0
-            
-            elif calculation_type == "long_meta_descriptions":
-                if 'Meta Description 1 Length' in df.columns:
-                    long_meta = df[df['Meta Description 1 Length'] > 160]
-                    return len(long_meta)
-                return 0
-            
-            elif calculation_type == "short_meta_descriptions":
-                if 'Meta Description 1 Length' in df.columns:
-                    short_meta = df[(df['Meta Description 1 Length'] < 120) & (df['Meta Description 1 Length'] > 0)]
-                    return len(short_meta)
-                return 0
-            
-            # H1 CALCULATIONS
-            elif calculation_type == "missing_h1":
-                if 'H1-1' in df.columns:
-                    missing = df[df['H1-1'].isna() | (df['H1-1'] == '')]
-                    return len(missing)
-                return 0
-            
-            elif calculation_type == "duplicate_h1":
-                if 'H1-1' in df.columns:
-                    non_empty = df[df['H1-1'].notna() & (df['H1-1'] != '')]
-                    duplicates = non_empty[non_empty.duplicated(subset=['H1-1'], keep=False)]
-                    return len(duplicates)
-                return 0
-            
-            elif calculation_type == "multiple_h1":
-                if 'H1-2' in df.columns:
-                    multiple = df[df['H1-2'].notna()]
-                    return len(multiple)
-                return 0
-            
-            # IMAGE CALCULATIONS
-            elif calculation_type == "images_missing_alt":
-                if 'Alt Text' in df.columns:
-                    missing_alt = df[df['Alt Text'].isna() | (df['Alt Text'] == '')]
-                    return len(missing_alt)
-                return 0
-            
-            elif calculation_type == "images_over_100kb":
-                if 'Size (Bytes)' in df.columns:
-                    large_images = df[df['Size (Bytes)'] > 100000]
-                    return len(large_images)
-                return 0
-            
-            elif calculation_type == "broken_images":
-                if 'Status Code' in df.columns:
-                    broken = df[df['Status Code'] != 200]
-                    return len(broken)
-                return 0
-            
-            # RESPONSE CODE CALCULATIONS
-            elif calculation_type == "client_4xx_errors":
-                if 'Status Code' in df.columns:
-                    errors_4xx = df[(df['Status Code'] >= 400) & (df['Status Code'] < 500)]
-                    return len(errors_4xx)
-                return 0
-            
-            elif calculation_type == "server_5xx_errors":
-                if 'Status Code' in df.columns:
-                    errors_5xx = df[df['Status Code'] >= 500]
-                    return len(errors_5xx)
-                return 0
-            
-            elif calculation_type == "status_404_count":
-                if 'Status Code' in df.columns:
-                    return len(df[df['Status Code'] == 404])
-                return 0
-            
-            # REDIRECT CALCULATIONS
-            elif calculation_type == "redirect_chains":
-                # If we have the redirect chains file
-                if 'redirect_chains_all.csv' in self.screaming_frog_data:
-                    chains_df = self.screaming_frog_data['redirect_chains_all.csv']
-                    return len(chains_df)
-                return 0
-            
-            elif calculation_type == "redirect_loops":
-                # If we have the redirect loops file
-                if 'redirect_loops_all.csv' in self.screaming_frog_data:
-                    loops_df = self.screaming_frog_data['redirect_loops_all.csv']
-                    return len(loops_df)
-                return 0
-            
-            elif calculation_type == "temporary_redirects":
-                if 'Status Code' in df.columns:
-                    temp_redirects = df[(df['Status Code'] == 302) | (df['Status Code'] == 307)]
-                    return len(temp_redirects)
-                return 0
-            
-            # Default return
-            return 0
-            
+            accumulator = stream_export_csv(self.loaded_paths[file_name], calculation_types, columns,
+                                            self.chunk_size, self, self.get_sample_rows())
+            self.record_metric_timings(file_name, accumulator.timings, accumulator.rows)
+            self.record_samples(file_name, accumulator.samples)
+            return accumulator.results()
         except Exception as e:
-            print(f"Error calculating {calculation_type}: {str(e)}")
-            return 0
+            print(f"Error calculating {', '.join(calculation_types)}: {str(e)}")
+            return {calculation_type: 0 for calculation_type in calculation_types}
+    
+    def calculate_graph_metrics(self, calculation_types):
+        """Metrics read off the redirect graph of internal_all.csv (0 if it can't be built)"""
+        try:
+            graph = self.get_redirect_graph()
+        except Exception as e:
+            print(f"Error building redirect graph: {str(e)}")
+            graph = None
+        
+        results = {}
+        for calculation_type in calculation_types:
+            self.progress.check()
+            started = time.perf_counter()
+            results[calculation_type] = getattr(graph, MetricEngine.graph_method(calculation_type))() if graph else 0
+            self.profiler.record_metric(file='internal_all.csv', metric=calculation_type,
+                                        rows=len(graph.nodes) if graph else 0,
+                                        seconds=round(time.perf_counter() - started, 4))
+            if self.get_sample_rows() and results[calculation_type]:
+                self.record_samples('internal_all.csv', {calculation_type: self.sample_graph_urls(graph, calculation_type)})
+        return results
+    
+    def sample_graph_urls(self, graph, calculation_type):
+        """Rows of internal_all.csv for the first URLs a redirect graph metric counts (None when it was streamed)"""
+        df = self.screaming_frog_data.get('internal_all.csv')
+        if df is None:
+            return None
+        url_hashes_of_rows = url_hashes(df['Address'])
+        wanted = getattr(graph, MetricEngine.METRICS[calculation_type]['graph_urls'])()
+        rows = url_hashes_of_rows.index[url_hashes_of_rows.isin(wanted).to_numpy()][:self.get_sample_rows()]
+        return df.loc[rows, RedirectGraph.COLUMNS].reset_index(drop=True)
+    
+    def get_sample_rows(self):
+        """Rows to keep of each metric's matches for drill-down reports (None when they're off)"""
+        return self.drilldown_max_rows if self.drilldown else None
+    
+    def record_samples(self, file_name, samples):
+        for calculation_type, sample in samples.items():
+            if sample is not None:
+                self.drilldown_samples[(file_name, calculation_type)] = sample
+    
+    def get_redirect_graph(self):
+        """The crawl's redirect graph, or None if internal_all.csv (or its Redirect URL column) is missing"""
+        if self.redirect_graph is None:
+            self.redirect_graph = self.build_redirect_graph() or False
+        return self.redirect_graph or None
+    
+    def build_redirect_graph(self):
+        file_name = 'internal_all.csv'
+        graph = RedirectGraph()
+        started = time.perf_counter()
+        
+        if file_name in self.screaming_frog_data:
+            df = self.screaming_frog_data[file_name]
+            if not all(column in df.columns for column in RedirectGraph.COLUMNS):
+                return None
+            graph.add(df)
+        elif file_name in self.streamed_metrics:
+            # Streamed exports aren't kept in memory - read just the redirect columns again
+            for chunk in iter_export_chunks(self.loaded_paths[file_name], RedirectGraph.COLUMNS, self.chunk_size):
+                if chunk is None:
+                    graph = RedirectGraph()
+                    continue
+                if not all(column in chunk.columns for column in RedirectGraph.COLUMNS):
+                    return None
+                graph.add(chunk)
+        else:
+            return None
+        
+        graph.build()
+        self.profiler.record_metric(file=file_name, metric="redirect_graph (build)", rows=len(graph.nodes),
+                                    seconds=round(time.perf_counter() - started, 4))
+        lengths = graph.chain_heads()
+        longest = f" (longest {lengths.max()} hops)" if len(lengths) else ""
+        print(f"Redirect graph: {len(graph.nodes)} URLs, {graph.chain_count()} chain(s){longest}, "
+              f"{graph.loop_count()} loop(s)")
+        return graph
+    
+    def get_url_set(self, name):
+        """A URL set from another export (see MetricEngine.URL_SETS), or None if that export wasn't loaded"""
+        if name not in self.url_sets:
+            self.url_sets[name] = self.build_url_set(name)
+        return self.url_sets[name]
+    
+    def build_url_set(self, name):
+        started = time.perf_counter()
+        url_set = self._build_url_set(name)
+        if url_set is not None:
+            self.profiler.record_metric(file=MetricEngine.URL_SETS[name]['file'], metric=f"{name} (URL set)",
+                                        rows=len(url_set), seconds=round(time.perf_counter() - started, 4))
+        return url_set
+    
+    def _build_url_set(self, name):
+        file_name = MetricEngine.URL_SETS[name]['file']
+        url_set = UrlSet()
+        
+        if file_name in self.screaming_frog_data:
+            url_set.update(MetricEngine(self.screaming_frog_data[file_name]).reference_urls(name))
+            return url_set
+        
+        if file_name not in self.streamed_metrics:
+            return None
+        
+        # Streamed exports aren't kept in memory - read just the set's columns again
+        columns = MetricEngine.URL_SETS[name]['columns']
+        for chunk in iter_export_chunks(self.loaded_paths[file_name], columns, self.chunk_size):
+            if chunk is None:
+                url_set = UrlSet()
+                continue
+            url_set.update(MetricEngine(chunk).reference_urls(name))
+        return url_set
+    
+    def get_import_mode(self, excel_file_path):
+        """How to copy an imported workbook: "full", "bulk" or "values"
+        
+        "full" copies cell by cell with merged cells, column widths and row heights.
+        "bulk" streams rows from a read-only workbook and keeps cell styles only.
+        "values" streams rows without any styling. "auto" (the default) uses "full"
+        for small files and "bulk" from import_bulk_min_bytes upwards.
+        """
+        if self.import_mode != "auto":
+            return self.import_mode
+        try:
+            if os.path.getsize(excel_file_path) >= self.import_bulk_min_bytes:
+                return "bulk"
+        except OSError:
+            pass
+        return "full"
+    
+    def copy_sheet_full(self, source_sheet, new_sheet, styles):
+        """Copy a sheet cell by cell, including merged cells and dimensions; returns the number of rows"""
+        from openpyxl.cell.cell import MergedCell
+        
+        # Copy merged cells if any
+        if source_sheet.merged_cells:
+            for merged_range in source_sheet.merged_cells.ranges:
+                new_sheet.merge_cells(str(merged_range))
+        
+        # Copy all cells from source to target
+        for index, row in enumerate(source_sheet.iter_rows(), 1):
+            if index % 1000 == 0:
+                self.progress.check()
+            for cell in row:
+                new_cell = new_sheet.cell(row=cell.row, column=cell.column)
+                
+                # Cells covered by a merged range hold no value of their own
+                if isinstance(new_cell, MergedCell):
+                    continue
+                
+                # Copy value
+                new_cell.value = cell.value
+                
+                # Copy basic formatting if available
+                if cell.has_style:
+                    styles.apply(cell, new_cell, tuple(cell._style))
+        
+        # Copy column widths
+        for column in source_sheet.column_dimensions:
+            new_sheet.column_dimensions[column].width = source_sheet.column_dimensions[column].width
+        
+        # Copy row heights
+        for row in source_sheet.row_dimensions:
+            new_sheet.row_dimensions[row].height = source_sheet.row_dimensions[row].height
+        
+        return source_sheet.max_row
+    
+    def copy_sheet_bulk(self, source_sheet, new_sheet, styles=None):
+        """Stream whole rows from a read-only sheet into a write-only one, restyling cells only when styles is given
+        
+        Returns the number of rows copied.
+        """
+        from openpyxl.cell.cell import WriteOnlyCell
+        
+        # Read-only sheets trust the stored dimensions, which some exporters get wrong
+        source_sheet.reset_dimensions()
+        
+        # A cancelled run stops within 1,000 rows of a big sheet
+        rows = 0
+        if styles is None:
+            for values in source_sheet.iter_rows(values_only=True):
+                new_sheet.append(values)
+                rows += 1
+                if rows % 1000 == 0:
+                    self.progress.check()
+            return rows
+        
+        for row in source_sheet.iter_rows():
+            values = []
+            for cell in row:
+                if getattr(cell, 'has_style', False):
+                    new_cell = WriteOnlyCell(new_sheet, value=cell.value)
+                    styles.apply(cell, new_cell, cell._style_id)
+                    values.append(new_cell)
+                else:
+                    values.append(cell.value)
+            new_sheet.append(values)
+            rows += 1
+            if rows % 1000 == 0:
+                self.progress.check()
+        return rows
     
-    def import_existing_sheets_recursive(self, workbook, folder_path):
+    def import_existing_sheets_recursive(self, workbook, folder_path, file_index=None):
         """Import all Excel files from all subfolders as new sheets"""
         print("Looking for Excel files to import recursively...")
         
         # Find all Excel files recursively
-        excel_files = self.find_files_recursively(folder_path, ['.xlsx', '.xls'])
+        if file_index is None:
+            file_index = self.build_file_index(folder_path)
+        excel_files = file_index.with_extensions(['.xlsx', '.xls'])
         
         # Filter out temporary files and our own output files
         filtered_excel_files = []
@@ -609,17 +3511,26 @@ class TechAuditProcessor:
                 'Technical_Audit' not in file_name):
                 filtered_excel_files.append(file_path)
         
+        # Incremental runs keep the patched report's tabs of unchanged workbooks
+        kept_count = 0
+        if self.incremental:
+            filtered_excel_files, kept_count = self.keep_unchanged_imports(workbook, folder_path, filtered_excel_files)
+        
         if not filtered_excel_files:
-            print("No Excel files found to import")
-            return 0
+            print("No changed Excel files to import" if kept_count else "No Excel files found to import")
+            return kept_count
         
         print(f"Found {len(filtered_excel_files)} Excel file(s) to import")
+        self.progress.start("import", sum(self.file_size(path) for path in filtered_excel_files) or None)
         
         # Get existing sheet names to track what we have
         existing_sheets = set(workbook.sheetnames)
         imported_count = 0
         
         for excel_file_path in filtered_excel_files:
+            self.progress.check()
+            started = time.perf_counter()
+            rows = 0
             try:
                 file_name = os.path.basename(excel_file_path)
                 relative_path = os.path.relpath(excel_file_path, folder_path)
@@ -627,7 +3538,10 @@ class TechAuditProcessor:
                 
                 # Open the source workbook
                 # Use data_only=True to get calculated values instead of formulas
-                source_wb = load_workbook(excel_file_path, data_only=True)
+                # Large files are streamed from a read-only workbook instead of loaded cell by cell
+                import_mode = self.get_import_mode(excel_file_path)
+                source_wb = openpyxl.load_workbook(excel_file_path, data_only=True, read_only=(import_mode != "full"))
+                styles = StyleInterner()
                 
                 # Copy each sheet from the source workbook
                 for sheet_name in source_wb.sheetnames:
@@ -675,76 +3589,363 @@ class TechAuditProcessor:
                     
                     print(f"  - Sheet naming: '{sheet_name}' -> '{new_sheet_name}'")
                     
-                    # Create new sheet in target workbook
-                    new_sheet = workbook.create_sheet(new_sheet_name)
+                    # Create new sheet in target workbook - bulk data tabs are streamed to disk as they are written
+                    if import_mode == "full":
+                        new_sheet = workbook.create_sheet(new_sheet_name)
+                    else:
+                        new_sheet = create_streaming_sheet(workbook, new_sheet_name)
                     existing_sheets.add(new_sheet_name)
+                    if relative_path in self.imported_sheets:
+                        self.imported_sheets[relative_path]['sheets'].append(new_sheet_name)
                     
                     # Get source sheet
                     source_sheet = source_wb[sheet_name]
                     
-                    # Copy merged cells if any
-                    if source_sheet.merged_cells:
-                        for merged_range in source_sheet.merged_cells.ranges:
-                            new_sheet.merge_cells(str(merged_range))
-                    
-                    # Copy all cells from source to target
-                    for row in source_sheet.iter_rows():
-                        for cell in row:
-                            new_cell = new_sheet.cell(row=cell.row, column=cell.column)
-                            
-                            # Copy value
-                            new_cell.value = cell.value
-                            
-                            # Copy basic formatting if available
-                            try:
-                                if cell.has_style:
-                                    new_cell.font = openpyxl.styles.Font(
-                                        bold=cell.font.bold if cell.font else False,
-                                        italic=cell.font.italic if cell.font else False,
-                                        color=cell.font.color if cell.font else None
-                                    )
-                                    if cell.fill and cell.fill.fill_type:
-                                        new_cell.fill = openpyxl.styles.PatternFill(
-                                            fill_type=cell.fill.fill_type,
-                                            start_color=cell.fill.start_color,
-                                            end_color=cell.fill.end_color
-                                        )
-                                    if cell.alignment:
-                                        new_cell.alignment = openpyxl.styles.Alignment(
-                                            horizontal=cell.alignment.horizontal,
-                                            vertical=cell.alignment.vertical,
-                                            wrap_text=cell.alignment.wrap_text
-                                        )
-                            except:
-                                # Skip formatting if there's any error
-                                pass
-                    
-                    # Copy column widths
-                    for column in source_sheet.column_dimensions:
-                        new_sheet.column_dimensions[column].width = source_sheet.column_dimensions[column].width
-                    
-                    # Copy row heights
-                    for row in source_sheet.row_dimensions:
-                        new_sheet.row_dimensions[row].height = source_sheet.row_dimensions[row].height
+                    if import_mode == "full":
+                        rows += self.copy_sheet_full(source_sheet, new_sheet, styles)
+                    else:
+                        rows += self.copy_sheet_bulk(source_sheet, new_sheet, styles if import_mode == "bulk" else None)
                     
                     print(f"  - Imported sheet '{sheet_name}' as '{new_sheet_name}'")
                 
                 source_wb.close()
                 imported_count += 1
+                self.profiler.record_import(path=relative_path, mode=import_mode, rows=rows,
+                                            seconds=round(time.perf_counter() - started, 4))
                 
             except Exception as e:
                 print(f"  - Error importing {relative_path}: {str(e)}")
-                continue
+                # Forget the hash so the next incremental run drops any partial tabs and tries again
+                if relative_path in self.imported_sheets:
+                    self.imported_sheets[relative_path]['hash'] = None
+            
+            self.progress.advance(os.path.basename(excel_file_path), self.file_size(excel_file_path), rows)
         
         print(f"\nExcel file import complete - imported {imported_count} file(s)")
-        return imported_count
+        return imported_count + kept_count
+    
+    def keep_unchanged_imports(self, workbook, folder_path, excel_files):
+        """Keep the tabs of workbooks unchanged since the previous run, drop those of changed or removed ones
+        
+        Returns (files still to import, number of workbooks kept). Tabs are only kept
+        when patching the previous report - a fresh template has none.
+        """
+        previous = (self.previous_run or {}).get('workbooks', {}) if self.patching else {}
+        to_import = []
+        for excel_file_path in excel_files:
+            relative_path = os.path.relpath(excel_file_path, folder_path)
+            earlier = previous.get(relative_path)
+            try:
+                fingerprint = file_fingerprint(excel_file_path, earlier)
+            except OSError:
+                to_import.append(excel_file_path)
+                continue
+            
+            if (earlier and fingerprint['hash'] == earlier['hash']
+                    and all(sheet_name in workbook.sheetnames for sheet_name in earlier['sheets'])):
+                self.imported_sheets[relative_path] = dict(fingerprint, sheets=earlier['sheets'])
+            else:
+                self.imported_sheets[relative_path] = dict(fingerprint, sheets=[])
+                to_import.append(excel_file_path)
+        
+        removed = 0
+        for relative_path, earlier in previous.items():
+            if self.imported_sheets.get(relative_path, {}).get('sheets') == earlier['sheets']:
+                continue
+            for sheet_name in earlier['sheets']:
+                if sheet_name in workbook.sheetnames:
+                    del workbook[sheet_name]
+                    removed += 1
+        
+        kept = len(excel_files) - len(to_import)
+        if previous:
+            print(f"Keeping tabs of {kept} unchanged Excel file(s), removed {removed} outdated tab(s)")
+        return to_import, kept
+
+    
+    def diff_crawls(self, before_folder, after_folder, client_name="", output_folder=None):
+        """Compare two crawls item by item and list the URLs that started or stopped failing
+        
+        The crawls are loaded one after the other and only 64-bit hashes of each item's
+        failing URLs (and of the URLs in each export the items read) are kept in between,
+        so memory is bounded by one crawl's load (one chunk in streaming mode) plus
+        8 bytes per URL. Failing URL sets are compared with hash joins, and the URL
+        sets of the export an item reads tell whether a URL was added to or dropped
+        from the crawl.
+        
+        Writes a workbook of per-item deltas and a CSV with one row per changed URL;
+        returns their paths.
+        """
+        for folder in (before_folder, after_folder):
+            if not os.path.isdir(folder):
+                raise ValueError(f"Data folder not found: {folder}")
+        
+        output_path = self.get_output_path(client_name, output_folder, "Technical_Audit_Diff")
+        changes_path = f"{os.path.splitext(output_path)[0]}_url_changes.csv"
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        
+        # Both crawls are measured with the later one's thresholds, so only the crawls differ
+        self.load_rules(client_name, after_folder)
+        self.diffing = True
+        self.audit_items = None
+        self.reused_values = {}
+        try:
+            before = self.snapshot_crawl(before_folder)
+            after = self.snapshot_crawl(after_folder)
+        finally:
+            self.diffing = False
+        
+        print("\nComparing crawls...")
+        item_changes = {item_id: self.diff_item(before, after, item_id) for item_id in self.get_audit_item_ids()}
+        
+        # URLs that started failing are listed as the later crawl has them, fixed ones as the earlier crawl had them
+        wanted = {'before': {}, 'after': {}}
+        for item_id, changes in item_changes.items():
+            if changes is None:
+                continue
+            for side, crawl, kinds in (('after', after, ("Newly failing", "New URL failing")),
+                                       ('before', before, ("Fixed", "Failing URL removed"))):
+                file_name = crawl['mappings'][item_id]['file']
+                hashes = wanted[side].get(file_name, pd.Index([], dtype='uint64'))
+                for kind in kinds:
+                    hashes = hashes.union(changes[kind])
+                wanted[side][file_name] = hashes
+        addresses = {side: self.lookup_addresses(crawl['paths'], wanted[side])
+                     for side, crawl in (('before', before), ('after', after))}
+        
+        self.write_crawl_diff(output_path, changes_path, before, after, item_changes, addresses)
+        print(f"Crawl diff saved to: {output_path}")
+        print(f"URL changes saved to: {changes_path}")
+        return output_path, changes_path
+    
+    def reset_crawl_data(self):
+        """Drop everything loaded from a crawl"""
+        self.screaming_frog_data = self.new_export_store()
+        self.streamed_metrics = {}
+        self.loaded_paths = {}
+        self.url_sets = {}
+        self.redirect_graph = None
+    
+    def snapshot_crawl(self, data_folder):
+        """Load a crawl and keep what a diff needs: item values, failing URL hashes and crawled URL hashes"""
+        print(f"\nLoading crawl: {data_folder}")
+        self.reset_crawl_data()
+        file_index = self.build_file_index(data_folder)
+        files = self.get_required_files(file_index)
+        if 'internal_all.csv' not in files:
+            files.append('internal_all.csv')
+        self.load_screaming_frog_data_recursive(data_folder, file_index, files)
+        
+        mappings = {item_id: self.resolve_mapping(self.item_mappings[item_id]) for item_id in self.get_audit_item_ids()}
+        calculations_by_file = {}
+        for mapping in mappings.values():
+            calculations = calculations_by_file.setdefault(mapping['file'], [])
+            if mapping['calculation'] not in calculations:
+                calculations.append(mapping['calculation'])
+        
+        values = self.calculate_all_metrics(calculations_by_file)
+        export_urls = {}
+        failing = {file_name: self.collect_failing_urls(file_name, calculations, export_urls)
+                   for file_name, calculations in calculations_by_file.items()}
+        crawled = self.get_url_set('crawled_urls')
+        
+        snapshot = {
+            'folder': data_folder,
+            'mappings': mappings,
+            'values': {item_id: int(values[m['file']][m['calculation']]) for item_id, m in mappings.items()},
+            'failing': {item_id: failing[m['file']][m['calculation']] for item_id, m in mappings.items()},
+            'crawled': crawled.index if crawled is not None else None,
+            'export_urls': export_urls,
+            'paths': dict(self.loaded_paths),
+        }
+        self.reset_crawl_data()
+        return snapshot
+    
+    def collect_failing_urls(self, file_name, calculation_types, export_urls=None):
+        """Hashes of the URLs (Address) of the rows each metric counts, or None where they can't be told
+        
+        Loaded frames are used as they are; streamed exports are read again chunk by
+        chunk. Duplicate metrics keep a value hash per row until the whole export has
+        been seen, since a value's repeats can be in different chunks (see DuplicateFinder).
+        With export_urls, the hashes of every URL in the export are stored in it under
+        file_name, from the same pass.
+        """
+        results = {}
+        row_calculations = []
+        for calculation_type in calculation_types:
+            method = MetricEngine.METRICS.get(calculation_type, {}).get('graph_urls')
+            if method:
+                graph = self.get_redirect_graph()
+                results[calculation_type] = getattr(graph, method)() if graph else None
+            else:
+                row_calculations.append(calculation_type)
+        if not row_calculations:
+            return results
+        
+        if file_name in self.screaming_frog_data:
+            frames = [self.screaming_frog_data[file_name]]
+        elif file_name in self.streamed_metrics:
+            columns = MetricEngine.required_columns(row_calculations)
+            columns += [column for column in MetricEngine.URL_SETS['crawled_urls']['columns'] if column not in columns]
+            frames = iter_export_chunks(self.loaded_paths[file_name], columns, self.chunk_size)
+        else:
+            # Export not loaded - only counts can be compared
+            results.update({calculation_type: None for calculation_type in row_calculations})
+            return results
+        
+        parts = {calculation_type: [] for calculation_type in row_calculations}
+        finders = {}
+        url_parts = []
+        try:
+            for frame in frames:
+                if frame is None:
+                    # The read restarted - discard what was collected so far
+                    parts = {calculation_type: [] for calculation_type in row_calculations}
+                    finders = {}
+                    url_parts = []
+                    continue
+                if 'Address' not in frame.columns:
+                    parts = {calculation_type: None for calculation_type in row_calculations}
+                    url_parts = None
+                    break
+                
+                engine = MetricEngine(frame, self)
+                urls = engine.url_hashes('Address')
+                url_parts.append(urls.unique())
+                for calculation_type in row_calculations:
+                    if parts[calculation_type] is None:
+                        continue
+                    column = MetricEngine.duplicate_column(calculation_type)
+                    if column:
+                        # Keep (value hash, URL hash) of every non-empty value; 0 marks rows without a URL
+                        if engine.has(column):
+                            positions, codes, values, hashes = engine.distinct_values(column)
+                            finder = finders.setdefault(
+                                calculation_type, DuplicateFinder(engine.thresholds['near_duplicate_similarity']))
+                            finder.add(hashes, np.bincount(codes, minlength=len(hashes)), values)
+                            row_hashes = pd.Series(hashes[codes], index=frame.index[positions])
+                            parts[calculation_type].append((row_hashes, urls.reindex(row_hashes.index, fill_value=0)))
+                        else:
+                            parts[calculation_type] = None
+                        continue
+                    mask = engine.mask(calculation_type)
+                    if mask is None:
+                        parts[calculation_type] = None
+                    else:
+                        parts[calculation_type].append(urls[mask.reindex(urls.index).to_numpy(dtype=bool, na_value=False)])
+        except Exception as e:
+            print(f"Error collecting failing URLs of {file_name}: {str(e)}")
+            parts = {calculation_type: None for calculation_type in row_calculations}
+            url_parts = None
+        
+        if export_urls is not None and url_parts is not None:
+            export_urls[file_name] = pd.Index(np.unique(np.concatenate(url_parts)) if url_parts else [],
+                                              dtype='uint64')
+        
+        for calculation_type, collected in parts.items():
+            if collected is None:
+                results[calculation_type] = None
+            elif not collected:
+                results[calculation_type] = pd.Index([], dtype='uint64')
+            elif MetricEngine.duplicate_column(calculation_type):
+                values = pd.concat([pair[0] for pair in collected], ignore_index=True)
+                urls = pd.concat([pair[1] for pair in collected], ignore_index=True)
+                repeated = values.isin(finders[calculation_type].duplicated_hashes())
+                failing = urls[repeated.to_numpy() & (urls != 0).to_numpy()]
+                results[calculation_type] = pd.Index(failing.unique(), dtype='uint64')
+            else:
+                results[calculation_type] = pd.Index(pd.concat(collected).unique(), dtype='uint64')
+        return results
+    
+    def diff_item(self, before, after, item_id):
+        """An item's failing URLs split by how they changed, or None if either crawl couldn't tell"""
+        failing_before = before['failing'][item_id]
+        failing_after = after['failing'][item_id]
+        if failing_before is None or failing_after is None:
+            return None
+        
+        newly_failing = failing_after.difference(failing_before)
+        no_longer_failing = failing_before.difference(failing_after)
+        
+        # URLs missing from the other crawl's copy of the export the item reads (internal_all.csv if
+        # that export couldn't tell) were added to or dropped from the site
+        crawled_before, crawled_after = (
+            crawl.get('export_urls', {}).get(crawl['mappings'][item_id]['file'], crawl['crawled'])
+            for crawl in (before, after))
+        if crawled_before is not None:
+            known = newly_failing.isin(crawled_before)
+            newly_failing, new_urls = newly_failing[known], newly_failing[~known]
+        else:
+            new_urls = pd.Index([], dtype='uint64')
+        if crawled_after is not None:
+            still_crawled = no_longer_failing.isin(crawled_after)
+            fixed, removed = no_longer_failing[still_crawled], no_longer_failing[~still_crawled]
+        else:
+            fixed, removed = no_longer_failing, pd.Index([], dtype='uint64')
+        
+        return {"Newly failing": newly_failing, "New URL failing": new_urls,
+                "Fixed": fixed, "Failing URL removed": removed}
+    
+    def lookup_addresses(self, paths, wanted):
+        """Address of each wanted URL hash ({file: hashes}), read back from the exports' Address column in chunks"""
+        addresses = {}
+        for file_name, hashes in wanted.items():
+            if file_name not in paths or not len(hashes):
+                continue
+            try:
+                for chunk in iter_export_chunks(paths[file_name], ['Address'], self.chunk_size):
+                    if chunk is None or 'Address' not in chunk.columns:
+                        continue
+                    urls = url_hashes(chunk['Address'])
+                    found = urls[urls.isin(hashes)]
+                    for url_hash, address in zip(found.tolist(), chunk['Address'].loc[found.index].tolist()):
+                        addresses.setdefault(url_hash, address)
+            except Exception as e:
+                print(f"Error reading URLs from {file_name}: {str(e)}")
+        return addresses
+    
+    def write_crawl_diff(self, output_path, changes_path, before, after, item_changes, addresses):
+        """Write the per-item deltas workbook and the per-URL changes CSV"""
+        change_kinds = ("Newly failing", "New URL failing", "Fixed", "Failing URL removed")
+        
+        wb = openpyxl.Workbook(write_only=True)
+        summary = wb.create_sheet("Crawl Diff")
+        summary.append(["", "Before", "After"])
+        summary.append(["Data folder", before['folder'], after['folder']])
+        if before['crawled'] is not None and after['crawled'] is not None:
+            summary.append(["Crawled URLs", len(before['crawled']), len(after['crawled'])])
+            summary.append(["URLs added", "", len(after['crawled'].difference(before['crawled']))])
+            summary.append(["URLs removed", len(before['crawled'].difference(after['crawled'])), ""])
+        summary.append(["URL changes", os.path.basename(changes_path), ""])
+        
+        items = wb.create_sheet("Item Changes")
+        items.append(["Item ID", "Calculation", "Before", "After", "Change", *change_kinds])
+        
+        with open(changes_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Item ID", "Calculation", "Change", "URL"])
+            for item_id, changes in item_changes.items():
+                value_before = before['values'][item_id]
+                value_after = after['values'][item_id]
+                calculation = after['mappings'][item_id]['calculation']
+                counts = [len(changes[kind]) for kind in change_kinds] if changes else ["n/a"] * len(change_kinds)
+                items.append([item_id, calculation, value_before, value_after, value_after - value_before, *counts])
+                
+                if changes is None:
+                    continue
+                for kind in change_kinds:
+                    side = addresses['after'] if kind in ("Newly failing", "New URL failing") else addresses['before']
+                    urls = sorted(side.get(url_hash, '') for url_hash in changes[kind].tolist())
+                    writer.writerows([item_id, calculation, kind, url] for url in urls)
+        
+        wb.save(output_path)
 
 
 class TechAuditGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Tech Audit Processor")
-        self.root.geometry("600x500")
+        self.root.geometry("600x560")
         self.root.configure(bg='#f0f0f0')
         
         # Title
@@ -805,17 +4006,44 @@ class TechAuditGUI:
                                       font=("Arial", 10, "bold"))
         self.browse_button.pack(side="left")
         
-        # Process button
-        self.process_button = tk.Button(root, text="Run Tech Audit", 
+        # Timing report
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_check = tk.Checkbutton(root, text="Save a timing report next to the audit",
+                                            variable=self.profile_var, font=("Arial", 9), bg='#f0f0f0')
+        self.profile_check.pack()
+        
+        # Incremental re-run
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.incremental_check = tk.Checkbutton(root, text="Only redo what changed since the last run of this folder",
+                                                variable=self.incremental_var, font=("Arial", 9), bg='#f0f0f0')
+        self.incremental_check.pack()
+        
+        # Drill-down tabs
+        self.drilldown_var = tk.BooleanVar(value=False)
+        self.drilldown_check = tk.Checkbutton(root, text="Add tabs listing the URLs behind failing items",
+                                              variable=self.drilldown_var, font=("Arial", 9), bg='#f0f0f0')
+        self.drilldown_check.pack()
+        
+        # Process and cancel buttons
+        button_frame = tk.Frame(root, bg='#f0f0f0')
+        button_frame.pack(pady=20)
+        
+        self.process_button = tk.Button(button_frame, text="Run Tech Audit", 
                                        command=self.process_audit,
                                        bg='#70AD47', fg='white', 
                                        font=("Arial", 14, "bold"),
                                        padx=30, pady=10)
-        self.process_button.pack(pady=20)
+        self.process_button.pack(side="left")
         
-        # Progress bar
-        self.progress = ttk.Progressbar(root, length=400, mode='indeterminate')
+        self.cancel_button = tk.Button(button_frame, text="Cancel",
+                                       command=self.cancel_audit,
+                                       font=("Arial", 11), padx=10, pady=10, state="disabled")
+        self.cancel_button.pack(side="left", padx=(10, 0))
+        
+        # Progress bar - fills with each stage's progress, and bounces while a stage can't tell how far along it is
+        self.progress = ttk.Progressbar(root, length=400, mode='indeterminate', maximum=100)
         self.progress.pack(pady=10)
+        self.audit_progress = None
         
         # Status label
         self.status_label = tk.Label(root, text="Ready to process", 
@@ -855,16 +4083,50 @@ class TechAuditGUI:
         self.process_button.config(state="disabled")
         self.browse_button.config(state="disabled")
         self.client_entry.config(state="disabled")
+        self.profile_check.config(state="disabled")
+        self.incremental_check.config(state="disabled")
+        self.drilldown_check.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress.config(mode='indeterminate', value=0)
         self.progress.start()
         self.status_label.config(text="Processing... Please wait (searching subfolders)")
         
-        # Run in separate thread
-        thread = threading.Thread(target=self.run_processor, args=(folder_path, client_name))
+        # Run in separate thread, polling its progress events from this one
+        self.audit_progress = AuditProgress()
+        thread = threading.Thread(target=self.run_processor, args=(folder_path, client_name, self.profile_var.get(),
+                                                                   self.incremental_var.get(), self.drilldown_var.get(),
+                                                                   self.audit_progress))
         thread.start()
+        self.root.after(100, self.poll_progress, self.audit_progress)
+    
+    def poll_progress(self, progress):
+        """Show the latest progress event of the running audit"""
+        if progress is not self.audit_progress:
+            return
+        events = progress.drain()
+        if events and not progress.cancelled:
+            event = events[-1]
+            if event['total']:
+                if str(self.progress.cget('mode')) != 'determinate':
+                    self.progress.stop()
+                    self.progress.config(mode='determinate')
+                self.progress.config(value=min(100, 100 * event['done'] / event['total']))
+            elif str(self.progress.cget('mode')) != 'indeterminate':
+                self.progress.config(mode='indeterminate', value=0)
+                self.progress.start()
+            self.status_label.config(text=AuditProgress.describe(event))
+        self.root.after(100, self.poll_progress, progress)
+    
+    def cancel_audit(self):
+        if self.audit_progress is not None:
+            self.audit_progress.cancel()
+            self.cancel_button.config(state="disabled")
+            self.status_label.config(text="Cancelling... the partial report will be removed")
     
-    def run_processor(self, folder_path, client_name):
+    def run_processor(self, folder_path, client_name, profile=False, incremental=False, drilldown=False, progress=None):
         try:
-            processor = TechAuditProcessor()
+            processor = TechAuditProcessor(profile=profile, incremental=incremental,
+                                           drilldown="tabs" if drilldown else None, progress=progress)
             result = processor.process_audit(folder_path, client_name)
             
             # Handle both single value and tuple return
@@ -876,14 +4138,22 @@ class TechAuditGUI:
             
             # Update GUI in main thread
             self.root.after(0, self.processing_complete, True, (output_file, imported_count))
+        except AuditCancelled:
+            self.root.after(0, self.processing_complete, False, None, True)
         except Exception as e:
             self.root.after(0, self.processing_complete, False, str(e))
     
-    def processing_complete(self, success, message):
+    def processing_complete(self, success, message, cancelled=False):
+        self.audit_progress = None
         self.progress.stop()
+        self.progress.config(mode='determinate', value=100 if success else 0)
+        self.cancel_button.config(state="disabled")
         self.process_button.config(state="normal")
         self.browse_button.config(state="normal")
         self.client_entry.config(state="normal")
+        self.profile_check.config(state="normal")
+        self.incremental_check.config(state="normal")
+        self.drilldown_check.config(state="normal")
         
         if success:
             self.status_label.config(text="Audit complete!")
@@ -907,16 +4177,384 @@ class TechAuditGUI:
                 success_msg += "\nFiles were searched recursively from all subfolders"
             
             messagebox.showinfo("Success", success_msg)
+        elif cancelled:
+            self.status_label.config(text="Audit cancelled - no report was saved")
         else:
             self.status_label.config(text="Error occurred")
             messagebox.showerror("Error", f"An error occurred:\n\n{message}")
 
 
-def main():
+def load_tkinter():
+    """Import tkinter for the GUI - the headless command line never calls this"""
+    global tk, filedialog, messagebox, ttk
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+
+
+def read_manifest(manifest_path):
+    """Read audit jobs from a manifest
+    
+    JSON manifests hold a list of folder paths or {"folder": ..., "client": ...}
+    objects. Any other file is read as CSV with a folder and an optional client
+    column per line (a "folder,client" header line is allowed). Relative folders
+    are resolved against the manifest's own folder.
+    """
+    base_folder = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {'folder': entry}
+            jobs.append({'folder': entry['folder'], 'client': entry.get('client', '')})
+    else:
+        with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip() or row[0].strip().startswith('#'):
+                    continue
+                if row[0].strip().lower() == 'folder':
+                    continue
+                jobs.append({'folder': row[0].strip(), 'client': row[1].strip() if len(row) > 1 else ''})
+    
+    for job in jobs:
+        job['folder'] = os.path.join(base_folder, os.path.expanduser(job['folder']))
+    return jobs
+
+
+def run_audit_job(job, output_folder, processor_options, log_path=None):
+    """Run one client audit for the command line - in-process or in a worker process
+    
+    Never raises; returns a status dict. With log_path the audit's output goes to
+    that file instead of the console.
+    """
+    started = time.time()
+    result = {'folder': job['folder'], 'client': job['client'], 'log': log_path}
+    try:
+        processor = TechAuditProcessor(**processor_options)
+        if log_path:
+            with open(log_path, 'w', encoding='utf-8') as log, redirect_stdout(log):
+                output_path, imported_count = processor.process_audit(job['folder'], job['client'], output_folder)
+        else:
+            output_path, imported_count = processor.process_audit(job['folder'], job['client'], output_folder)
+        result.update(status='ok', output=output_path, imported=imported_count,
+                      values=processor.item_values, statuses=processor.item_statuses)
+    except Exception as e:
+        result.update(status='failed', error=str(e))
+    result['seconds'] = round(time.time() - started, 2)
+    return result
+
+
+# Rough memory an audit needs: the interpreter with pandas and openpyxl loaded, plus per byte of the
+# exports it parses (compact dtypes, projected columns) and of workbooks imported cell by cell
+AUDIT_BASE_MEMORY = 250 * 1024 * 1024
+AUDIT_MEMORY_PER_CSV_BYTE = 1.5
+AUDIT_MEMORY_PER_XLSX_BYTE = 25
+
+
+def estimate_audit_memory(folder, processor_options):
+    """Rough peak memory of one audit in bytes, from the sizes of the files it will read"""
+    processor = TechAuditProcessor(**processor_options)
+    try:
+        file_index = processor.build_file_index(folder)
+        csv_bytes = sum(os.path.getsize(file_index.find(file_name)[0])
+                        for file_name in processor.get_required_files(file_index) if file_index.find(file_name))
+        if processor.streaming:
+            # Only a few chunks are held at once
+            csv_bytes = min(csv_bytes, processor.chunk_size * 4096)
+        xlsx_bytes = sum(os.path.getsize(path) for path in file_index.with_extensions(['.xlsx', '.xls'])
+                         if processor.get_import_mode(path) == "full")
+    except OSError:
+        return AUDIT_BASE_MEMORY
+    return int(AUDIT_BASE_MEMORY + csv_bytes * AUDIT_MEMORY_PER_CSV_BYTE + xlsx_bytes * AUDIT_MEMORY_PER_XLSX_BYTE)
+
+
+def get_memory_budget(memory_budget_gb=None):
+    """Bytes of memory concurrent audits may take together (None = no limit)
+    
+    Defaults to 80% of the memory available when the batch starts; 0 turns the limit off.
+    """
+    if memory_budget_gb is not None:
+        return int(memory_budget_gb * 1024 ** 3) if memory_budget_gb > 0 else None
+    available = available_memory_bytes()
+    return int(available * 0.8) if available else None
+
+
+def write_portfolio_report(results, output_folder):
+    """One workbook comparing every client's item values and statuses, next to their reports"""
+    processor = TechAuditProcessor()
+    output_path = processor.get_output_path("Portfolio", output_folder)
+    
+    audits = sorted(results, key=lambda result: (result['client'] or result['folder']).lower())
+    succeeded = [result for result in audits if result['status'] == 'ok']
+    clients = [result['client'] or os.path.basename(os.path.normpath(result['folder'])) for result in succeeded]
+    item_ids = [item_id for item_id in processor.item_mappings
+                if any(item_id in result.get('values', {}) for result in succeeded)]
+    
+    wb = openpyxl.Workbook(write_only=True)
+    values_sheet = wb.create_sheet("Item Values")
+    values_sheet.append(["Item ID", "Calculation", *clients, "Failing Clients"])
+    status_sheet = wb.create_sheet("Item Status")
+    status_sheet.append(["Item ID", "Calculation", *clients])
+    for item_id in item_ids:
+        calculation = processor.item_mappings[item_id]['calculation']
+        statuses = [result.get('statuses', {}).get(item_id) for result in succeeded]
+        values_sheet.append([item_id, calculation, *(result['values'].get(item_id) for result in succeeded),
+                             statuses.count("Fail")])
+        status_sheet.append([item_id, calculation, *statuses])
+    
+    audits_sheet = wb.create_sheet("Audits")
+    audits_sheet.append(["Client", "Folder", "Status", "Report", "Seconds", "Estimated Memory (MB)", "Error"])
+    for result in audits:
+        estimate = result.get('estimated_memory')
+        audits_sheet.append([result['client'], result['folder'], result['status'], result.get('output'),
+                             result.get('seconds'), round(estimate / 1024 ** 2) if estimate else None,
+                             result.get('error')])
+    
+    wb.save(output_path)
+    return output_path
+
+
+def run_batch(jobs, output_folder, concurrency, processor_options, memory_budget=None):
+    """Run audits across a pool of worker processes, printing a status line per job
+    
+    Audits are started biggest first, and only while the memory they are estimated to
+    need (see estimate_audit_memory) fits in memory_budget bytes together with those
+    already running, so several large crawls never load at once. An audit too big for
+    the budget runs on its own.
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    
+    os.makedirs(output_folder, exist_ok=True)
+    concurrency = max(1, min(concurrency, len(jobs)))
+    
+    # Several audits at once each get a share of the CPUs for CSV parsing
+    if concurrency > 1 and processor_options.get('workers') is None:
+        processor_options = dict(processor_options, workers=max(1, (os.cpu_count() or 1) // concurrency))
+    
+    # With more than one job the per-audit output would interleave, so it goes to log files
+    log_folder = None
+    if len(jobs) > 1:
+        log_folder = os.path.join(output_folder, "logs")
+        os.makedirs(log_folder, exist_ok=True)
+    
+    def log_path_for(index, job):
+        if log_folder is None:
+            return None
+        name = job['client'] or os.path.basename(os.path.normpath(job['folder']))
+        clean_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).rstrip() or "audit"
+        return os.path.join(log_folder, f"{index:03d}_{clean_name}.log")
+    
+    results = []
+    
+    def report(index, result):
+        results.append(result)
+        label = result['client'] or result['folder']
+        if result['status'] == 'ok':
+            print(f"[{len(results)}/{len(jobs)}] OK      {label} -> {result['output']} ({result['seconds']}s)")
+        else:
+            print(f"[{len(results)}/{len(jobs)}] FAILED  {label}: {result['error']}")
+    
+    if concurrency == 1:
+        for index, job in enumerate(jobs, 1):
+            report(index, run_audit_job(job, output_folder, processor_options, log_path_for(index, job)))
+        return results
+    
+    estimates = {index: estimate_audit_memory(job['folder'], processor_options) for index, job in enumerate(jobs, 1)}
+    if memory_budget:
+        print(f"Memory budget {memory_budget / 1024 ** 3:.1f} GB, largest audit needs about "
+              f"{max(estimates.values()) / 1024 ** 3:.1f} GB")
+    
+    # Biggest audits first, so the long ones don't end up running last on their own
+    pending = sorted(estimates, key=lambda index: -estimates[index])
+    running = {}
+    reserved = 0
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        while pending or running:
+            # Start the biggest audits that fit next to the running ones
+            while pending and len(running) < concurrency:
+                index = next((candidate for candidate in pending if not running or memory_budget is None
+                              or reserved + estimates[candidate] <= memory_budget), None)
+                if index is None:
+                    break
+                pending.remove(index)
+                job = jobs[index - 1]
+                future = pool.submit(run_audit_job, job, output_folder, processor_options, log_path_for(index, job))
+                running[future] = index
+                reserved += estimates[index]
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                reserved -= estimates[index]
+                job = jobs[index - 1]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. killed for memory)
+                    result = {'folder': job['folder'], 'client': job['client'], 'status': 'failed',
+                              'error': f"worker crashed: {str(e)}", 'seconds': None}
+                result['estimated_memory'] = estimates[index]
+                report(index, result)
+    
+    return results
+
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(
+        prog="tech_audit",
+        description="Run technical SEO audits from Screaming Frog exports without the GUI. "
+                    "Run without arguments to open the GUI."
+    )
+    parser.add_argument("folders", nargs="*", help="Screaming Frog export folders to audit")
+    parser.add_argument("--manifest", help="CSV (folder,client per line) or JSON list of audits to run")
+    parser.add_argument("--client", default=None,
+                        help="Client name for the reports (default: the manifest's client or the folder name)")
+    parser.add_argument("-o", "--output-dir", required=True, help="Folder to write the reports to")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of audits to run at once (default: 1)")
+    parser.add_argument("--summary", help="Write a JSON summary of all jobs to this file")
+    parser.add_argument("--memory-budget", type=float, default=None,
+                        help="GB of memory concurrent audits may use together (default: 80%% of what is "
+                             "available; 0 for no limit)")
+    parser.add_argument("--no-portfolio", action="store_true",
+                        help="Don't write the workbook comparing all clients when several audits run")
+    parser.add_argument("--diff", action="store_true",
+                        help="Compare two crawls instead of auditing: give the earlier and the later export folder")
+    
+    loading = parser.add_argument_group("loading options")
+    loading.add_argument("--streaming", action="store_true", help="Read CSVs in chunks to bound memory")
+    loading.add_argument("--chunk-size", type=int, default=200000, help="Rows per chunk in streaming mode")
+    loading.add_argument("--workers", type=int, default=None, help="Processes for parsing CSVs within one audit")
+    loading.add_argument("--store", choices=["memory", "arrow"], default="memory",
+                         help="Keep loaded exports as pandas frames in memory, or as memory-mapped Arrow files "
+                              "with compact text columns (needs pyarrow)")
+    loading.add_argument("--no-cache", action="store_true", help="Don't use the on-disk export cache")
+    loading.add_argument("--cache-dir", default=None, help="Folder for the export cache")
+    loading.add_argument("--include", action="append", help="Only use files matching this glob (repeatable)")
+    loading.add_argument("--exclude", action="append", help="Skip files/folders matching this glob (repeatable)")
+    loading.add_argument("--max-depth", type=int, default=None, help="Folder levels to search below each data folder")
+    loading.add_argument("--import-mode", choices=["auto", "full", "bulk", "values"], default="auto",
+                         help="How Excel files are imported as tabs")
+    loading.add_argument("--incremental", action="store_true",
+                         help="Reuse the last run of each folder: recompute only items whose exports changed "
+                              "and patch the previous report")
+    loading.add_argument("--manifest-dir", default=None,
+                         help="Folder for incremental run manifests (default: next to the export cache)")
+    
+    report = parser.add_argument_group("report options")
+    report.add_argument("--drilldown", choices=["tabs", "csv"], default=None,
+                        help="List the URLs behind each failing item, as report tabs or CSV files next to it")
+    report.add_argument("--drilldown-max-rows", type=int, default=10000,
+                        help="Most URLs listed per item (default: 10000)")
+    report.add_argument("--near-duplicates", type=float, nargs="?", const=0.8, default=None, metavar="SIMILARITY",
+                        help="Count titles, meta descriptions and H1s whose words are this similar (0-1, default "
+                             "0.8) as duplicates, not just identical ones")
+    report.add_argument("--rules", default=None,
+                        help="JSON file of Pass/Fail rules and metric thresholds, with optional per-client sections")
+    
+    diagnostics = parser.add_argument_group("diagnostics")
+    diagnostics.add_argument("--profile", action="store_true",
+                             help="Write a JSON timing report (per stage, file and metric) next to each audit")
+    diagnostics.add_argument("--cprofile", action="store_true",
+                             help="Also write a cProfile dump (.prof) of each audit")
+    return parser
+
+
+def processor_options_from(args):
+    """TechAuditProcessor options from the command line arguments"""
+    return {
+        'streaming': args.streaming,
+        'chunk_size': args.chunk_size,
+        'workers': args.workers,
+        'store': args.store,
+        'use_cache': not args.no_cache,
+        'cache_dir': args.cache_dir,
+        'include': args.include,
+        'exclude': args.exclude,
+        'max_depth': args.max_depth,
+        'import_mode': args.import_mode,
+        'incremental': args.incremental,
+        'manifest_dir': args.manifest_dir,
+        'drilldown': args.drilldown,
+        'drilldown_max_rows': args.drilldown_max_rows,
+        'rules_path': args.rules,
+        'near_duplicates': args.near_duplicates,
+        'profile': args.profile,
+        'cprofile': args.cprofile,
+    }
+
+
+def run_diff(args):
+    """Compare two crawls from the command line; returns the process exit code"""
+    before_folder, after_folder = (os.path.abspath(folder) for folder in args.folders)
+    client_name = args.client if args.client is not None else os.path.basename(os.path.normpath(after_folder))
+    try:
+        processor = TechAuditProcessor(**processor_options_from(args))
+        processor.diff_crawls(before_folder, after_folder, client_name, os.path.abspath(args.output_dir))
+    except Exception as e:
+        print(f"Crawl diff failed: {str(e)}")
+        return 1
+    return 0
+
+
+def run_cli(argv):
+    """Headless entry point; returns the process exit code"""
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+    
+    if args.diff:
+        if len(args.folders) != 2 or args.manifest:
+            parser.error("--diff takes exactly two data folders (earlier crawl first)")
+        return run_diff(args)
+    
+    jobs = [{'folder': folder, 'client': ''} for folder in args.folders]
+    if args.manifest:
+        jobs.extend(read_manifest(args.manifest))
+    if not jobs:
+        parser.error("give at least one data folder or a --manifest")
+    
+    for job in jobs:
+        job['folder'] = os.path.abspath(job['folder'])
+        if args.client is not None:
+            job['client'] = args.client
+        elif not job['client']:
+            job['client'] = os.path.basename(os.path.normpath(job['folder']))
+    
+    print(f"Running {len(jobs)} audit(s), {max(1, min(args.jobs, len(jobs)))} at a time")
+    output_folder = os.path.abspath(args.output_dir)
+    results = run_batch(jobs, output_folder, args.jobs, processor_options_from(args), get_memory_budget(args.memory_budget))
+    
+    failed = [result for result in results if result['status'] != 'ok']
+    print(f"\n{len(results) - len(failed)} succeeded, {len(failed)} failed")
+    
+    if len(jobs) > 1 and not args.no_portfolio and len(failed) < len(results):
+        print(f"Portfolio report saved to: {write_portfolio_report(results, output_folder)}")
+    
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # Any arguments mean a headless run
+    if argv:
+        sys.exit(run_cli(argv))
+    
+    load_tkinter()
     root = tk.Tk()
     app = TechAuditGUI(root)
+    
+    # Load pandas/openpyxl while the user fills in the form
+    threading.Thread(target=warm_imports, daemon=True).start()
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import openpyxl
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tech_audit  # noqa: E402
+
+
+def write_template(path, items):
+    """A minimal template: a Full Audit sheet with one row per (item ID, expected value, priority)"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Full Audit"
+    ws.append(["Issue Name", None, "Item ID", None, None, None, None, "Pass/Fail", "Expected Value",
+               "Audit Value", "Priority"])
+    for item_id, expected_value, priority in items:
+        ws.append([f"Item {item_id}", None, item_id, None, None, None, None, None, expected_value, None, priority])
+    wb.save(path)
+    return str(path)
+
+
+def read_full_audit(path):
+    """{item ID: (Pass/Fail, Audit Value, Priority)} of a saved report"""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return {row[2]: (row[7], row[9], row[10])
+                for row in wb["Full Audit"].iter_rows(min_row=2, values_only=True) if row[2]}
+    finally:
+        wb.close()
+
+
+def write_export(folder, file_name, df):
+    os.makedirs(folder, exist_ok=True)
+    df.to_csv(os.path.join(folder, file_name), index=False)
+
+
+def internal_export(rows=60):
+    """internal_all.csv rows with missing, duplicated, long and short titles, descriptions and H1s"""
+    titles = ["", "Home", "Home", "A title that is certainly much longer than sixty characters in total"]
+    descriptions = [None, "Same description", "Same description", "x" * 130]
+    h1s = ["Welcome", "Welcome", "", "Products"]
+    return pd.DataFrame({
+        "Address": [f"https://example.com/page-{i}" for i in range(rows)],
+        "Content Type": ["text/html; charset=utf-8"] * rows,
+        "Status Code": [200 if i % 7 else 404 for i in range(rows)],
+        "Indexability": ["Indexable"] * rows,
+        "Title 1": [titles[i % 4] if i % 5 else f"Unique title number {i}" for i in range(rows)],
+        "Meta Description 1": [descriptions[i % 4] if i % 3 else f"Unique description {i}" for i in range(rows)],
+        "H1-1": [h1s[i % 4] for i in range(rows)],
+    })
+
+
+@pytest.fixture
+def make_processor(tmp_path):
+    """TechAuditProcessor factory whose template, cache and manifests live in tmp_path"""
+    def make(template_path, **options):
+        options.setdefault("cache_dir", str(tmp_path / "cache"))
+        options.setdefault("manifest_dir", str(tmp_path / "manifests"))
+        processor = tech_audit.TechAuditProcessor(**options)
+        processor.get_template_path = lambda: template_path
+        return processor
+    return make
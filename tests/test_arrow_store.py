@@ -0,0 +1,42 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import tech_audit
+from conftest import internal_export, read_full_audit, write_template
+from test_parallel_loading import images_export
+
+
+@pytest.fixture
+def crawl(tmp_path):
+    os.makedirs(tmp_path / "crawl" / "images")
+    internal_export().to_csv(tmp_path / "crawl" / "internal_all.csv", index=False)
+    images_export().to_csv(tmp_path / "crawl" / "images" / "images_all.csv", index=False)
+    return str(tmp_path / "crawl")
+
+
+def audit(tmp_path, make_processor, crawl, name, **options):
+    items = [(item_id, "0", "High") for item_id in tech_audit.TechAuditProcessor().item_mappings]
+    template = write_template(tmp_path / "template.xlsx", items)
+    processor = make_processor(template, **options)
+    processor.parallel_min_bytes = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(crawl, name, str(tmp_path / "out"))
+    return processor, read_full_audit(output_path)
+
+
+@pytest.mark.parametrize("workers, use_cache", [(1, False), (2, False), (1, True)])
+def test_arrow_store_audits_match_the_default_store(tmp_path, make_processor, crawl, workers, use_cache):
+    _, expected = audit(tmp_path, make_processor, crawl, "memory", workers=1, use_cache=False)
+    if use_cache:
+        # Fill the cache so the Arrow store maps its entries instead of parsing
+        audit(tmp_path, make_processor, crawl, "warm", workers=1, store="arrow")
+    processor, report = audit(tmp_path, make_processor, crawl, "arrow", workers=workers, use_cache=use_cache,
+                              store="arrow")
+    
+    assert isinstance(processor.screaming_frog_data, tech_audit.ArrowExportStore)
+    assert not any(dtype == object for dtype in processor.screaming_frog_data["internal_all.csv"].dtypes)
+    assert report == expected
+    assert report["1"][1] == 12
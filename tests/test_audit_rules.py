@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+from conftest import internal_export, read_full_audit, write_export, write_template
+from tech_audit import AuditRules
+
+VALUES = [0, 1, 3, 10, 11, 250]
+
+
+def baseline_status(value, expected_value):
+    """How items were graded before rules were compiled"""
+    text = str(expected_value).strip()
+    if text == "0":
+        return "Pass" if value == 0 else "Fail"
+    if text.isdigit():
+        return "Pass" if value <= int(text) else "Fail"
+    if "manual" in text.lower():
+        return "Opportunity"
+    return None
+
+
+@pytest.mark.parametrize("expected_value", ["0", "5", "Manual review", "See notes"])
+def test_template_expected_values_grade_as_before(expected_value):
+    statuses = AuditRules().grade(["1"] * len(VALUES), VALUES, [expected_value] * len(VALUES))
+    
+    assert statuses == [baseline_status(value, expected_value) for value in VALUES]
+
+
+def test_comparisons_and_shares_of_the_crawl():
+    rules = AuditRules()
+    
+    assert rules.grade(["1"] * len(VALUES), VALUES, ["<=10"] * len(VALUES)) == \
+        ["Pass", "Pass", "Pass", "Pass", "Fail", "Fail"]
+    # 2% of 500 crawled URLs is 10
+    assert rules.grade(["1"] * len(VALUES), VALUES, ["<=2%"] * len(VALUES), crawl_size=500) == \
+        ["Pass", "Pass", "Pass", "Pass", "Fail", "Fail"]
+    # Without a crawl size a share can't be graded
+    assert rules.grade(["1"], [0], ["<=2%"]) == [None]
+
+
+def test_rules_file_overrides_the_template(tmp_path):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"items": {"2": "<=10"}, "clients": {"Client": {"items": {"3": "manual"}}}}))
+    rules = AuditRules.load(str(rules_path), "client")
+    
+    assert rules.grade(["1", "2", "3"], [5, 5, 5], ["0", "0", "0"]) == ["Fail", "Pass", "Opportunity"]
+
+
+def test_unreadable_rules_are_rejected(tmp_path):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"items": {"2": "about ten"}}))
+    
+    with pytest.raises(ValueError):
+        AuditRules.load(str(rules_path))
+
+
+@pytest.mark.parametrize("rule, status", [("<=20%", "Pass"), ("<=10%", "Fail")])
+def test_share_rules_use_the_crawl_size(tmp_path, make_processor, rule, status):
+    template = write_template(tmp_path / "template.xlsx", [("65", "0", "High")])
+    data = tmp_path / "crawl"
+    # 9 of the 60 pages are 404s - 15% of the crawl
+    write_export(data, "internal_all.csv", internal_export(60))
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({"items": {"65": rule}}))
+    
+    processor = make_processor(template, use_cache=False, rules_path=str(rules_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(str(data), "Client", str(tmp_path / "out"))
+    
+    assert read_full_audit(output_path)["65"][:2] == (status, 9)
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import tech_audit
+from conftest import internal_export, write_template
+from test_parallel_loading import images_export
+
+
+class CancelOnFirstLoad(tech_audit.AuditProgress):
+    """Cancels the audit as soon as the first export (or chunk) is loaded, as the GUI's Cancel button would"""
+    
+    def advance(self, file=None, done=1, rows=0):
+        if self.stage == "load":
+            self.cancel()
+        super().advance(file, done, rows)
+
+
+@pytest.fixture
+def crawl(tmp_path):
+    os.makedirs(tmp_path / "crawl" / "images")
+    internal_export().to_csv(tmp_path / "crawl" / "internal_all.csv", index=False)
+    images_export().to_csv(tmp_path / "crawl" / "images" / "images_all.csv", index=False)
+    return str(tmp_path / "crawl")
+
+
+@pytest.mark.parametrize("options", [
+    {"workers": 1},
+    {"workers": 2},
+    {"workers": 1, "streaming": True, "chunk_size": 7},
+], ids=["serial", "pool", "streaming"])
+def test_cancelling_mid_load_stops_without_a_report(tmp_path, make_processor, crawl, options):
+    template = write_template(tmp_path / "template.xlsx", [("1", "0", "High"), ("70", "0", "Low")])
+    progress = CancelOnFirstLoad()
+    processor = make_processor(template, use_cache=False, drilldown="csv", progress=progress, **options)
+    processor.parallel_min_bytes = 0
+    
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(tech_audit.AuditCancelled):
+        processor.process_audit(crawl, "Client", str(tmp_path / "out"))
+    
+    stages = [event["stage"] for event in progress.drain()]
+    assert "load" in stages and "metrics" not in stages
+    assert os.listdir(tmp_path / "out") == []
@@ -0,0 +1,112 @@
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+
+import openpyxl
+
+import tech_audit
+from conftest import internal_export
+
+
+def make_crawl(root, name):
+    folder = os.path.join(root, name)
+    os.makedirs(folder)
+    internal_export(20).to_csv(os.path.join(folder, "internal_all.csv"), index=False)
+    return folder
+
+
+def test_manifests_in_csv_and_json(tmp_path):
+    (tmp_path / "audits.csv").write_text("folder,client\n# paused\nacme,Acme Ltd\n\nglobex\n", encoding="utf-8")
+    (tmp_path / "audits.json").write_text(json.dumps(["acme", {"folder": "/data/globex", "client": "Globex"}]),
+                                          encoding="utf-8")
+    
+    assert tech_audit.read_manifest(str(tmp_path / "audits.csv")) == [
+        {"folder": str(tmp_path / "acme"), "client": "Acme Ltd"},
+        {"folder": str(tmp_path / "globex"), "client": ""},
+    ]
+    assert tech_audit.read_manifest(str(tmp_path / "audits.json")) == [
+        {"folder": str(tmp_path / "acme"), "client": ""},
+        {"folder": "/data/globex", "client": "Globex"},
+    ]
+
+
+def test_batch_run_writes_a_report_per_folder_and_a_summary(tmp_path, capsys):
+    folders = [make_crawl(str(tmp_path), "acme"), make_crawl(str(tmp_path), "globex")]
+    reports, summary = str(tmp_path / "reports"), str(tmp_path / "summary.json")
+    
+    exit_code = tech_audit.run_cli(folders + [str(tmp_path / "missing"), "-o", reports, "--no-cache",
+                                              "--summary", summary])
+    
+    assert exit_code == 1
+    assert "2 succeeded, 1 failed" in capsys.readouterr().out
+    with open(summary, encoding="utf-8") as f:
+        results = {result["client"]: result for result in json.load(f)}
+    assert sorted(results) == ["acme", "globex", "missing"]
+    assert results["missing"]["status"] == "failed"
+    for client in ("acme", "globex"):
+        assert results[client]["status"] == "ok"
+        assert os.path.dirname(results[client]["output"]) == reports
+        assert os.path.basename(results[client]["output"]).startswith(f"{client}_Technical_Audit_")
+        assert os.path.isfile(results[client]["output"]) and os.path.isfile(results[client]["log"])
+
+
+def test_portfolio_compares_clients_item_by_item(tmp_path, capsys):
+    folders = [make_crawl(str(tmp_path), "acme"), make_crawl(str(tmp_path), "globex")]
+    reports, summary = str(tmp_path / "reports"), str(tmp_path / "summary.json")
+    
+    assert tech_audit.run_cli(folders + ["-o", reports, "--no-cache", "--summary", summary]) == 0
+    
+    with open(summary, encoding="utf-8") as f:
+        results = {result["client"]: result for result in json.load(f)}
+    (portfolio,) = [name for name in os.listdir(reports) if name.startswith("Portfolio_")]
+    wb = openpyxl.load_workbook(os.path.join(reports, portfolio), read_only=True)
+    try:
+        assert wb.sheetnames == ["Item Values", "Item Status", "Audits"]
+        values = list(wb["Item Values"].iter_rows(values_only=True))
+        statuses = {row[0]: row[2:] for row in wb["Item Status"].iter_rows(min_row=2, values_only=True)}
+        audits = list(wb["Audits"].iter_rows(min_row=2, values_only=True))
+    finally:
+        wb.close()
+    
+    assert values[0] == ("Item ID", "Calculation", "acme", "globex", "Failing Clients")
+    assert {row[0] for row in values[1:]} == set(results["acme"]["values"])
+    for item_id, _, acme, globex, failing in values[1:]:
+        assert (acme, globex) == (results["acme"]["values"][item_id], results["globex"]["values"][item_id])
+        assert statuses[item_id] == (results["acme"]["statuses"][item_id], results["globex"]["statuses"][item_id])
+        assert failing == list(statuses[item_id]).count("Fail")
+    assert [(row[0], row[2]) for row in audits] == [("acme", "ok"), ("globex", "ok")]
+
+
+def test_audits_start_only_while_their_memory_fits_the_budget(tmp_path, monkeypatch):
+    # Estimated memory per folder; the 10 GB audit is bigger than the whole 8 GB budget
+    estimates = {"a": 6, "b": 5, "c": 3, "d": 1, "huge": 10}
+    running, overlaps, lock = set(), [], threading.Lock()
+    
+    def fake_job(job, output_folder, processor_options, log_path=None):
+        with lock:
+            running.add(job["folder"])
+            overlaps.append(set(running))
+        time.sleep(0.05)
+        with lock:
+            running.discard(job["folder"])
+        return {"folder": job["folder"], "client": job["client"], "status": "ok", "output": None, "seconds": 0.05}
+    
+    # Threads stand in for worker processes so the fake job can be patched in
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", concurrent.futures.ThreadPoolExecutor)
+    monkeypatch.setattr(tech_audit, "run_audit_job", fake_job)
+    monkeypatch.setattr(tech_audit, "estimate_audit_memory", lambda folder, options: estimates[folder])
+    
+    jobs = [{"folder": folder, "client": folder} for folder in estimates]
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = tech_audit.run_batch(jobs, str(tmp_path / "reports"), 4, {}, memory_budget=8)
+    
+    assert sorted(result["folder"] for result in results) == sorted(estimates)
+    assert all(result["estimated_memory"] == estimates[result["folder"]] for result in results)
+    for overlap in overlaps:
+        assert len(overlap) == 1 or sum(estimates[folder] for folder in overlap) <= 8
+    assert {"huge"} in overlaps
+    assert max(len(overlap) for overlap in overlaps) > 1
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import internal_export, write_export, write_template
+
+
+def pages(titles):
+    """internal_all.csv with one HTML page per {page number: title}"""
+    return pd.DataFrame({
+        "Address": [f"https://example.com/page-{number}" for number in titles],
+        "Content Type": ["text/html"] * len(titles),
+        "Status Code": [200] * len(titles),
+        "Indexability": ["Indexable"] * len(titles),
+        "Title 1": list(titles.values()),
+    })
+
+
+def images_export(alt_texts):
+    return pd.DataFrame({
+        "Address": [f"https://example.com/img/{i}.jpg" for i in range(len(alt_texts))],
+        "Alt Text": alt_texts,
+        "Status Code": [200] * len(alt_texts),
+        "Size (Bytes)": [1000] * len(alt_texts),
+    })
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_changed_urls_are_classified(tmp_path, make_processor, streaming):
+    template = write_template(tmp_path / "template.xlsx", [("1", "0", "High")])
+    before, after = str(tmp_path / "before"), str(tmp_path / "after")
+    write_export(before, "internal_all.csv", pages({0: "", 1: "", 2: "Contact", 4: ""}))
+    # page-0 gets a title, page-1 leaves the site, page-2 loses its title, page-3 is new and has none
+    write_export(after, "internal_all.csv", pages({0: "Home", 2: "", 3: "", 4: ""}))
+    
+    processor = make_processor(template, use_cache=False, streaming=streaming, chunk_size=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        diff_path, changes_path = processor.diff_crawls(before, after, "Client", str(tmp_path / "out"))
+    
+    assert os.path.isfile(diff_path)
+    changes = pd.read_csv(changes_path)
+    assert set(changes["Item ID"].astype(str)) == {"1"}
+    by_url = {os.path.basename(url): kind for url, kind in zip(changes["URL"], changes["Change"])}
+    assert by_url == {"page-0": "Fixed", "page-1": "Failing URL removed", "page-2": "Newly failing",
+                      "page-3": "New URL failing"}
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_fixed_and_removed_urls_are_told_apart_by_the_items_export(tmp_path, make_processor, streaming):
+    template = write_template(tmp_path / "template.xlsx", [("70", "0", "High")])
+    before, after = str(tmp_path / "before"), str(tmp_path / "after")
+    for folder in (before, after):
+        write_export(folder, "internal_all.csv", internal_export())
+    # Images 0 and 1 lack alt text; 0 gets one, 1 is dropped from the site, 2 starts failing
+    write_export(before, "images_all.csv", images_export(["", "", "logo"]))
+    after_images = images_export(["hero", "", ""]).drop(index=1)
+    write_export(after, "images_all.csv", after_images)
+    
+    processor = make_processor(template, use_cache=False, streaming=streaming, chunk_size=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, changes_path = processor.diff_crawls(before, after, "Client", str(tmp_path / "out"))
+    
+    changes = pd.read_csv(changes_path)
+    by_url = {os.path.basename(url): kind for url, kind in zip(changes["URL"], changes["Change"])}
+    assert by_url == {"0.jpg": "Fixed", "1.jpg": "Failing URL removed", "2.jpg": "Newly failing"}
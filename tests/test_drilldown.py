@@ -0,0 +1,61 @@
+import contextlib
+import io
+import os
+
+import openpyxl
+import pandas as pd
+
+from conftest import internal_export, write_export, write_template
+
+
+def run(tmp_path, make_processor, drilldown):
+    template = write_template(tmp_path / "template.xlsx", [("1", "0", "High"), ("70", "0", "Low")])
+    data = str(tmp_path / "crawl")
+    write_export(data, "internal_all.csv", internal_export())
+    processor = make_processor(template, use_cache=False, drilldown=drilldown, drilldown_max_rows=5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(data, "Client", str(tmp_path / "out"))
+    return output_path
+
+
+def missing_title_urls():
+    df = internal_export()
+    return list(df.loc[df["Title 1"] == "", "Address"])
+
+
+def test_tabs_list_the_first_rows_and_note_the_rest(tmp_path, make_processor):
+    output_path = run(tmp_path, make_processor, "tabs")
+    
+    wb = openpyxl.load_workbook(output_path)
+    try:
+        # Item 70 has no export in the crawl, so only item 1 gets a list
+        sheet_name = next(name for name in wb.sheetnames if name.startswith("1 "))
+        assert [name for name in wb.sheetnames if name != "Full Audit"] == [sheet_name]
+        rows = list(wb[sheet_name].iter_rows(values_only=True))
+        assert rows[0][0] == "Address"
+        assert [row[0] for row in rows[1:6]] == missing_title_urls()[:5]
+        assert rows[6][0] == "... 7 more row(s) not listed (limit 5)"
+        
+        value_cell = wb["Full Audit"]["J2"]
+        assert value_cell.value == 12
+        assert value_cell.hyperlink.location == f"'{sheet_name}'!A1"
+    finally:
+        wb.close()
+
+
+def test_csv_files_sit_next_to_the_report(tmp_path, make_processor):
+    output_path = run(tmp_path, make_processor, "csv")
+    
+    folder = f"{os.path.splitext(output_path)[0]}_drilldown"
+    (file_name,) = os.listdir(folder)
+    assert file_name.startswith("1_")
+    sample = pd.read_csv(os.path.join(folder, file_name))
+    assert list(sample["Address"]) == missing_title_urls()[:5]
+    
+    wb = openpyxl.load_workbook(output_path)
+    try:
+        assert wb.sheetnames == ["Full Audit"]
+        assert wb["Full Audit"]["J2"].hyperlink.target == f"{os.path.basename(folder)}/{file_name}"
+    finally:
+        wb.close()
+
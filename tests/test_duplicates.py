@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import tech_audit
+from conftest import internal_export
+
+COLUMNS = {"duplicate_page_titles": "Title 1", "duplicate_meta_descriptions": "Meta Description 1",
+           "duplicate_h1": "H1-1"}
+
+
+def baseline_count(df, column):
+    """Rows sharing a non-empty value with another row, as counted before values were hashed"""
+    non_empty = df[df[column].notna() & (df[column] != '')]
+    return len(non_empty[non_empty.duplicated(subset=[column], keep=False)])
+
+
+def random_export(rows, seed):
+    rng = np.random.default_rng(seed)
+    words = np.array(["red", "Red", "blue", "shoes", "shoes!", "sale", "", "naïve", "a b"], dtype=object)
+    frame = internal_export(rows)
+    for column in COLUMNS.values():
+        values = pd.Series([" ".join(rng.choice(words, rng.integers(1, 3))) for _ in range(rows)], dtype=object)
+        values[rng.random(rows) < 0.1] = None
+        frame[column] = values
+    return frame
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_exact_duplicate_counts_match_pandas(seed):
+    df = random_export(400, seed)
+    
+    counts = tech_audit.MetricEngine(df).compute(list(COLUMNS))
+    accumulator = tech_audit.MetricAccumulator(list(COLUMNS))
+    for start in range(0, len(df), 37):
+        accumulator.add(df.iloc[start:start + 37])
+    
+    for calculation_type, column in COLUMNS.items():
+        expected = baseline_count(df, column)
+        assert counts[calculation_type] == expected, calculation_type
+        assert accumulator.results()[calculation_type] == expected, calculation_type
+
+
+def test_finder_merges_counts_across_chunks():
+    finder = tech_audit.DuplicateFinder()
+    hashes = pd.util.hash_array(np.array(["a", "b", "c"], dtype=object))
+    finder.add(hashes[[0, 1]], np.array([1, 1]))
+    finder.add(hashes[[1, 2]], np.array([1, 1]))
+    finder.add(hashes[[0]], np.array([2]))
+    
+    repeated = finder.repeated()
+    assert dict(zip(finder.counts.index, repeated)) == {hashes[0]: True, hashes[1]: True, hashes[2]: False}
+
+
+def test_near_duplicates_group_reworded_titles():
+    df = pd.DataFrame({"Title 1": ["Red Shoes | Shop", "shop - red shoes", "Shoes, Red | SHOP", "Blue Hats | Shop",
+                                   "Green Scarves", "Green Scarves", "", None]})
+    thresholds = dict(tech_audit.MetricEngine.THRESHOLDS, near_duplicate_similarity=0.8)
+    
+    exact = tech_audit.MetricEngine(df).compute(["duplicate_page_titles"])
+    near = tech_audit.MetricEngine(df, thresholds=thresholds).compute(["duplicate_page_titles"])
+    accumulator = tech_audit.MetricAccumulator(["duplicate_page_titles"], thresholds=thresholds)
+    for start in range(0, len(df), 3):
+        accumulator.add(df.iloc[start:start + 3])
+    
+    assert exact["duplicate_page_titles"] == 2
+    assert near["duplicate_page_titles"] == 5
+    assert accumulator.results()["duplicate_page_titles"] == 5
+
+
+def brute_force_near_duplicates(texts, similarity):
+    """Whether each text shares at least the similarity's share of its words with another text"""
+    sets = [set(tech_audit.WORD_PATTERN.findall(text.casefold())) for text in texts]
+    return [any(len(words & other) >= similarity * len(words | other) for j, other in enumerate(sets) if j != i)
+            for i, words in enumerate(sets)]
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_near_duplicates_are_verified_on_exact_word_sets(seed):
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"word{number}" for number in range(12)]
+    texts = list(dict.fromkeys(" ".join(rng.choice(vocabulary, rng.integers(3, 7), replace=False))
+                               for _ in range(300)))
+    
+    flagged = tech_audit.near_duplicate_pairs(tech_audit.word_sets(texts), 0.8)
+    expected = brute_force_near_duplicates(texts, 0.8)
+    
+    # Flagged values are always true near-duplicates; LSH may miss a few pairs
+    assert not (flagged & ~np.array(expected)).any()
+    assert flagged.sum() >= 0.9 * sum(expected)
+
+
+def test_exact_mode_counts_rows_by_value_hash(monkeypatch):
+    df = random_export(100, 0)
+    # Every value hashing alike makes every non-empty row a duplicate, in memory as in chunks
+    monkeypatch.setattr(pd.util, "hash_array", lambda values, **kwargs: np.zeros(len(values), dtype=np.uint64))
+    
+    counts = tech_audit.MetricEngine(df).compute(list(COLUMNS))
+    accumulator = tech_audit.MetricAccumulator(list(COLUMNS))
+    for start in range(0, len(df), 37):
+        accumulator.add(df.iloc[start:start + 37])
+    
+    for calculation_type, column in COLUMNS.items():
+        non_empty = int((df[column].notna() & (df[column] != "")).sum())
+        assert counts[calculation_type] == non_empty, calculation_type
+        assert accumulator.results()[calculation_type] == non_empty, calculation_type
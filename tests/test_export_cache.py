@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+
+import pandas as pd
+import pytest
+
+import tech_audit
+from conftest import internal_export
+
+pytest.importorskip("pyarrow")
+
+COLUMNS = ["Address", "Title 1"]
+
+
+def write_csv(path, titles):
+    pd.DataFrame({"Address": [f"https://example.com/{i}" for i in range(len(titles))],
+                  "Title 1": titles}).to_csv(path, index=False)
+    return str(path)
+
+
+def signature(columns=COLUMNS):
+    return tech_audit.ExportCache.projection_signature(columns)
+
+
+def test_cached_frame_matches_the_parsed_export(tmp_path):
+    csv_path = write_csv(tmp_path / "internal_all.csv", ["Home", "About", None])
+    cache = tech_audit.ExportCache(str(tmp_path / "cache"))
+    parsed = tech_audit.read_export_csv(csv_path, COLUMNS)
+    
+    assert cache.get(csv_path, signature()) is None
+    cache.put(csv_path, signature(), parsed)
+    pd.testing.assert_frame_equal(cache.get(csv_path, signature()), parsed)
+
+
+def test_changed_export_is_not_served_from_the_cache(tmp_path):
+    csv_path = write_csv(tmp_path / "internal_all.csv", ["Home", "About"])
+    cache = tech_audit.ExportCache(str(tmp_path / "cache"))
+    cache.put(csv_path, signature(), tech_audit.read_export_csv(csv_path, COLUMNS))
+    
+    write_csv(csv_path, ["Home", "Contact"])
+    os.utime(csv_path, ns=(1, 1))
+    assert tech_audit.ExportCache(str(tmp_path / "cache")).get(csv_path, signature()) is None
+
+
+def test_copied_export_is_found_by_content(tmp_path):
+    csv_path = write_csv(tmp_path / "internal_all.csv", ["Home", "About"])
+    cache = tech_audit.ExportCache(str(tmp_path / "cache"))
+    cache.put(csv_path, signature(), tech_audit.read_export_csv(csv_path, COLUMNS))
+    
+    copy_path = write_csv(tmp_path / "copy.csv", ["Home", "About"])
+    assert tech_audit.ExportCache(str(tmp_path / "cache")).get(copy_path, signature()) is not None
+
+
+def test_other_projection_or_format_version_misses(tmp_path, monkeypatch):
+    csv_path = write_csv(tmp_path / "internal_all.csv", ["Home", "About"])
+    cache = tech_audit.ExportCache(str(tmp_path / "cache"))
+    cache.put(csv_path, signature(), tech_audit.read_export_csv(csv_path, COLUMNS))
+    
+    assert cache.get(csv_path, signature(["Address"])) is None
+    monkeypatch.setattr(tech_audit.ExportCache, "FORMAT_VERSION", tech_audit.ExportCache.FORMAT_VERSION + 1)
+    assert cache.get(csv_path, signature()) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = tech_audit.ExportCache(str(tmp_path / "cache"))
+    paths = [write_csv(tmp_path / f"export_{number}.csv", [f"Title {number}"] * 50) for number in range(3)]
+    for path in paths:
+        cache.put(path, signature(), tech_audit.read_export_csv(path, COLUMNS))
+    cache.get(paths[0], signature())
+    
+    entry_bytes = max(entry['bytes'] for entry in cache._read_index().values())
+    cache.max_bytes = 2 * entry_bytes
+    cache.put(paths[2], signature(), tech_audit.read_export_csv(paths[2], COLUMNS))
+    
+    assert cache.get(paths[1], signature()) is None
+    assert cache.get(paths[0], signature()) is not None and cache.get(paths[2], signature()) is not None
+
+
+def test_second_load_of_a_crawl_comes_from_the_cache(tmp_path, capsys):
+    crawl = tmp_path / "crawl"
+    os.makedirs(crawl)
+    internal_export().to_csv(crawl / "internal_all.csv", index=False)
+    
+    loads = []
+    for _ in range(2):
+        processor = tech_audit.TechAuditProcessor(cache_dir=str(tmp_path / "cache"))
+        processor.load_screaming_frog_data_recursive(str(crawl))
+        loads.append(processor.screaming_frog_data["internal_all.csv"])
+    
+    assert capsys.readouterr().out.count("(cached)") == 1
+    pd.testing.assert_frame_equal(loads[1], loads[0])
+
+
+def put_entries(cache_dir, folder, worker, count):
+    cache = tech_audit.ExportCache(cache_dir)
+    for number in range(count):
+        csv_path = write_csv(os.path.join(folder, f"export_{worker}_{number}.csv"), [f"Title {worker} {number}"])
+        cache.put(csv_path, signature(), tech_audit.read_export_csv(csv_path, COLUMNS))
+
+
+def test_concurrent_audits_keep_every_index_entry(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    tech_audit.ExportCache(cache_dir)
+    workers = [multiprocessing.Process(target=put_entries, args=(cache_dir, str(tmp_path), worker, 10))
+               for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    assert all(process.exitcode == 0 for process in workers)
+    
+    with open(os.path.join(cache_dir, "index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    assert len(index) == 40
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".json") and name != "index.json"]
@@ -0,0 +1,48 @@
+import pandas as pd
+
+import tech_audit
+from conftest import internal_export
+
+
+def write_internal(tmp_path, df):
+    df = df.assign(**{"Word Count": 100, "Response Time": 0.25, "Canonical Link Element 1": df["Address"]})
+    path = tmp_path / "internal_all.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_exports_are_projected_to_the_mapped_metrics_columns(tmp_path):
+    path = write_internal(tmp_path, internal_export())
+    processor = tech_audit.TechAuditProcessor()
+    
+    df = processor.read_export(path, "internal_all.csv")
+    
+    assert set(df.columns) == set(processor.get_required_columns("internal_all.csv")) & set(pd.read_csv(path).columns)
+    assert "Word Count" not in df.columns
+    assert str(df["Status Code"].dtype) == "Int16"
+    assert str(df["Content Type"].dtype) == "category"
+
+
+def test_projected_counts_match_the_full_read(tmp_path):
+    df = internal_export()
+    df.loc[2, "Status Code"] = None
+    path = write_internal(tmp_path, df)
+    processor = tech_audit.TechAuditProcessor()
+    calculations = [mapping['calculation'] for mapping in processor.item_mappings.values()
+                    if mapping['file'] == "internal_all.csv"]
+    
+    projected = tech_audit.MetricEngine(processor.read_export(path, "internal_all.csv")).compute(calculations)
+    full = tech_audit.MetricEngine(pd.read_csv(path, low_memory=False)).compute(calculations)
+    
+    assert projected == full
+
+
+def test_unexpected_values_in_numeric_columns_are_coerced(tmp_path):
+    df = internal_export(10).astype({"Status Code": object})
+    df.loc[3, "Status Code"] = "Connection Timeout"
+    path = write_internal(tmp_path, df)
+    
+    loaded = tech_audit.TechAuditProcessor().read_export(path, "internal_all.csv")
+    
+    assert loaded["Status Code"].isna().tolist() == [i == 3 for i in range(10)]
+    assert tech_audit.MetricEngine(loaded).compute(["status_404_count"]) == {"status_404_count": 2}
@@ -0,0 +1,51 @@
+import os
+
+import tech_audit
+
+
+def touch(root, relative, mtime=None):
+    path = os.path.join(root, *relative.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Address\n")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_files_are_found_by_name_newest_copy_first(tmp_path):
+    root = str(tmp_path)
+    old = touch(root, "2023/Internal_All.csv", mtime=1_000_000)
+    new = touch(root, "2024/crawl/internal_all.csv", mtime=2_000_000)
+    touch(root, "notes.txt")
+    
+    index = tech_audit.FileIndex(root, [".csv"])
+    
+    assert index.find("INTERNAL_ALL.csv") == [new, old]
+    assert index.find("notes.txt") == []
+    assert index.find("images_all.csv") == []
+
+
+def test_include_exclude_and_depth(tmp_path):
+    root = str(tmp_path)
+    top = touch(root, "internal_all.csv")
+    touch(root, "archive/internal_all.csv")
+    nested = touch(root, "site/images_all.csv")
+    touch(root, "site/deep/sitemap_all.csv")
+    
+    assert tech_audit.FileIndex(root, [".csv"], exclude=["archive"]).find("internal_all.csv") == [top]
+    assert tech_audit.FileIndex(root, [".csv"], include=["site/*"]).with_extensions([".csv"]) == \
+        [os.path.join(root, "site", "deep", "sitemap_all.csv"), nested]
+    assert tech_audit.FileIndex(root, [".csv"], max_depth=1).find("sitemap_all.csv") == []
+    assert tech_audit.FileIndex(root, [".csv"], max_depth=0).with_extensions([".csv"]) == [top]
+
+
+def test_processor_loads_from_its_index(tmp_path, capsys):
+    root = str(tmp_path)
+    touch(root, "archive/internal_all.csv")
+    processor = tech_audit.TechAuditProcessor(use_cache=False, exclude=["archive"])
+    
+    processor.load_screaming_frog_data_recursive(root, processor.build_file_index(root))
+    
+    assert processor.screaming_frog_data == {}
+    assert "internal_all.csv not found" in capsys.readouterr().out
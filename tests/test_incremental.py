@@ -0,0 +1,83 @@
+import contextlib
+import io
+
+import pandas as pd
+
+from conftest import internal_export, read_full_audit, write_export, write_template
+
+ITEMS = [("1", "0", "High"), ("2", "0", "Medium"), ("70", "0", "High"), ("72", "0", "Low")]
+
+
+def images_export(alt_texts, status_codes):
+    return pd.DataFrame({
+        "Address": [f"https://example.com/img/{i}.jpg" for i in range(len(alt_texts))],
+        "Alt Text": alt_texts,
+        "Status Code": status_codes,
+        "Size (Bytes)": [1000] * len(alt_texts),
+    })
+
+
+def run_audit(make_processor, template, data, output_folder, **options):
+    processor = make_processor(template, use_cache=False, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(str(data), "Client", str(output_folder))
+    return processor, read_full_audit(output_path)
+
+
+def test_patched_reports_match_full_runs(tmp_path, make_processor):
+    template = write_template(tmp_path / "template.xlsx", ITEMS)
+    data = tmp_path / "crawl"
+    write_export(data, "internal_all.csv", internal_export())
+    
+    crawls = [
+        images_export(["a", "", "c"], [200, 200, 404]),
+        images_export(["a", "", None], [200, 404, 404]),
+        # Fail -> Pass
+        images_export(["a", "b", "c"], [200, 200, 200]),
+        # Pass -> Fail: the item's template priority comes back
+        images_export(["a", "", None], [200, 200, 404]),
+    ]
+    for run, images in enumerate(crawls):
+        write_export(data, "images_all.csv", images)
+        processor, patched = run_audit(make_processor, template, data, tmp_path / f"incremental-{run}",
+                                       incremental=True)
+        _, full = run_audit(make_processor, template, data, tmp_path / f"full-{run}",
+                            manifest_dir=str(tmp_path / f"full-manifests-{run}"))
+        
+        assert processor.patching == (run > 0)
+        assert patched == full
+    
+    assert patched["70"] == ("Fail", 2, "High")
+
+
+def test_items_reading_unchanged_exports_are_reused(tmp_path, make_processor):
+    template = write_template(tmp_path / "template.xlsx", ITEMS)
+    data = tmp_path / "crawl"
+    write_export(data, "internal_all.csv", internal_export())
+    write_export(data, "images_all.csv", images_export(["a", ""], [200, 200]))
+    run_audit(make_processor, template, data, tmp_path / "first", incremental=True)
+    
+    write_export(data, "images_all.csv", images_export(["", ""], [200, 200]))
+    processor, second = run_audit(make_processor, template, data, tmp_path / "second", incremental=True)
+    
+    assert processor.patching
+    assert sorted(processor.screaming_frog_data) == ["images_all.csv"]
+    assert second["70"][:2] == ("Fail", 2)
+    assert second["1"][1] == 12
+
+
+def test_failing_item_gets_its_template_priority_back(tmp_path, make_processor):
+    template = write_template(tmp_path / "template.xlsx", ITEMS)
+    data = tmp_path / "crawl"
+    write_export(data, "internal_all.csv", internal_export())
+    write_export(data, "images_all.csv", images_export(["a", "b"], [200, 200]))
+    _, first = run_audit(make_processor, template, data, tmp_path / "first", incremental=True)
+    
+    write_export(data, "images_all.csv", images_export(["a", ""], [200, 200]))
+    processor, second = run_audit(make_processor, template, data, tmp_path / "second", incremental=True)
+    
+    assert processor.patching
+    assert first["70"][0] == "Pass" and first["70"][2] != "High"
+    assert second["70"] == ("Fail", 1, "High")
+    # Items reading the unchanged export keep their values
+    assert second["1"] == first["1"] and second["2"] == first["2"]
@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "tkinter", "pyarrow"]
+
+
+def loaded_modules(code):
+    """Heavy modules loaded after running code in a fresh interpreter"""
+    probe = f"import json, sys\n{code}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=REPO_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_importing_the_module_loads_no_heavy_dependency():
+    assert loaded_modules("import tech_audit") == []
+
+
+def test_cli_help_loads_no_heavy_dependency():
+    code = "import tech_audit\ntry:\n    tech_audit.run_cli(['--help'])\nexcept SystemExit:\n    pass"
+    assert loaded_modules(code) == []
+
+
+def test_lazy_module_imports_on_first_use():
+    loaded = loaded_modules("import tech_audit\ntech_audit.pd.DataFrame")
+    
+    assert "pandas" in loaded and "openpyxl" not in loaded and "tkinter" not in loaded
@@ -0,0 +1,66 @@
+import contextlib
+import io
+
+import pandas as pd
+
+import tech_audit
+from conftest import internal_export, write_export, write_template
+
+
+def write_crawl(folder):
+    write_export(folder, "internal_all.csv", internal_export(10))
+    write_export(folder, "images_all.csv", pd.DataFrame({"Address": ["https://example.com/a.jpg"], "Alt Text": [""],
+                                                         "Status Code": [200], "Size (Bytes)": [10]}))
+    write_export(folder, "sitemap_all.csv", pd.DataFrame({"Address": ["https://example.com/page-1"],
+                                                          "Status Code": [200], "Indexability": ["Indexable"]}))
+    write_export(folder, "canonical_all.csv", pd.DataFrame({"Address": ["https://example.com/page-1"],
+                                                            "Canonical Link Element 1": [""]}))
+
+
+def run(tmp_path, make_processor, items):
+    template = write_template(tmp_path / "template.xlsx", [(item_id, "0", "High") for item_id in items])
+    write_crawl(tmp_path / "crawl")
+    processor = make_processor(template, use_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process_audit(str(tmp_path / "crawl"), "Client", str(tmp_path / "out"))
+    return processor
+
+
+def test_exports_no_item_uses_are_not_loaded(tmp_path, make_processor):
+    processor = run(tmp_path, make_processor, ["1", "70"])
+    
+    assert sorted(processor.screaming_frog_data) == ["images_all.csv", "internal_all.csv"]
+    assert list(processor.screaming_frog_data["internal_all.csv"].columns) == ["Title 1"]
+
+
+def test_url_set_lookups_load_just_the_url_column_of_the_other_export(tmp_path, make_processor):
+    processor = run(tmp_path, make_processor, ["106"])
+    
+    assert sorted(processor.screaming_frog_data) == ["internal_all.csv", "sitemap_all.csv"]
+    assert list(processor.screaming_frog_data["sitemap_all.csv"].columns) == ["Address"]
+
+
+def test_fallback_export_is_only_planned_when_the_items_own_is_missing(tmp_path):
+    processor = tech_audit.TechAuditProcessor(use_cache=False)
+    processor.audit_items = ["18"]
+    write_crawl(tmp_path)
+    
+    assert processor.get_required_files(processor.build_file_index(str(tmp_path))) == ["redirect_chains_all.csv",
+                                                                                      "internal_all.csv"]
+    write_export(tmp_path, "redirect_chains_all.csv", pd.DataFrame({"Address": ["https://example.com/"]}))
+    assert processor.get_required_files(processor.build_file_index(str(tmp_path))) == ["redirect_chains_all.csv"]
+
+
+def test_metrics_sharing_intermediates_are_scheduled_together():
+    ordered, release = tech_audit.MetricEngine.schedule(
+        ["missing_page_titles", "client_4xx_errors", "duplicate_page_titles", "status_404_count"])
+    
+    assert sorted(ordered) == sorted(["missing_page_titles", "client_4xx_errors", "duplicate_page_titles",
+                                      "status_404_count"])
+    assert abs(ordered.index("client_4xx_errors") - ordered.index("status_404_count")) == 1
+    # Each intermediate is released by exactly one metric, after which nothing uses it
+    released = [intermediate for intermediates in release.values() for intermediate in intermediates]
+    assert sorted(map(str, released)) == sorted(map(str, tech_audit.MetricEngine.declared(ordered, 'uses')))
+    for calculation_type, intermediates in release.items():
+        later = ordered[ordered.index(calculation_type) + 1:]
+        assert not set(map(str, intermediates)) & set(map(str, tech_audit.MetricEngine.declared(later, 'uses')))
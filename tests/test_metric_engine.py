@@ -0,0 +1,87 @@
+import openpyxl
+import pandas as pd
+
+import tech_audit
+from conftest import internal_export
+
+
+def pages():
+    df = internal_export(40)
+    df["Title 1 Length"] = df["Title 1"].str.len()
+    df["Meta Description 1 Length"] = df["Meta Description 1"].str.len()
+    df["H1-2"] = ["Second" if i % 6 == 0 else None for i in range(len(df))]
+    df["Meta Robots 1"] = ["noindex, nofollow" if i % 8 == 0 else "index, follow" for i in range(len(df))]
+    df["Canonical Link Element 1"] = [None if i % 9 == 0 else
+                                      "https://other.example.org/" if i % 10 == 0 else address
+                                      for i, address in enumerate(df["Address"])]
+    df.loc[3, "Content Type"] = "image/png"
+    df.loc[5, "Status Code"] = 503
+    df.loc[6, "Status Code"] = 302
+    return df
+
+
+def filtered_counts(df):
+    """Counts as the per-item filters used to take them, one filtered copy per metric"""
+    def non_empty_duplicates(column):
+        non_empty = df[df[column].notna() & (df[column] != '')]
+        return len(non_empty[non_empty.duplicated(subset=[column], keep=False)])
+    html = df[df['Content Type'].str.contains('text/html', na=False)]
+    return {
+        "missing_canonical": len(html[html['Canonical Link Element 1'].isna()]),
+        "canonicalised_pages": len(df[df['Canonical Link Element 1'].notna()
+                                      & (df['Canonical Link Element 1'] != df['Address'])]),
+        "pages_with_noindex": len(df[df['Meta Robots 1'].str.contains('noindex', na=False, case=False)]),
+        "pages_with_nofollow": len(df[df['Meta Robots 1'].str.contains('nofollow', na=False, case=False)]),
+        "missing_page_titles": len(df[df['Title 1'].isna() | (df['Title 1'] == '')]),
+        "duplicate_page_titles": non_empty_duplicates('Title 1'),
+        "long_page_titles": len(df[df['Title 1 Length'] > 60]),
+        "short_page_titles": len(df[(df['Title 1 Length'] < 30) & (df['Title 1 Length'] > 0)]),
+        "missing_meta_descriptions": len(df[df['Meta Description 1'].isna() | (df['Meta Description 1'] == '')]),
+        "duplicate_meta_descriptions": non_empty_duplicates('Meta Description 1'),
+        "short_meta_descriptions": len(df[(df['Meta Description 1 Length'] < 120)
+                                          & (df['Meta Description 1 Length'] > 0)]),
+        "missing_h1": len(df[df['H1-1'].isna() | (df['H1-1'] == '')]),
+        "duplicate_h1": non_empty_duplicates('H1-1'),
+        "multiple_h1": len(df[df['H1-2'].notna()]),
+        "client_4xx_errors": len(df[(df['Status Code'] >= 400) & (df['Status Code'] < 500)]),
+        "server_5xx_errors": len(df[df['Status Code'] >= 500]),
+        "status_404_count": len(df[df['Status Code'] == 404]),
+        "temporary_redirects": len(df[df['Status Code'].isin([302, 307])]),
+    }
+
+
+def test_counts_match_the_per_item_filters():
+    df = pages()
+    expected = filtered_counts(df)
+    
+    assert tech_audit.MetricEngine(df).compute(list(expected)) == expected
+    assert expected["duplicate_page_titles"] > 0 and expected["missing_canonical"] > 0
+
+
+def test_missing_columns_and_unknown_metrics_count_zero():
+    engine = tech_audit.MetricEngine(pd.DataFrame({"Address": ["https://example.com/"]}))
+    
+    assert engine.compute(["missing_page_titles", "broken_images", "no_such_metric"]) == \
+        {"missing_page_titles": 0, "broken_images": 0, "no_such_metric": 0}
+
+
+def test_template_rows_are_filled_from_one_pass_per_file():
+    processor = tech_audit.TechAuditProcessor()
+    processor.screaming_frog_data = {"internal_all.csv": pages()}
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Full Audit"
+    ws.append(["Issue Name", None, "Item ID", None, None, None, None, "Pass/Fail", "Expected Value",
+               "Audit Value", "Priority"])
+    for item_id, expected_value in (("1", "0"), ("2", "100"), ("13", "Manual check"), ("70", "0")):
+        ws.append([None, None, item_id, None, None, None, None, None, expected_value, None, "High"])
+    
+    processor.update_audit_values(wb)
+    
+    counts = filtered_counts(pages())
+    rows = {row[2]: (row[7], row[9], row[10]) for row in ws.iter_rows(min_row=2, values_only=True)}
+    assert rows["1"] == ("Fail", counts["missing_page_titles"], "High")
+    assert rows["2"] == ("Pass", counts["duplicate_page_titles"], "N/A - Pass")
+    assert rows["13"] == ("Opportunity", counts["missing_h1"], "High")
+    # images_all.csv wasn't loaded
+    assert rows["70"] == ("Pass", 0, "N/A - Pass")
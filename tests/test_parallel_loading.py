@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pytest
+
+import tech_audit
+from conftest import internal_export
+
+
+def images_export(rows=30):
+    return pd.DataFrame({
+        "Address": [f"https://example.com/img/{i}.jpg" for i in range(rows)],
+        "Alt Text": ["" if i % 4 == 0 else f"Image {i}" for i in range(rows)],
+        "Status Code": [404 if i % 9 == 0 else 200 for i in range(rows)],
+        "Size (Bytes)": [150000 if i % 5 == 0 else 2000 for i in range(rows)],
+    })
+
+
+@pytest.fixture
+def crawl(tmp_path):
+    os.makedirs(tmp_path / "crawl" / "images")
+    internal_export().to_csv(tmp_path / "crawl" / "internal_all.csv", index=False)
+    images_export().to_csv(tmp_path / "crawl" / "images" / "images_all.csv", index=False)
+    return str(tmp_path / "crawl")
+
+
+def load(folder, **options):
+    processor = tech_audit.TechAuditProcessor(use_cache=False, **options)
+    # Use the pool however small the files are
+    processor.parallel_min_bytes = 0
+    processor.load_screaming_frog_data_recursive(folder)
+    return processor
+
+
+def test_pool_loads_the_same_frames_as_in_process_parsing(crawl, capsys):
+    serial = load(crawl, workers=1)
+    parallel = load(crawl, workers=2)
+    
+    assert "with 2 worker processes" in capsys.readouterr().out
+    assert sorted(parallel.screaming_frog_data) == ["images_all.csv", "internal_all.csv"]
+    for file_name, df in serial.screaming_frog_data.items():
+        pd.testing.assert_frame_equal(parallel.screaming_frog_data[file_name], df)
+
+
+def test_pool_streams_the_same_totals(crawl):
+    serial = load(crawl, workers=1, streaming=True, chunk_size=7)
+    parallel = load(crawl, workers=2, streaming=True, chunk_size=7)
+    
+    assert parallel.streamed_metrics == serial.streamed_metrics
+    assert parallel.streamed_metrics["images_all.csv"]["images_missing_alt"] == 8
+
+
+def test_small_crawls_are_parsed_in_process(crawl):
+    processor = tech_audit.TechAuditProcessor(workers=4)
+    paths = [os.path.join(crawl, "internal_all.csv"), os.path.join(crawl, "images", "images_all.csv")]
+    
+    assert processor.get_worker_count(paths) == 1
+    assert processor.get_worker_count(paths[:1]) == 1
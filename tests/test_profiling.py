@@ -0,0 +1,47 @@
+import contextlib
+import io
+import json
+import os
+
+import openpyxl
+
+from conftest import internal_export, write_export, write_template
+
+
+def test_profile_report_covers_stages_files_metrics_and_imports(tmp_path, make_processor):
+    template = write_template(tmp_path / "template.xlsx", [("1", "0", "High"), ("65", "0", "High")])
+    data = tmp_path / "crawl"
+    write_export(data, "internal_all.csv", internal_export(30))
+    wb = openpyxl.Workbook()
+    wb.active.append(["URL", "Clicks"])
+    wb.active.append(["https://example.com/", 10])
+    wb.save(data / "search_console.xlsx")
+    
+    processor = make_processor(template, use_cache=False, profile=True)
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        output_path, _ = processor.process_audit(str(data), "Client", str(tmp_path / "out"))
+    
+    profile_path = os.path.splitext(output_path)[0] + "_profile.json"
+    with open(profile_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["stages"] == processor.last_profile["stages"]
+    assert [entry["stage"] for entry in report["stages"]] == ["template", "discovery", "load", "metrics", "import",
+                                                              "save"]
+    assert all(entry["seconds"] >= 0 and entry["cpu_seconds"] >= 0 for entry in report["stages"])
+    assert {entry["stage"]: entry.get("rows") for entry in report["stages"]}["load"] == 30
+    assert [(entry["file"], entry["rows"]) for entry in report["files"]] == [("internal_all.csv", 30)]
+    assert {entry["metric"] for entry in report["metrics"]} >= {"missing_page_titles", "status_404_count"}
+    assert [entry["rows"] for entry in report["imports"]] == [2]
+    assert "Timing by stage:" in output.getvalue()
+
+
+def test_timings_are_kept_without_writing_a_report(tmp_path, make_processor):
+    template = write_template(tmp_path / "template.xlsx", [("1", "0", "High")])
+    write_export(tmp_path / "crawl", "internal_all.csv", internal_export(5))
+    
+    processor = make_processor(template, use_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(str(tmp_path / "crawl"), "Client", str(tmp_path / "out"))
+    
+    assert processor.last_profile["stages"]
+    assert os.listdir(os.path.dirname(output_path)) == [os.path.basename(output_path)]
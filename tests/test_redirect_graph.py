@@ -0,0 +1,114 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import internal_export, read_full_audit, write_export, write_template
+from tech_audit import RedirectGraph
+
+
+def redirects(*pairs):
+    return pd.DataFrame({
+        "Address": [source for source, target in pairs],
+        "Redirect URL": [target for source, target in pairs],
+        "Status Code": [301] * len(pairs),
+    })
+
+
+def build(*pairs):
+    graph = RedirectGraph()
+    graph.add(redirects(*pairs))
+    return graph.build()
+
+
+def test_chains_are_counted_once_from_their_first_url():
+    graph = build(("a", "b"), ("b", "c"), ("c", "d"), ("x", "y"), ("p", "q"), ("q", "r"))
+    
+    assert graph.chain_count() == 2
+    assert sorted(graph.chain_heads().tolist()) == [2, 3]
+    assert graph.loop_count() == 0
+
+
+def test_loops_and_the_urls_leading_into_them():
+    graph = build(("a", "b"), ("b", "a"), ("c", "d"), ("d", "e"), ("e", "c"), ("f", "c"), ("g", "g"))
+    
+    assert graph.loop_count() == 3
+    assert (graph.hops == RedirectGraph.LOOP).sum() == 7
+    assert graph.chain_count() == 0
+
+
+def test_a_url_redirected_twice_keeps_its_last_target():
+    graph = RedirectGraph()
+    graph.add(redirects(("a", "b"), ("b", "c")))
+    graph.add(redirects(("a", "a")))
+    graph.build()
+    
+    assert graph.loop_count() == 1
+    assert (graph.hops == RedirectGraph.LOOP).sum() == 1
+
+
+def test_a_replaced_redirect_doesnt_hide_a_chain_start():
+    graph = RedirectGraph()
+    # x -> a is replaced by x -> y, so a starts the chain a -> b -> c
+    graph.add(redirects(("x", "a"), ("a", "b"), ("b", "c")))
+    graph.add(redirects(("x", "y")))
+    graph.build()
+    
+    assert graph.chain_count() == 1
+    assert graph.chain_heads().tolist() == [2]
+
+
+def walk(next_node):
+    """Hops to the final destination (or LOOP) of every node, and the number of loops, one step at a time"""
+    hops, loops = [], set()
+    for node in range(len(next_node)):
+        path = [node]
+        while next_node[path[-1]] >= 0 and next_node[path[-1]] not in path:
+            path.append(next_node[path[-1]])
+        if next_node[path[-1]] < 0:
+            hops.append(len(path) - 1)
+        else:
+            hops.append(RedirectGraph.LOOP)
+            loops.add(min(path[path.index(next_node[path[-1]]):]))
+    return hops, len(loops)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_graphs_match_a_step_by_step_walk(seed):
+    rng = np.random.default_rng(seed)
+    urls = [f"u{number}" for number in range(200)]
+    sources = rng.choice(len(urls), 150, replace=False)
+    graph = build(*((urls[source], urls[target]) for source, target in zip(sources, rng.integers(0, 200, 150))))
+    
+    hops, loops = walk(graph.next)
+    assert graph.hops.tolist() == hops
+    assert graph.loop_count() == loops
+    heads = [node for node, count in enumerate(hops) if count >= 2 and node not in set(graph.next)]
+    assert sorted(graph.chain_heads().index) == heads
+
+
+def test_no_redirects():
+    graph = build()
+    
+    assert graph.chain_count() == 0
+    assert graph.loop_count() == 0
+
+
+def test_items_fall_back_to_the_graph_without_chain_exports(tmp_path, make_processor):
+    template = write_template(tmp_path / "template.xlsx", [("18", "0", "High"), ("19", "0", "High")])
+    data = tmp_path / "crawl"
+    pages = internal_export(6).assign(**{"Redirect URL": ""})
+    # page-0 -> page-1 -> page-2, page-3 <-> page-4
+    for source, target in ((0, 1), (1, 2), (3, 4), (4, 3)):
+        pages.loc[source, ["Status Code", "Redirect URL"]] = [301, f"https://example.com/page-{target}"]
+    write_export(data, "internal_all.csv", pages)
+    
+    processor = make_processor(template, use_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(str(data), "Client", str(tmp_path / "out"))
+    
+    report = read_full_audit(output_path)
+    assert report["18"][:2] == ("Fail", 1)
+    assert report["19"][:2] == ("Fail", 1)
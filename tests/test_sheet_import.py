@@ -0,0 +1,64 @@
+import os
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font, PatternFill
+
+import tech_audit
+
+ROWS = [["URL", "Clicks", "CTR"]] + [[f"https://example.com/{i}", i * 3, i / 100] for i in range(1, 40)]
+
+
+def write_workbook(folder):
+    os.makedirs(folder, exist_ok=True)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Queries"
+    for row in ROWS:
+        ws.append(row)
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill(fill_type="solid", start_color="FFFF00", end_color="FFFF00")
+    wb.create_sheet("Notes").append(["Exported from Search Console"])
+    path = os.path.join(folder, "search_console.xlsx")
+    wb.save(path)
+    return path
+
+
+def import_folder(folder, mode, output_path):
+    """Import a folder's workbooks into a new workbook, save it and open it again"""
+    processor = tech_audit.TechAuditProcessor(use_cache=False)
+    processor.import_mode = mode
+    workbook = openpyxl.Workbook()
+    count = processor.import_existing_sheets_recursive(workbook, folder)
+    # Bulk tabs are streamed to disk and can only be read back from the saved file
+    tech_audit.save_streaming_workbook(workbook, output_path)
+    return count, openpyxl.load_workbook(output_path)
+
+
+@pytest.mark.parametrize("mode", ["full", "bulk", "values"])
+def test_every_mode_copies_the_same_values(tmp_path, mode):
+    write_workbook(str(tmp_path / "data"))
+    
+    count, workbook = import_folder(str(tmp_path / "data"), mode, str(tmp_path / "report.xlsx"))
+    
+    assert count == 1
+    assert workbook.sheetnames == ["Sheet", "search_console_Queries", "search_console_Notes"]
+    queries = workbook["search_console_Queries"]
+    assert [list(row) for row in queries.iter_rows(values_only=True)] == ROWS
+    assert [list(row) for row in workbook["search_console_Notes"].iter_rows(values_only=True)] == \
+        [["Exported from Search Console"]]
+    header = queries.cell(row=1, column=1)
+    assert header.font.bold == (mode != "values")
+    assert (header.fill.fill_type == "solid") == (mode != "values")
+
+
+def test_auto_mode_switches_to_bulk_for_large_files(tmp_path):
+    path = write_workbook(str(tmp_path / "data"))
+    processor = tech_audit.TechAuditProcessor(use_cache=False)
+    
+    assert processor.get_import_mode(path) == "full"
+    processor.import_bulk_min_bytes = os.path.getsize(path)
+    assert processor.get_import_mode(path) == "bulk"
+    processor.import_mode = "values"
+    assert processor.get_import_mode(path) == "values"
@@ -0,0 +1,37 @@
+import pytest
+
+import tech_audit
+from conftest import internal_export
+
+INTERNAL = internal_export(60)
+METRICS = [calculation_type for calculation_type, spec in tech_audit.MetricEngine.METRICS.items()
+           if not tech_audit.MetricEngine.needs_whole_crawl(calculation_type)
+           and all(column in INTERNAL.columns for column in spec.get('columns', []))]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 60])
+def test_chunked_totals_match_the_whole_frame(chunk_rows):
+    expected = tech_audit.MetricEngine(INTERNAL).compute(METRICS)
+    
+    accumulator = tech_audit.MetricAccumulator(METRICS)
+    for start in range(0, len(INTERNAL), chunk_rows):
+        accumulator.add(INTERNAL.iloc[start:start + chunk_rows])
+    
+    assert accumulator.results() == expected
+    assert expected['duplicate_page_titles'] > 0
+
+
+def test_streamed_export_matches_the_loaded_one(tmp_path):
+    df = INTERNAL.astype({"Status Code": object})
+    # A value that only turns up in a late chunk makes the stream start over parsing it as text
+    df.loc[50, "Status Code"] = "Connection Timeout"
+    path = tmp_path / "internal_all.csv"
+    df.to_csv(path, index=False)
+    processor = tech_audit.TechAuditProcessor(streaming=True, chunk_size=7)
+    calculations = processor.get_file_calculations("internal_all.csv")
+    
+    streamed = processor.stream_export_metrics(str(path), "internal_all.csv")
+    loaded = tech_audit.MetricEngine(processor.read_export(str(path), "internal_all.csv")).compute(calculations)
+    
+    assert streamed.results() == loaded
+    assert streamed.rows == 60 and streamed.chunks == 9
@@ -0,0 +1,54 @@
+import os
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+import tech_audit
+
+
+def build_workbook():
+    wb = openpyxl.Workbook()
+    wb.active.title = "Full Audit"
+    wb.active["A1"] = "template"
+    ws = tech_audit.create_streaming_sheet(wb, "Imported")
+    bold = WriteOnlyCell(ws, value="header")
+    bold.font = Font(bold=True)
+    ws.append([bold, "second"])
+    for row in range(1, 2001):
+        ws.append([row, f"value {row}"])
+    return wb
+
+
+def test_streamed_sheets_round_trip(tmp_path):
+    path = tmp_path / "report.xlsx"
+    tech_audit.save_streaming_workbook(build_workbook(), str(path))
+    
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == ["Full Audit", "Imported"]
+    assert wb["Full Audit"]["A1"].value == "template"
+    ws = wb["Imported"]
+    assert ws.max_row == 2001
+    assert ws["A1"].value == "header" and ws["A1"].font.bold
+    assert [ws["A2001"].value, ws["B2001"].value] == [2000, "value 2000"]
+
+
+def test_pinned_openpyxl_streams():
+    # requirements.txt pins an openpyxl the streaming internals are known to work with
+    assert tech_audit.streaming_sheets_supported()
+
+
+def test_other_openpyxl_releases_fall_back_to_regular_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(tech_audit, "STREAMING_OPENPYXL_VERSIONS", ("0.0.",))
+    wb = build_workbook()
+    assert not isinstance(wb["Imported"], openpyxl.worksheet._write_only.WriteOnlyWorksheet)
+    path = tmp_path / "report.xlsx"
+    tech_audit.save_streaming_workbook(wb, str(path))
+    assert openpyxl.load_workbook(path, read_only=True)["Imported"].max_row == 2001
+
+
+def test_discarded_streaming_sheets_remove_their_temp_files():
+    wb = build_workbook()
+    temp_path = wb["Imported"]._writer.out
+    tech_audit.discard_streaming_sheets(wb)
+    assert not os.path.exists(temp_path)
@@ -0,0 +1,30 @@
+import contextlib
+import io
+import os
+
+from conftest import internal_export, read_full_audit, write_export, write_template
+
+
+def test_template_rows_are_rescanned_only_when_the_template_changes(tmp_path, make_processor, monkeypatch):
+    data = str(tmp_path / "crawl")
+    write_export(data, "internal_all.csv", internal_export())
+    template = write_template(tmp_path / "template.xlsx", [("1", "0", "High")])
+    scans = []
+    
+    def audit():
+        processor = make_processor(template, use_cache=False)
+        scan = processor.scan_template_rows
+        monkeypatch.setattr(processor, "scan_template_rows", lambda ws: scans.append(ws) or scan(ws))
+        with contextlib.redirect_stdout(io.StringIO()):
+            output_path, _ = processor.process_audit(data, "Client", str(tmp_path / "out"))
+        return read_full_audit(output_path)["1"]
+    
+    assert audit() == ("Fail", 12, "High")
+    assert audit() == ("Fail", 12, "High")
+    assert len(scans) == 1
+    
+    # A new expected value must be read from the edited template, not the cached index
+    write_template(tmp_path / "template.xlsx", [("1", "20", "High")])
+    assert audit() == ("Pass", 12, "N/A - Pass")
+    assert len(scans) == 2
+    assert len(os.listdir(tmp_path / "cache" / "templates")) == 2
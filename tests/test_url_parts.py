@@ -0,0 +1,43 @@
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+import tech_audit
+
+URLS = ["https://example.com/a", "https://example.com/b?x=1", "HTTPS://Shop.Example.com:8443/c",
+        "http://[::1]:8080/", "http://[broken/", "/relative/path", "", None, "https://example.com"]
+
+
+def parsed(url, part):
+    """One component as urllib parses the whole URL, '' where it can't"""
+    if url is None or (isinstance(url, float) and pd.isna(url)):
+        return ''
+    try:
+        split = urlsplit(str(url))
+        return {"scheme": split.scheme, "netloc": split.netloc, "hostname": split.hostname or ''}[part]
+    except ValueError:
+        return ''
+
+
+def test_components_match_urllib_per_url():
+    urls = pd.Series(URLS * 3, index=range(10, 10 + 3 * len(URLS)))
+    
+    components = tech_audit.url_components(urls)
+    
+    for part in ("scheme", "netloc", "hostname"):
+        assert components[part].index.tolist() == urls.index.tolist()
+        assert components[part].tolist() == [parsed(url, part) for url in urls], part
+
+
+def test_canonical_different_domain_counts():
+    df = pd.DataFrame({
+        "Address": ["https://example.com/a", "https://example.com/b", "https://example.com/c",
+                    "https://example.com/d", "https://example.com/e"],
+        "Canonical Link Element 1": ["https://example.com/a", "https://www.example.com/b", None,
+                                     "/relative", "https://other.org/e"],
+    })
+    
+    counts = tech_audit.MetricEngine(df).compute(["canonical_different_domain"])
+    
+    # www.example.com and other.org; the relative canonical has no domain to compare
+    assert counts == {"canonical_different_domain": 2}
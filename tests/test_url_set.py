@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+import tech_audit
+from conftest import internal_export, read_full_audit, write_export, write_template
+
+SITEMAP = ["https://Example.com/page-1/", "https://example.com:443/page-2#top", "http://example.com/page-3",
+           "https://example.com/Page-4", "https://example.com/page-5?", "https://example.com/page-6?a=1", "", None]
+
+
+def test_membership_matches_a_set_of_normalized_strings():
+    crawled = pd.Series([f"https://example.com/page-{i}" for i in range(8)] + ["https://example.com/page-6?a=1"],
+                        index=range(100, 109))
+    url_set = tech_audit.UrlSet()
+    # Added in chunks, as when sitemap_all.csv is streamed
+    url_set.update(pd.Series(SITEMAP[:3]))
+    url_set.update(pd.Series(SITEMAP[3:]))
+    
+    normalized = set(tech_audit.normalize_url_values([url for url in SITEMAP if url]))
+    expected = [url in normalized for url in tech_audit.normalize_url_values(crawled)]
+    found = url_set.contains(tech_audit.url_hashes(crawled))
+    
+    assert found.tolist() == expected
+    assert found.index.tolist() == crawled.index.tolist()
+    # page-1, -2 and -5 match despite their spelling; page-3 (http), -4 (case) and -6 (no query) don't
+    assert crawled[found.to_numpy()].str.rsplit("/", n=1).str[-1].tolist() == ["page-1", "page-2", "page-5",
+                                                                                "page-6?a=1"]
+    assert len(url_set) == 6
+
+
+def test_blank_urls_are_left_out():
+    hashes = tech_audit.url_hashes(pd.Series(["", None, "  ", "https://example.com/"]))
+    
+    assert hashes.index.tolist() == [3]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_urls_missing_from_the_sitemap_are_counted(tmp_path, make_processor, streaming):
+    template = write_template(tmp_path / "template.xlsx", [("106", "0", "High")])
+    data = tmp_path / "crawl"
+    internal = internal_export(20)
+    write_export(data, "internal_all.csv", internal)
+    write_export(data, "sitemap_all.csv", pd.DataFrame({"Address": SITEMAP, "Status Code": 200,
+                                                        "Indexability": "Indexable"}))
+    
+    processor = make_processor(template, use_cache=False, streaming=streaming, chunk_size=3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        output_path, _ = processor.process_audit(str(data), "Client", str(tmp_path / "out"))
+    
+    # Only page-1, -2 and -5 of the 20 indexable HTML pages are in the sitemap
+    assert read_full_audit(output_path)["106"][:2] == ("Fail", 17)